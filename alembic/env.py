@@ -1,6 +1,7 @@
 import os
 import sys
-from app.models.schema import metadata
+from app.config import settings
+from app.models.schema import metadata, FTS_TABLE_PREFIXES
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
@@ -11,6 +12,10 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate the database the application is configured to use, so that
+# DATABASE_URL from the environment/.env applies here as well
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -22,6 +27,12 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = metadata
 
+def include_name(name, type_, parent_names):
+    """Skip FTS virtual tables and their shadow tables, which metadata cannot describe"""
+    if type_ == "table" and name.startswith(FTS_TABLE_PREFIXES):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -46,6 +57,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -66,8 +79,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # SQLite cannot ALTER most column/constraint changes in place;
+        # batch mode recreates the table instead
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
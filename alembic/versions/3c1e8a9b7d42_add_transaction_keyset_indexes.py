@@ -0,0 +1,32 @@
+"""Add transaction keyset indexes
+
+Revision ID: 3c1e8a9b7d42
+Revises: dfb29693fffa
+Create Date: 2025-05-02 10:14:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e8a9b7d42'
+down_revision: Union[str, None] = 'dfb29693fffa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_date_id', 'transactions', ['date', 'id'])
+    op.create_index(
+        'ix_transactions_category_id_date_id',
+        'transactions',
+        ['category_id', 'date', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_category_id_date_id', table_name='transactions')
+    op.drop_index('ix_transactions_date_id', table_name='transactions')
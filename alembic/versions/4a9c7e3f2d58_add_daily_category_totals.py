@@ -0,0 +1,51 @@
+"""Add daily_category_totals rollup table
+
+Revision ID: 4a9c7e3f2d58
+Revises: b27e5c0d9f16
+Create Date: 2025-05-21 11:27:44.903158
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9c7e3f2d58'
+down_revision: Union[str, None] = 'b27e5c0d9f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_category_totals',
+        sa.Column('day', sa.String(length=10), nullable=False),
+        sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('income_total', sa.Float(), nullable=False),
+        sa.Column('spending_total', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'category_id')
+    )
+    # Backfill from the existing ledger; large ledgers can instead run
+    # `python -m app.cli rebucket-daily-totals` to do this in chunks
+    op.execute(
+        """
+        INSERT INTO daily_category_totals (
+            day, category_id, transaction_count, income_total, spending_total
+        )
+        SELECT
+            strftime('%Y-%m-%d', date),
+            COALESCE(category_id, 0),
+            COUNT(*),
+            SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+            SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+        FROM transactions
+        GROUP BY strftime('%Y-%m-%d', date), COALESCE(category_id, 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_category_totals')
@@ -0,0 +1,44 @@
+"""Add recurring_rules
+
+Revision ID: 6e1a9d3f5b27
+Revises: d4e9b7a2c610
+Create Date: 2025-07-08 11:05:19.446271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9d3f5b27'
+down_revision: Union[str, None] = 'd4e9b7a2c610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recurring_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('account_id', sa.Integer(), nullable=True),
+        sa.Column('cadence', sa.String(length=10), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('next_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_recurring_rules_next_date', 'recurring_rules', ['next_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recurring_rules_next_date', table_name='recurring_rules')
+    op.drop_table('recurring_rules')
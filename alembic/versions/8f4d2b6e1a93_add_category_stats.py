@@ -0,0 +1,53 @@
+"""Add category_stats aggregate table
+
+Revision ID: 8f4d2b6e1a93
+Revises: 3c1e8a9b7d42
+Create Date: 2025-05-09 16:42:05.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4d2b6e1a93'
+down_revision: Union[str, None] = '3c1e8a9b7d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'category_stats',
+        sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('income_total', sa.Float(), nullable=False),
+        sa.Column('spending_total', sa.Float(), nullable=False),
+        sa.Column('first_date', sa.DateTime(), nullable=True),
+        sa.Column('last_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('category_id')
+    )
+    # Backfill from the existing ledger; uncategorized rows go under key 0
+    op.execute(
+        """
+        INSERT INTO category_stats (
+            category_id, transaction_count, income_total,
+            spending_total, first_date, last_date
+        )
+        SELECT
+            COALESCE(category_id, 0),
+            COUNT(*),
+            SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+            SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END),
+            MIN(date),
+            MAX(date)
+        FROM transactions
+        GROUP BY COALESCE(category_id, 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('category_stats')
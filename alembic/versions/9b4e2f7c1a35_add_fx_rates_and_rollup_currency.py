@@ -0,0 +1,85 @@
+"""Add fx_rates and a currency key to the daily and monthly rollups
+
+Revision ID: 9b4e2f7c1a35
+Revises: f2c8d4a6b913
+Create Date: 2025-06-18 14:02:51.730419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2f7c1a35'
+down_revision: Union[str, None] = 'f2c8d4a6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rollup tables with the transactions expression of their period key
+ROLLUPS = {
+    'monthly_category_totals': ('month', 7, "strftime('%Y-%m', date)"),
+    'daily_category_totals': ('day', 10, "strftime('%Y-%m-%d', date)"),
+}
+
+
+def create_rollup(table: str, with_currency: bool) -> None:
+    """Recreate a rollup table and backfill it from transactions"""
+    period, length, expression = ROLLUPS[table]
+    key_columns = [period, 'category_id'] + (['currency'] if with_currency else [])
+    op.create_table(
+        table,
+        sa.Column(period, sa.String(length=length), nullable=False),
+        sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+        *([sa.Column('currency', sa.String(length=3), nullable=False)] if with_currency else []),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('income_total', sa.Integer(), nullable=False),
+        sa.Column('spending_total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(*key_columns)
+    )
+    # Large ledgers can instead rebuild the daily rollup in chunks with
+    # `python -m app.cli rebucket-daily-totals`
+    group_by = f"{expression}, COALESCE(category_id, 0)" + (", currency" if with_currency else "")
+    op.execute(
+        f"""
+        INSERT INTO {table} (
+            {', '.join(key_columns)}, transaction_count, income_total, spending_total
+        )
+        SELECT
+            {group_by},
+            COUNT(*),
+            SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+            SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+        FROM transactions
+        GROUP BY {group_by}
+        """
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fx_rates',
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('rate', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('currency', 'date')
+    )
+    # The primary keys change, so the derived rollups are rebuilt rather than altered
+    for table in ROLLUPS:
+        op.drop_table(table)
+        create_rollup(table, with_currency=True)
+    op.create_index(
+        'ix_daily_category_totals_currency_day',
+        'daily_category_totals',
+        ['currency', 'day'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_category_totals_currency_day', table_name='daily_category_totals')
+    for table in ROLLUPS:
+        op.drop_table(table)
+        create_rollup(table, with_currency=False)
+    op.drop_table('fx_rates')
@@ -0,0 +1,89 @@
+"""Add accounts, transactions.account_id and account balance checkpoints
+
+Revision ID: a3f8c2d17e64
+Revises: 9b4e2f7c1a35
+Create Date: 2025-06-24 10:37:05.218846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f8c2d17e64'
+down_revision: Union[str, None] = '9b4e2f7c1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Recreating transactions drops its triggers, so the FTS ones are restored
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+
+def restore_fts_triggers() -> None:
+    for name in ('insert', 'delete', 'update'):
+        op.execute(f"DROP TRIGGER IF EXISTS transactions_fts_{name}")
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'accounts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('opening_balance', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    # Existing transactions stay unassigned until moved to an account
+    with op.batch_alter_table('transactions', recreate='always') as batch_op:
+        batch_op.add_column(sa.Column('account_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_transactions_account_id_accounts', 'accounts', ['account_id'], ['id']
+        )
+    restore_fts_triggers()
+    op.create_index(
+        'ix_transactions_account_id_date_id', 'transactions', ['account_id', 'date', 'id'], unique=False
+    )
+    # Filled by `python -m app.cli checkpoint-balances`
+    op.create_table(
+        'account_balance_checkpoints',
+        sa.Column('account_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('balance', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+        sa.PrimaryKeyConstraint('account_id', 'month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('account_balance_checkpoints')
+    op.drop_index('ix_transactions_account_id_date_id', table_name='transactions')
+    with op.batch_alter_table('transactions', recreate='always') as batch_op:
+        batch_op.drop_constraint('fk_transactions_account_id_accounts', type_='foreignkey')
+        batch_op.drop_column('account_id')
+    restore_fts_triggers()
+    op.drop_table('accounts')
@@ -0,0 +1,50 @@
+"""Add monthly_category_totals rollup table
+
+Revision ID: b27e5c0d9f16
+Revises: 8f4d2b6e1a93
+Create Date: 2025-05-14 09:03:51.640217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b27e5c0d9f16'
+down_revision: Union[str, None] = '8f4d2b6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'monthly_category_totals',
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('income_total', sa.Float(), nullable=False),
+        sa.Column('spending_total', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('month', 'category_id')
+    )
+    # Backfill from the existing ledger; uncategorized rows go under key 0
+    op.execute(
+        """
+        INSERT INTO monthly_category_totals (
+            month, category_id, transaction_count, income_total, spending_total
+        )
+        SELECT
+            strftime('%Y-%m', date),
+            COALESCE(category_id, 0),
+            COUNT(*),
+            SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+            SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+        FROM transactions
+        GROUP BY strftime('%Y-%m', date), COALESCE(category_id, 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_category_totals')
@@ -0,0 +1,65 @@
+"""Add transactions_fts full-text index
+
+Revision ID: c5d1f7a2e846
+Revises: 4a9c7e3f2d58
+Create Date: 2025-05-27 16:02:11.418730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d1f7a2e846'
+down_revision: Union[str, None] = '4a9c7e3f2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE transactions_fts USING fts5(
+            description,
+            content='transactions',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+            INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+        """
+    )
+    # Index the existing ledger
+    op.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_insert")
+    op.execute("DROP TABLE IF EXISTS transactions_fts")
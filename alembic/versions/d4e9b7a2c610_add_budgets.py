@@ -0,0 +1,33 @@
+"""Add budgets
+
+Revision ID: d4e9b7a2c610
+Revises: a3f8c2d17e64
+Create Date: 2025-07-01 16:22:48.903517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e9b7a2c610'
+down_revision: Union[str, None] = 'a3f8c2d17e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'budgets',
+        sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.PrimaryKeyConstraint('category_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('budgets')
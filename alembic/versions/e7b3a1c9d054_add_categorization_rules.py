@@ -0,0 +1,38 @@
+"""Add categorization_rules table
+
+Revision ID: e7b3a1c9d054
+Revises: c5d1f7a2e846
+Create Date: 2025-06-03 10:21:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3a1c9d054'
+down_revision: Union[str, None] = 'c5d1f7a2e846'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'categorization_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('pattern', sa.String(length=255), nullable=True),
+        sa.Column('match_type', sa.String(length=10), nullable=False),
+        sa.Column('min_amount', sa.Float(), nullable=True),
+        sa.Column('max_amount', sa.Float(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('categorization_rules')
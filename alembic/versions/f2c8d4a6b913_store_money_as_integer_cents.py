@@ -0,0 +1,97 @@
+"""Store money as integer cents and add transactions.currency
+
+Revision ID: f2c8d4a6b913
+Revises: e7b3a1c9d054
+Create Date: 2025-06-10 09:14:32.557104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d4a6b913'
+down_revision: Union[str, None] = 'e7b3a1c9d054'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Money columns per table, with whether they are nullable
+MONEY_COLUMNS = {
+    'transactions': [('amount', False)],
+    'category_stats': [('income_total', False), ('spending_total', False)],
+    'monthly_category_totals': [('income_total', False), ('spending_total', False)],
+    'daily_category_totals': [('income_total', False), ('spending_total', False)],
+    'categorization_rules': [('min_amount', True), ('max_amount', True)],
+}
+
+# Recreating transactions drops its triggers, so the FTS ones are restored
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+
+def restore_fts_triggers() -> None:
+    for name in ('insert', 'delete', 'update'):
+        op.execute(f"DROP TRIGGER IF EXISTS transactions_fts_{name}")
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        # Scale while the columns are still REAL; the table copy then casts exactly
+        op.execute(
+            f"UPDATE {table} SET "
+            + ", ".join(f"{column} = ROUND({column} * 100)" for column, _ in columns)
+        )
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Float(),
+                    type_=sa.Integer(),
+                    existing_nullable=nullable
+                )
+            if table == 'transactions':
+                batch_op.add_column(
+                    sa.Column('currency', sa.String(length=3), nullable=False, server_default='USD')
+                )
+    restore_fts_triggers()
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Integer(),
+                    type_=sa.Float(),
+                    existing_nullable=nullable
+                )
+            if table == 'transactions':
+                batch_op.drop_column('currency')
+        op.execute(
+            f"UPDATE {table} SET "
+            + ", ".join(f"{column} = {column} / 100.0" for column, _ in columns)
+        )
+    restore_fts_triggers()
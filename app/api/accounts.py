@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.core.cache import cache_response
+from app.db import get_db, get_read_db
+from app.models.domain import Account, AccountCreate, AccountBalance, RunningBalancePage
+from app.queries import accounts as account_queries
+
+router = APIRouter()
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/accounts/", response_model=List[Account])
+@cache_response("accounts")
+async def api_list_accounts(
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List accounts"""
+    return await account_queries.list_accounts(db)
+
+@router.post("/api/accounts/", response_model=Account)
+async def api_create_account(
+    account_data: AccountCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a new account"""
+    return await account_queries.create_account(db, account_data)
+
+@router.get("/api/accounts/{account_id}", response_model=Account)
+@cache_response("accounts")
+async def api_get_account(
+    account_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get an account by ID"""
+    account = await account_queries.get_account(db, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return account
+
+@router.get("/api/accounts/{account_id}/balance", response_model=AccountBalance)
+@cache_response("accounts", "transactions", "account_balance_checkpoints")
+async def api_get_account_balance(
+    account_id: int,
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get an account's balance at the end of a day, today by default"""
+    account = await account_queries.get_account(db, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return await account_queries.get_account_balance(db, account, as_of or date.today())
+
+@router.get("/api/accounts/{account_id}/running-balance", response_model=RunningBalancePage)
+@cache_response("accounts", "transactions", "account_balance_checkpoints")
+async def api_get_running_balance(
+    account_id: int,
+    start: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List an account's transactions oldest first with the balance after each"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    account = await account_queries.get_account(db, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    try:
+        return await account_queries.get_running_balance(db, account, start, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.delete("/api/accounts/{account_id}")
+async def api_delete_account(
+    account_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete an account that has no transactions"""
+    try:
+        deleted = await account_queries.delete_account(db, account_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return {"message": "Account deleted successfully"}
\ No newline at end of file
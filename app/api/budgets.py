@@ -0,0 +1,160 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from decimal import Decimal
+from app.core.templates import templates
+from app.core.cache import cache_response
+from app.core.fx import MissingRateError
+from app.db import get_db, get_read_db
+from app.models.domain import Budget, BudgetCreate, BudgetReport
+from app.queries import budgets as budget_queries
+from app.queries import categories as category_queries
+
+router = APIRouter()
+
+# 'YYYY-MM' month keys accepted by the report routes
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/budgets/", response_model=List[Budget])
+@cache_response("budgets", "categories")
+async def api_list_budgets(
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List budgets"""
+    return await budget_queries.list_budgets(db)
+
+@router.get("/api/budgets/report", response_model=BudgetReport)
+@cache_response(*budget_queries.BUDGET_REPORT_TABLES)
+async def api_budget_report(
+    month: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Compare every budget with the category's spending in a month, the current one by default"""
+    try:
+        return await budget_queries.get_budget_report(db, month)
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@router.put("/api/budgets/{category_id}", response_model=Budget)
+async def api_set_budget(
+    category_id: int,
+    budget_data: BudgetCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create or replace a category's monthly budget"""
+    if not await category_queries.get_category(db, category_id):
+        raise HTTPException(status_code=404, detail="Category not found")
+    return await budget_queries.set_budget(db, category_id, budget_data.amount)
+
+@router.delete("/api/budgets/{category_id}")
+async def api_delete_budget(
+    category_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a category's budget"""
+    success = await budget_queries.delete_budget(db, category_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return {"message": "Budget deleted successfully"}
+
+# --- HTML Routes (for HTMX interactions) ---
+
+@router.get("/budgets/", response_class=HTMLResponse)
+@cache_response(*budget_queries.BUDGET_REPORT_TABLES)
+async def budgets_page(
+    request: Request,
+    month: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Render the budgets page with one progress bar per budget"""
+    try:
+        report = await budget_queries.get_budget_report(db, month)
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    categories = await category_queries.list_categories(db)
+    budgeted = {item.category_id for item in report.items}
+    
+    return templates.TemplateResponse(
+        "budgets/list.html",
+        {
+            "request": request,
+            "report": report,
+            "categories": [category for category in categories if category.id not in budgeted],
+            "fingerprint": budget_queries.budget_status_fingerprint
+        }
+    )
+
+@router.get("/budgets/bars", response_class=HTMLResponse)
+async def budget_bar_updates(
+    request: Request,
+    month: str = Query(..., pattern=MONTH_PATTERN),
+    fp: List[str] = Query([]),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Return out-of-band swaps for only the budget bars that changed, or 204 if none did
+    
+    The page polls this with the fingerprint of every bar it shows, as
+    ``fp=<category_id>:<fingerprint>``.
+    """
+    fingerprints = {}
+    for value in fp:
+        category_id, _, digest = value.partition(":")
+        if not category_id.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid fingerprint")
+        fingerprints[int(category_id)] = digest
+    try:
+        report = await budget_queries.get_budget_report(db, month)
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    changed, added, removed = budget_queries.changed_budget_statuses(report, fingerprints)
+    
+    # Nothing to swap: htmx leaves the page alone on 204
+    if not (changed or added or removed):
+        return Response(status_code=204)
+    return templates.TemplateResponse(
+        "budgets/_updates.html",
+        {
+            "request": request,
+            "report": report,
+            "changed": changed,
+            "added": added,
+            "removed": removed,
+            "fingerprint": budget_queries.budget_status_fingerprint
+        }
+    )
+
+@router.post("/budgets/", response_class=HTMLResponse)
+async def set_budget_form(
+    category_id: int = Form(...),
+    amount: Decimal = Form(..., gt=0),
+    month: Optional[str] = Form(None, pattern=MONTH_PATTERN),
+    db: AsyncSession = Depends(get_db)
+):
+    """Set a category's budget from form data and redirect back to the budgets page"""
+    if not await category_queries.get_category(db, category_id):
+        raise HTTPException(status_code=404, detail="Category not found")
+    
+    # Save to database
+    await budget_queries.set_budget(db, category_id, amount)
+    
+    # Redirect to the page of the month being viewed using HX-Redirect
+    return HTMLResponse(
+        status_code=204,
+        headers={"HX-Redirect": f"/budgets/?month={month}" if month else "/budgets/"}
+    )
+
+@router.delete("/budgets/{category_id}", response_class=HTMLResponse)
+async def delete_budget_htmx(
+    category_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a category's budget and remove its bar"""
+    success = await budget_queries.delete_budget(db, category_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    
+    # An empty 200 lets the bar's outerHTML swap remove it
+    return HTMLResponse(status_code=200, content="")
\ No newline at end of file
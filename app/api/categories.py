@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.core.templates import templates
-from app.db import get_db
-from app.models.domain import CategoryCreate, Category
+from app.core.cache import cache_response
+from app.db import get_db, get_read_db
+from app.models.domain import CategoryCreate, Category, CategoryBatch, BatchResult
 from app.queries import categories as category_queries
 
 router = APIRouter()
@@ -12,8 +14,9 @@ router = APIRouter()
 # --- API Routes (for JSON responses) ---
 
 @router.get("/api/categories/", response_model=List[Category])
+@cache_response("categories")
 async def api_list_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     limit: int = 100,
     offset: int = 0
 ):
@@ -21,16 +24,18 @@ async def api_list_categories(
     return await category_queries.list_categories(db, limit, offset)
 
 @router.get("/api/categories/with-counts/")
+@cache_response("categories", "category_stats")
 async def api_list_categories_with_counts(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List categories with transaction counts"""
     return await category_queries.list_categories_with_counts(db)
 
 @router.get("/api/categories/{category_id}", response_model=Category)
+@cache_response("categories")
 async def api_get_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a category by ID"""
     category = await category_queries.get_category(db, category_id)
@@ -46,6 +51,32 @@ async def api_create_category(
     """Create a new category"""
     return await category_queries.create_category(db, category_data)
 
+@router.post("/api/categories/batch", response_model=BatchResult)
+async def api_batch_categories(
+    batch: CategoryBatch,
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply create/update/delete/merge operations to categories in one DB transaction"""
+    result = await category_queries.apply_category_batch(db, batch.operations, batch.atomic)
+    if not result.applied:
+        return JSONResponse(status_code=422, content=jsonable_encoder(result))
+    return result
+
+@router.post("/api/categories/{category_id}/merge")
+async def api_merge_category(
+    category_id: int,
+    into: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Move every transaction of a category to another one, then delete it"""
+    if category_id == into:
+        raise HTTPException(status_code=400, detail="Cannot merge a category into itself")
+    for target_id in (category_id, into):
+        if not await category_queries.get_category(db, target_id):
+            raise HTTPException(status_code=404, detail=f"Category {target_id} not found")
+    moved = await category_queries.merge_category(db, category_id, into)
+    return {"message": "Categories merged successfully", "transactions_moved": moved}
+
 @router.put("/api/categories/{category_id}", response_model=Category)
 async def api_update_category(
     category_id: int,
@@ -74,9 +105,10 @@ async def api_delete_category(
 # --- HTML Routes (for HTMX interactions) ---
 
 @router.get("/categories/", response_class=HTMLResponse)
+@cache_response("categories", "category_stats")
 async def list_categories_page(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Render the categories list page"""
     categories_with_counts = await category_queries.list_categories_with_counts(db)
@@ -123,10 +155,11 @@ async def create_category_form(
     )
 
 @router.get("/categories/{category_id}", response_class=HTMLResponse)
+@cache_response("categories")
 async def view_category_page(
     category_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Render the category detail page"""
     category = await category_queries.get_category(db, category_id)
@@ -0,0 +1,280 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File, Query
+from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any
+import os
+import shutil
+import uuid
+from app.config import settings
+from app.core.templates import templates
+from app.core.jobs import job_runner
+from app.db import get_db, get_read_db
+from app.models.domain import Job
+from app.api.budgets import MONTH_PATTERN
+from app.queries import jobs as job_queries
+from app.queries import transactions as transaction_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import recurring as recurring_queries
+from app.utils.import_utils import IMPORT_FORMATS, detect_import_format
+
+router = APIRouter()
+
+# Derived tables that can be rebuilt in the background, by their app.cli name
+REBUILD_CHOICES = ["daily-totals"] + list(job_queries.REBUILDS)
+
+async def queue_job(db: AsyncSession, kind: str, params: Dict[str, Any]) -> Job:
+    """Queue a job and wake the runner"""
+    job = await job_queries.create_job(db, kind, params)
+    
+    # Workers claim jobs from the table, so commit before waking one
+    await db.commit()
+    job_runner.notify()
+    return job
+
+def spool_upload(upload: UploadFile, import_format: str) -> str:
+    """Copy an uploaded file into the job spool directory, returning its path"""
+    os.makedirs(settings.JOB_SPOOL_DIR, exist_ok=True)
+    path = os.path.abspath(os.path.join(settings.JOB_SPOOL_DIR, f"{uuid.uuid4().hex}.{import_format}"))
+    with open(path, "wb") as spool:
+        shutil.copyfileobj(upload.file, spool)
+    return path
+
+async def import_job_params(
+    file: UploadFile,
+    format: Optional[str],
+    batch_size: int
+) -> Dict[str, Any]:
+    """Validate an import request and spool its file"""
+    import_format = (format or detect_import_format(file.filename) or "").lower()
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported import format, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+    path = await run_in_threadpool(spool_upload, file, import_format)
+    return {"path": path, "format": import_format, "batch_size": batch_size, "filename": file.filename}
+
+def rebuild_job(aggregate: str) -> Dict[str, Any]:
+    """The kind and params of the job rebuilding a derived table"""
+    if aggregate == "daily-totals":
+        return {
+            "kind": "rebucket-daily-totals",
+            "params": {
+                "start_month": None,
+                "end_month": None,
+                "chunk_months": daily_totals_queries.REBUILD_CHUNK_MONTHS
+            }
+        }
+    if aggregate not in job_queries.REBUILDS:
+        raise HTTPException(status_code=404, detail="Unknown derived table")
+    return {"kind": "rebuild", "params": {"aggregate": aggregate}}
+
+async def cancel_job_or_404(db: AsyncSession, job_id: int) -> Job:
+    """Cancel a job, raising 404 if it does not exist and 409 if it already finished"""
+    job = await job_queries.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return await job_queries.cancel_job(db, job_id)
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/jobs/", response_model=List[Job])
+async def api_list_jobs(
+    limit: int = Query(job_queries.JOB_LIST_LIMIT, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List the most recent background jobs, newest first"""
+    return await job_queries.list_jobs(db, limit)
+
+@router.post("/api/jobs/import", response_model=Job, status_code=202)
+async def api_queue_import(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    batch_size: int = transaction_queries.IMPORT_BATCH_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    """Import an uploaded CSV, OFX or QIF file in the background
+    
+    The file is parsed in a worker process and inserted one batch per
+    commit; poll GET /api/jobs/{id} for progress and the ImportResult.
+    """
+    params = await import_job_params(file, format, batch_size)
+    return await queue_job(db, "import", params)
+
+@router.post("/api/jobs/apply-rules", response_model=Job, status_code=202)
+async def api_queue_apply_rules(
+    overwrite: bool = False,
+    chunk_size: int = transaction_queries.CATEGORIZE_CHUNK_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-run the categorization rules over the ledger in the background"""
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+    return await queue_job(db, "apply-rules", {"overwrite": overwrite, "chunk_size": chunk_size})
+
+@router.post("/api/jobs/rebucket-daily-totals", response_model=Job, status_code=202)
+async def api_queue_rebucket_daily_totals(
+    start: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    end: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    chunk_months: int = daily_totals_queries.REBUILD_CHUNK_MONTHS,
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-bucket daily totals for a range of months, the whole ledger by default, in the background"""
+    if chunk_months < 1:
+        raise HTTPException(status_code=400, detail="chunk_months must be positive")
+    params = {"start_month": start, "end_month": end, "chunk_months": chunk_months}
+    return await queue_job(db, "rebucket-daily-totals", params)
+
+@router.post("/api/jobs/rebuild/{aggregate}", response_model=Job, status_code=202)
+async def api_queue_rebuild(
+    aggregate: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Recompute a derived table (category-stats, daily-totals, ...) from transactions in the background"""
+    return await queue_job(db, **rebuild_job(aggregate))
+
+@router.post("/api/jobs/detect-recurring", response_model=Job, status_code=202)
+async def api_queue_detect_recurring(
+    min_occurrences: int = recurring_queries.MIN_OCCURRENCES,
+    chunk_size: int = recurring_queries.DETECT_CHUNK_SIZE,
+    create: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Detect recurring series in the background, optionally creating a rule for each"""
+    if min_occurrences < 2:
+        raise HTTPException(status_code=400, detail="min_occurrences must be at least 2")
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+    params = {"min_occurrences": min_occurrences, "chunk_size": chunk_size, "create": create}
+    return await queue_job(db, "detect-recurring", params)
+
+@router.get("/api/jobs/{job_id}", response_model=Job)
+async def api_get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a job with its progress, and its result once it has finished"""
+    job = await job_queries.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/api/jobs/{job_id}/cancel", response_model=Job)
+async def api_cancel_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a queued job, or stop a running one after its current chunk"""
+    return await cancel_job_or_404(db, job_id)
+
+# --- HTML Routes (for HTMX interactions) ---
+
+@router.get("/jobs/", response_class=HTMLResponse)
+async def list_jobs_page(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Jobs page: forms to start background jobs and the progress of recent ones"""
+    jobs = await job_queries.list_jobs(db)
+    return templates.TemplateResponse(
+        "jobs/list.html",
+        {
+            "request": request,
+            "jobs": jobs,
+            "labels": job_queries.JOB_LABELS,
+            "rebuild_choices": REBUILD_CHOICES,
+            "import_formats": IMPORT_FORMATS
+        }
+    )
+
+@router.get("/jobs/{job_id}", response_class=HTMLResponse)
+async def job_partial(
+    request: Request,
+    job_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """A job's progress; it polls this route until the job finishes"""
+    job = await job_queries.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
+
+@router.post("/jobs/import", response_class=HTMLResponse)
+async def queue_import_form(
+    request: Request,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue an import from the upload form and return its progress"""
+    params = await import_job_params(file, None, transaction_queries.IMPORT_BATCH_SIZE)
+    job = await queue_job(db, "import", params)
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
+
+@router.post("/jobs/apply-rules", response_class=HTMLResponse)
+async def queue_apply_rules_form(
+    request: Request,
+    overwrite: bool = Form(False),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a re-run of the categorization rules and return its progress"""
+    params = {"overwrite": overwrite, "chunk_size": transaction_queries.CATEGORIZE_CHUNK_SIZE}
+    job = await queue_job(db, "apply-rules", params)
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
+
+@router.post("/jobs/rebuild", response_class=HTMLResponse)
+async def queue_rebuild_form(
+    request: Request,
+    aggregate: str = Form(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a rebuild of a derived table and return its progress"""
+    job = await queue_job(db, **rebuild_job(aggregate))
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
+
+@router.post("/jobs/detect-recurring", response_class=HTMLResponse)
+async def queue_detect_recurring_form(
+    request: Request,
+    create: bool = Form(False),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue recurring series detection and return its progress"""
+    params = {
+        "min_occurrences": recurring_queries.MIN_OCCURRENCES,
+        "chunk_size": recurring_queries.DETECT_CHUNK_SIZE,
+        "create": create
+    }
+    job = await queue_job(db, "detect-recurring", params)
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
+
+@router.post("/jobs/{job_id}/cancel", response_class=HTMLResponse)
+async def cancel_job_form(
+    request: Request,
+    job_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a job and return its updated progress"""
+    job = await cancel_job_or_404(db, job_id)
+    return templates.TemplateResponse(
+        "jobs/_job.html",
+        {"request": request, "job": job, "labels": job_queries.JOB_LABELS}
+    )
\ No newline at end of file
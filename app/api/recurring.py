@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.core.cache import cache_response
+from app.db import get_db, get_read_db
+from app.models.domain import RecurringRule, RecurringRuleCreate, RecurringDetection, RecurringGeneration
+from app.queries import recurring as recurring_queries
+
+router = APIRouter()
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/recurring/", response_model=List[RecurringRule])
+@cache_response("recurring_rules")
+async def api_list_recurring_rules(
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List recurring rules by next occurrence"""
+    return await recurring_queries.list_recurring_rules(db)
+
+@router.post("/api/recurring/", response_model=RecurringRule)
+async def api_create_recurring_rule(
+    rule_data: RecurringRuleCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a recurring rule, first due on its start date"""
+    return await recurring_queries.create_recurring_rule(db, rule_data)
+
+@router.get("/api/recurring/candidates", response_model=RecurringDetection)
+@cache_response("transactions", "recurring_rules")
+async def api_detect_recurring(
+    min_occurrences: int = recurring_queries.MIN_OCCURRENCES,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Detect periodic series in the ledger that no recurring rule covers yet
+    
+    Scans the whole ledger; the result is cached until it changes. Large
+    ledgers are better served by POST /api/jobs/detect-recurring or
+    ``python -m app.cli detect-recurring``.
+    """
+    if min_occurrences < 2:
+        raise HTTPException(status_code=400, detail="min_occurrences must be at least 2")
+    return await recurring_queries.detect_recurring(db, min_occurrences)
+
+@router.post("/api/recurring/generate", response_model=RecurringGeneration)
+async def api_generate_recurring(
+    through: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create the transactions of every occurrence due up to a date, today by default"""
+    return await recurring_queries.generate_recurring_transactions(db, through)
+
+@router.get("/api/recurring/{rule_id}", response_model=RecurringRule)
+@cache_response("recurring_rules")
+async def api_get_recurring_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a recurring rule by ID"""
+    rule = await recurring_queries.get_recurring_rule(db, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Recurring rule not found")
+    return rule
+
+@router.delete("/api/recurring/{rule_id}")
+async def api_delete_recurring_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a recurring rule; transactions it already created are kept"""
+    success = await recurring_queries.delete_recurring_rule(db, rule_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Recurring rule not found")
+    return {"message": "Recurring rule deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+from app.core.cache import cache_response
+from app.core.fx import MissingRateError
+from app.db import get_read_db
+from app.models.domain import TimeseriesPoint
+from app.queries import reports as report_queries
+
+router = APIRouter()
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/reports/timeseries", response_model=List[TimeseriesPoint])
+@cache_response("daily_category_totals", "monthly_category_totals", "fx_rates")
+async def api_timeseries(
+    db: AsyncSession = Depends(get_read_db),
+    granularity: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_id: Optional[List[int]] = Query(None)
+):
+    """Income and spending per category, bucketed by day, week, month or year, in the base currency"""
+    if granularity not in report_queries.GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Unsupported granularity")
+    try:
+        return await report_queries.get_timeseries(
+            db, granularity, start, end, category_id, by_category=True
+        )
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@router.get("/api/reports/timeseries/totals", response_model=List[TimeseriesPoint])
+@cache_response("daily_category_totals", "monthly_category_totals", "fx_rates")
+async def api_timeseries_totals(
+    db: AsyncSession = Depends(get_read_db),
+    granularity: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_id: Optional[List[int]] = Query(None)
+):
+    """Income and spending across categories, bucketed by day, week, month or year, in the base currency"""
+    if granularity not in report_queries.GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Unsupported granularity")
+    try:
+        return await report_queries.get_timeseries(
+            db, granularity, start, end, category_id, by_category=False
+        )
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
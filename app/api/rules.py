@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.core.cache import cache_response
+from app.db import get_db, get_read_db
+from app.models.domain import CategorizationRule, CategorizationRuleCreate, CategorizationResult
+from app.queries import rules as rule_queries
+from app.queries import categories as category_queries
+from app.queries import transactions as transaction_queries
+
+router = APIRouter()
+
+# --- API Routes (for JSON responses) ---
+
+@router.get("/api/rules/", response_model=List[CategorizationRule])
+@cache_response("categorization_rules")
+async def api_list_rules(
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List categorization rules in the order they are evaluated"""
+    return await rule_queries.list_rules(db)
+
+@router.post("/api/rules/", response_model=CategorizationRule)
+async def api_create_rule(
+    rule_data: CategorizationRuleCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a categorization rule"""
+    if not await category_queries.get_category(db, rule_data.category_id):
+        raise HTTPException(status_code=404, detail="Category not found")
+    return await rule_queries.create_rule(db, rule_data)
+
+@router.post("/api/rules/apply", response_model=CategorizationResult)
+async def api_apply_rules(
+    overwrite: bool = False,
+    chunk_size: int = transaction_queries.CATEGORIZE_CHUNK_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-run the rules over the ledger and report throughput
+
+    Only uncategorized transactions are changed unless ``overwrite`` is set.
+    Large ledgers are better served by POST /api/jobs/apply-rules or
+    ``python -m app.cli apply-rules``, which commit after every chunk.
+    """
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+    return await transaction_queries.categorize_transactions(db, overwrite, chunk_size)
+
+@router.get("/api/rules/{rule_id}", response_model=CategorizationRule)
+@cache_response("categorization_rules")
+async def api_get_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a categorization rule by ID"""
+    rule = await rule_queries.get_rule(db, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return rule
+
+@router.delete("/api/rules/{rule_id}")
+async def api_delete_rule(
+    rule_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a categorization rule"""
+    success = await rule_queries.delete_rule(db, rule_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return {"message": "Rule deleted successfully"}
\ No newline at end of file
@@ -1,32 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from pydantic import ValidationError
+from typing import Optional, List, Dict, Any
 from datetime import datetime
-from app.core.templates import templates
-from app.db import get_db
-from app.models.domain import TransactionCreate, Transaction, TransactionWithCategory
+from decimal import Decimal
+from app.core.templates import templates, stream_template
+from app.core.cache import cache_response, response_cache
+from app.core.serialization import json_response, transaction_list_adapter, transaction_page_adapter
+from app.db import get_db, get_read_db, async_read_session
+from app.models.domain import (
+    TransactionCreate, Transaction, TransactionWithCategory, TransactionPage, TransactionFilter,
+    ImportResult, TransactionBatch, BatchResult
+)
 from app.queries import transactions as transaction_queries
 from app.queries import categories as category_queries
+from app.queries import search as search_queries
+from app.utils.pagination_utils import encode_query_params
+from app.utils.import_utils import IMPORT_FORMATS, detect_import_format, iter_import_rows
+from app.utils.export_utils import (
+    EXPORT_FORMATS, EXPORT_MEDIA_TYPES, encode_csv_chunk, encode_ndjson_chunk, encode_columnar_chunk
+)
 
 router = APIRouter()
 
+# Rows shown for a search from the list page's search box
+SEARCH_PAGE_SIZE = 50
+
+# Tables a rendered table row or category option reads; their cached
+# fragments are reused for as long as these are unchanged
+ROW_TABLES = ("transactions", "categories")
+CATEGORY_TABLES = ("categories",)
+
+def transaction_filter(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    min_amount: Optional[str] = None,
+    max_amount: Optional[str] = None,
+    sign: Optional[str] = None,
+    category_id: List[str] = Query([]),
+    uncategorized: Optional[str] = None,
+    q: Optional[str] = None
+) -> TransactionFilter:
+    """Dependency collecting the filter parameters shared by the listing routes
+
+    Values are read as strings so that fields left blank in the HTML filter
+    form mean "unset"; TransactionFilter validates and converts them.
+    ``start`` and ``end`` are inclusive dates and ``category_id`` may repeat.
+    """
+    try:
+        return TransactionFilter(
+            start=start,
+            end=end,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            sign=sign,
+            category_ids=category_id,
+            uncategorized=uncategorized,
+            q=q
+        )
+    except ValidationError as error:
+        raise RequestValidationError(error.errors())
+
+def filter_query_params(filters: TransactionFilter) -> Dict[str, Any]:
+    """Map a filter back to the query parameters transaction_filter reads"""
+    params = filters.model_dump(exclude_defaults=True)
+    params["category_id"] = params.pop("category_ids", [])
+    return params
+
 # --- API Routes (for JSON responses) ---
 
 @router.get("/api/transactions/", response_model=List[TransactionWithCategory])
+@cache_response("transactions", "categories")
 async def api_list_transactions(
-    db: AsyncSession = Depends(get_db),
-    limit: int = 100,
-    offset: int = 0,
-    category_id: Optional[int] = None
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(100, ge=1, le=transaction_queries.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    filters: TransactionFilter = Depends(transaction_filter)
 ):
     """List transactions with optional filtering"""
-    return await transaction_queries.list_transactions(db, limit, offset, category_id)
+    transactions = await transaction_queries.list_transactions(db, limit, offset, filters=filters)
+    return json_response(transaction_list_adapter, transactions)
+
+@router.get("/api/transactions/page", response_model=TransactionPage)
+@cache_response("transactions", "categories")
+async def api_list_transactions_page(
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(100, ge=1, le=transaction_queries.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """List transactions with cursor pagination on (date, id) and optional filtering"""
+    try:
+        page = await transaction_queries.list_transactions_keyset(
+            db, limit, cursor, filters=filters, include_total=include_total
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(transaction_page_adapter, page)
+
+@router.get("/api/transactions/export")
+async def api_export_transactions(
+    format: str = "csv",
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Stream the ledger as CSV, NDJSON or columnar row groups, oldest first"""
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format, expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    async def body():
+        # The session lives as long as the stream rather than the request
+        # handler, so it is opened here instead of through a dependency
+        async with async_read_session() as db:
+            header = True
+            async for chunk in transaction_queries.stream_transactions(db, filters):
+                if export_format == "csv":
+                    yield encode_csv_chunk(chunk, header)
+                    header = False
+                elif export_format == "ndjson":
+                    yield encode_ndjson_chunk(chunk)
+                else:
+                    yield encode_columnar_chunk(chunk)
+            if export_format == "csv" and header:
+                yield encode_csv_chunk([], header)
+    
+    extension = "jsonl" if export_format in ("ndjson", "columnar") else "csv"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{extension}"'}
+    )
+
+@router.get("/api/transactions/search", response_model=List[TransactionWithCategory])
+@cache_response("transactions", "categories")
+async def api_search_transactions(
+    q: str,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = Query(50, ge=1, le=transaction_queries.MAX_PAGE_SIZE),
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Search transaction descriptions by word prefixes, best matches first"""
+    transactions = await search_queries.search_transactions(db, q, limit, filters)
+    return json_response(transaction_list_adapter, transactions)
 
 @router.get("/api/transactions/{transaction_id}", response_model=TransactionWithCategory)
+@cache_response("transactions", "categories")
 async def api_get_transaction(
     transaction_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a transaction by ID"""
     transaction = await transaction_queries.get_transaction(db, transaction_id)
@@ -42,6 +170,55 @@ async def api_create_transaction(
     """Create a new transaction"""
     return await transaction_queries.create_transaction(db, transaction_data)
 
+@router.post("/api/transactions/import", response_model=ImportResult)
+async def api_import_transactions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    batch_size: int = transaction_queries.IMPORT_BATCH_SIZE,
+    db: AsyncSession = Depends(get_db)
+):
+    """Import transactions from an uploaded CSV, OFX or QIF file
+    
+    The whole file is imported within the request; large files are better
+    served by POST /api/jobs/import, which runs in the background.
+    """
+    import_format = (format or detect_import_format(file.filename) or "").lower()
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported import format, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+    
+    rows = iter_import_rows(file.file, import_format)
+    try:
+        return await transaction_queries.import_transactions(db, rows, batch_size)
+    except ValueError as exc:
+        # Raised while reading the file, e.g. when it is not UTF-8; nothing is imported
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@router.post("/api/transactions/batch", response_model=BatchResult)
+async def api_batch_transactions(
+    batch: TransactionBatch,
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply many create/update/delete operations in one DB transaction
+
+    With ``atomic`` (the default) either every operation is applied or none
+    is, and a 422 lists the failures. Otherwise valid operations are applied
+    and each result says whether its operation succeeded.
+    """
+    if len(batch.operations) > transaction_queries.MAX_BATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {transaction_queries.MAX_BATCH_OPERATIONS} operations per batch"
+        )
+    result = await transaction_queries.apply_transaction_batch(db, batch.operations, batch.atomic)
+    if not result.applied:
+        return JSONResponse(status_code=422, content=jsonable_encoder(result))
+    return result
+
 @router.put("/api/transactions/{transaction_id}", response_model=Transaction)
 async def api_update_transaction(
     transaction_id: int,
@@ -69,16 +246,35 @@ async def api_delete_transaction(
 
 # --- HTML Routes (for HTMX interactions) ---
 
+async def filtered_results(db: AsyncSession, filters: TransactionFilter):
+    """First page of results for the filter form: transactions, next cursor and total
+
+    With search text the best matches come first and there is no next page;
+    without it this is the first page of the filtered listing.
+    """
+    if filters.q:
+        transactions = await search_queries.search_transactions(
+            db, filters.q, SEARCH_PAGE_SIZE, filters
+        )
+        total = await transaction_queries.count_transactions(db, filters)
+        return transactions, None, total
+    page = await transaction_queries.list_transactions_keyset(
+        db, filters=filters, include_total=True
+    )
+    return page.items, page.next_cursor, page.total
+
 @router.get("/transactions/", response_class=HTMLResponse)
+@cache_response("transactions", "categories")
 async def list_transactions_page(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    category_id: Optional[int] = None
+    db: AsyncSession = Depends(get_read_db),
+    filters: TransactionFilter = Depends(transaction_filter)
 ):
     """Render the transactions list page"""
-    transactions = await transaction_queries.list_transactions(
-        db, category_id=category_id
-    )
+    # Snapshot before querying, so fragments are never cached under newer versions
+    row_versions = response_cache.versions(ROW_TABLES)
+    category_versions = response_cache.versions(CATEGORY_TABLES)
+    transactions, next_cursor, total = await filtered_results(db, filters)
     categories = await category_queries.list_categories(db)
     
     return templates.TemplateResponse(
@@ -86,15 +282,139 @@ async def list_transactions_page(
         {
             "request": request,
             "transactions": transactions,
+            "next_cursor": next_cursor,
+            "total": total,
             "categories": categories,
-            "selected_category_id": category_id
+            "filters": filters,
+            "filter_query": encode_query_params(filter_query_params(filters)),
+            "row_versions": row_versions,
+            "category_versions": category_versions
+        }
+    )
+
+@router.get("/transactions/tbody", response_class=HTMLResponse)
+@cache_response("transactions", "categories")
+async def list_transactions_tbody(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Render only the table body and result count for a change to the filter form
+
+    The count is swapped out of band; HX-Push-Url points the address bar at
+    the full page for the same filters.
+    """
+    row_versions = response_cache.versions(ROW_TABLES)
+    transactions, next_cursor, total = await filtered_results(db, filters)
+    filter_query = encode_query_params(filter_query_params(filters))
+    
+    return templates.TemplateResponse(
+        "transactions/_filtered.html",
+        {
+            "request": request,
+            "transactions": transactions,
+            "next_cursor": next_cursor,
+            "total": total,
+            "filters": filters,
+            "filter_query": filter_query,
+            "row_versions": row_versions
+        },
+        headers={"HX-Push-Url": f"/transactions/?{filter_query}" if filter_query else "/transactions/"}
+    )
+
+@router.get("/transactions/all", response_class=HTMLResponse)
+async def list_all_transactions_page(
+    request: Request,
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Stream the transactions list page with every match, newest first
+
+    The page is rendered while the rows are read, so the browser gets its
+    header before the first row and memory use does not grow with the
+    listing. It is not marked with cache_response: the response cache
+    would buffer the whole page.
+    """
+    async def body():
+        # The session lives as long as the stream rather than the request
+        # handler, so it is opened here instead of through a dependency
+        async with async_read_session() as db:
+            category_versions = response_cache.versions(CATEGORY_TABLES)
+            total = await transaction_queries.count_transactions(db, filters)
+            categories = await category_queries.list_categories(db)
+            context = {
+                "request": request,
+                # Read as the table renders; rows are not fragment-cached, since
+                # a whole listing would evict the cached rows of the first pages
+                "transactions": transaction_queries.stream_transaction_listing(db, filters) if total.count else [],
+                "next_cursor": None,
+                "total": total,
+                "categories": categories,
+                "filters": filters,
+                "filter_query": encode_query_params(filter_query_params(filters)),
+                "category_versions": category_versions
+            }
+            async for chunk in stream_template("transactions/list.html", context):
+                yield chunk
+    
+    return StreamingResponse(body(), media_type="text/html")
+
+@router.get("/transactions/rows", response_class=HTMLResponse)
+@cache_response("transactions", "categories")
+async def list_transactions_rows(
+    request: Request,
+    cursor: str,
+    db: AsyncSession = Depends(get_read_db),
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Render the next batch of table rows for the "Load more" button"""
+    row_versions = response_cache.versions(ROW_TABLES)
+    try:
+        page = await transaction_queries.list_transactions_keyset(
+            db, cursor=cursor, filters=filters
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return templates.TemplateResponse(
+        "transactions/_rows.html",
+        {
+            "request": request,
+            "transactions": page.items,
+            "next_cursor": page.next_cursor,
+            "filter_query": encode_query_params(filter_query_params(filters)),
+            "row_versions": row_versions
+        }
+    )
+
+@router.get("/transactions/search", response_class=HTMLResponse)
+@cache_response("transactions", "categories")
+async def search_transactions_results(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    filters: TransactionFilter = Depends(transaction_filter)
+):
+    """Render the results table for the filter form, count included"""
+    row_versions = response_cache.versions(ROW_TABLES)
+    transactions, next_cursor, total = await filtered_results(db, filters)
+    
+    return templates.TemplateResponse(
+        "transactions/_results.html",
+        {
+            "request": request,
+            "transactions": transactions,
+            "next_cursor": next_cursor,
+            "total": total,
+            "filters": filters,
+            "filter_query": encode_query_params(filter_query_params(filters)),
+            "row_versions": row_versions
         }
     )
 
 @router.get("/transactions/new", response_class=HTMLResponse)
+@cache_response("categories")
 async def new_transaction_page(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Render the new transaction form"""
     categories = await category_queries.list_categories(db)
@@ -110,7 +430,7 @@ async def new_transaction_page(
 @router.post("/transactions/", response_class=HTMLResponse)
 async def create_transaction_form(
     request: Request,
-    amount: float = Form(...),
+    amount: Decimal = Form(...),
     description: Optional[str] = Form(None),
     date: str = Form(...),
     category_id: Optional[int] = Form(None),
@@ -138,10 +458,11 @@ async def create_transaction_form(
     )
 
 @router.get("/transactions/{transaction_id}", response_class=HTMLResponse)
+@cache_response("transactions", "categories")
 async def view_transaction_page(
     transaction_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Render the transaction detail page"""
     transaction = await transaction_queries.get_transaction(db, transaction_id)
@@ -0,0 +1,322 @@
+"""Maintenance commands.
+
+Usage:
+    python -m app.cli verify-category-stats [--fix]
+    python -m app.cli rebuild-category-stats
+    python -m app.cli verify-monthly-totals [--fix]
+    python -m app.cli rebuild-monthly-totals
+    python -m app.cli verify-daily-totals [--fix]
+    python -m app.cli rebuild-daily-totals
+    python -m app.cli verify-search-index [--fix]
+    python -m app.cli rebuild-search-index
+    python -m app.cli verify-balance-checkpoints [--fix]
+    python -m app.cli rebuild-balance-checkpoints
+    python -m app.cli checkpoint-balances
+    python -m app.cli rebucket-daily-totals [--start YYYY-MM] [--end YYYY-MM] [--chunk-months N]
+    python -m app.cli apply-rules [--overwrite] [--chunk-size N]
+    python -m app.cli detect-recurring [--min-occurrences N] [--chunk-size N] [--create]
+    python -m app.cli generate-recurring [--through YYYY-MM-DD]
+    python -m app.cli load-fx-rates PATH
+    python -m app.cli check-query-plans [--verbose]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date
+from typing import Optional
+
+from app.db import async_session
+from app.queries import category_stats as category_stats_queries
+from app.queries import monthly_totals as monthly_totals_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import search as search_queries
+from app.queries import transactions as transaction_queries
+from app.queries import plans as plan_queries
+from app.queries import fx_rates as fx_queries
+from app.queries import accounts as account_queries
+from app.queries import recurring as recurring_queries
+from app.utils.import_utils import iter_fx_rate_rows
+
+# Derived tables and indexes that can be verified against, and rebuilt from, transactions
+AGGREGATES = {
+    "category-stats": (
+        "category_stats",
+        category_stats_queries.verify_category_stats,
+        category_stats_queries.rebuild_category_stats,
+    ),
+    "monthly-totals": (
+        "monthly_category_totals",
+        monthly_totals_queries.verify_monthly_totals,
+        monthly_totals_queries.rebuild_monthly_totals,
+    ),
+    "daily-totals": (
+        "daily_category_totals",
+        daily_totals_queries.verify_daily_totals,
+        daily_totals_queries.rebuild_daily_totals,
+    ),
+    "search-index": (
+        "transactions_fts",
+        search_queries.verify_search_index,
+        search_queries.rebuild_search_index,
+    ),
+    "balance-checkpoints": (
+        "account_balance_checkpoints",
+        account_queries.verify_balance_checkpoints,
+        account_queries.rebuild_balance_checkpoints,
+    ),
+}
+
+async def verify_aggregate(name: str, fix: bool = False) -> int:
+    """Report drift in a derived table, optionally rebuilding it"""
+    table, verify, rebuild = AGGREGATES[name]
+    async with async_session() as session:
+        drift = await verify(session)
+        for entry in drift:
+            key = {k: v for k, v in entry.items() if k not in ("stored", "expected")}
+            print(f"{key}: stored={entry['stored']} expected={entry['expected']}")
+        if not drift:
+            print(f"{table} is consistent")
+            return 0
+        if fix:
+            rows = await rebuild(session)
+            await session.commit()
+            print(f"Rebuilt {table} ({rows} rows)")
+            return 0
+        print(f"{len(drift)} {table} rows drifted; rerun with --fix to rebuild")
+        return 1
+
+async def rebuild_aggregate(name: str) -> int:
+    """Recompute a derived table from the transactions table"""
+    table, _, rebuild = AGGREGATES[name]
+    async with async_session() as session:
+        rows = await rebuild(session)
+        await session.commit()
+    print(f"Rebuilt {table} ({rows} rows)")
+    return 0
+
+async def rebucket_daily_totals(
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    chunk_months: int = daily_totals_queries.REBUILD_CHUNK_MONTHS
+) -> int:
+    """Re-bucket daily totals as a batch job, committing after every chunk"""
+    started = time.perf_counter()
+    rows = 0
+    async with async_session() as session:
+        chunks = daily_totals_queries.rebuild_daily_totals_chunks(
+            session, start_month, end_month, chunk_months
+        )
+        async for progress in chunks:
+            await session.commit()
+            rows += progress["rows"]
+            print(f"{progress['start_month']}..{progress['end_month']}: {progress['rows']} rows")
+        await session.commit()
+    print(f"Re-bucketed daily_category_totals ({rows} rows in {time.perf_counter() - started:.2f}s)")
+    return 0
+
+async def apply_rules(
+    overwrite: bool = False,
+    chunk_size: int = transaction_queries.CATEGORIZE_CHUNK_SIZE
+) -> int:
+    """Re-run the categorization rules over the ledger, committing after every chunk"""
+    started = time.perf_counter()
+    scanned, categorized = 0, 0
+    async with async_session() as session:
+        chunks = transaction_queries.categorize_transactions_chunks(session, overwrite, chunk_size)
+        async for progress in chunks:
+            await session.commit()
+            scanned += progress["scanned"]
+            categorized += progress["categorized"]
+            print(f"up to id {progress['last_id']}: {progress['categorized']} of {progress['scanned']} rows categorized")
+        await session.commit()
+    elapsed = time.perf_counter() - started
+    rate = scanned / elapsed if elapsed else 0.0
+    print(f"Categorized {categorized} of {scanned} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return 0
+
+async def checkpoint_balances() -> int:
+    """Add the month-end balance checkpoints that are missing"""
+    started = time.perf_counter()
+    async with async_session() as session:
+        rows = await account_queries.refresh_balance_checkpoints(session)
+        await session.commit()
+    print(f"Wrote {rows} balance checkpoints in {time.perf_counter() - started:.2f}s")
+    return 0
+
+async def detect_recurring(
+    min_occurrences: int = recurring_queries.MIN_OCCURRENCES,
+    chunk_size: int = recurring_queries.DETECT_CHUNK_SIZE,
+    create: bool = False
+) -> int:
+    """Find periodic series in the ledger and optionally turn them into recurring rules"""
+    async with async_session() as session:
+        result = await recurring_queries.detect_recurring(session, min_occurrences, chunk_size)
+        for candidate in result.candidates:
+            print(
+                f"{candidate.cadence:<9} {candidate.amount:>12} {candidate.currency} "
+                f"x{candidate.occurrences:<4} {candidate.first_date} .. {candidate.last_date} "
+                f"next {candidate.next_date}  {candidate.description}"
+            )
+        if create and result.candidates:
+            await recurring_queries.create_rules_from_candidates(session, result.candidates)
+            await session.commit()
+            print(f"Created {len(result.candidates)} recurring rules")
+    print(
+        f"Found {len(result.candidates)} recurring series among {result.series} in {result.scanned} rows "
+        f"in {result.elapsed_seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)"
+    )
+    return 0
+
+async def generate_recurring(through: Optional[date] = None) -> int:
+    """Create the transactions of the recurring rules that are due"""
+    async with async_session() as session:
+        result = await recurring_queries.generate_recurring_transactions(session, through)
+        await session.commit()
+    print(f"Generated {result.generated} transactions from {result.rules} rules through {result.through}")
+    return 0
+
+async def load_fx_rates(path: str) -> int:
+    """Load exchange rates into the base currency from a local CSV file"""
+    async with async_session() as session:
+        with open(path, "rb") as stream:
+            try:
+                result = await fx_queries.load_fx_rates(session, iter_fx_rate_rows(stream))
+            except ValueError as exc:
+                print(exc)
+                return 1
+        await session.commit()
+    for error in result.errors:
+        print(f"line {error.row}: {error.error}")
+    print(f"Loaded {result.imported} rates, {result.failed} failed ({result.elapsed_seconds:.2f}s)")
+    return 1 if result.failed else 0
+
+async def check_query_plans(verbose: bool = False) -> int:
+    """Fail if any hot query falls back to a full table scan"""
+    async with async_session() as session:
+        report = await plan_queries.check_query_plans(session)
+    failures = [entry for entry in report if entry["table_scans"]]
+    for entry in report:
+        status = "SCAN " + ", ".join(entry["table_scans"]) if entry["table_scans"] else "ok"
+        print(f"{entry['name']}: {status}")
+        if verbose or entry["table_scans"]:
+            for detail in entry["plan"]:
+                print(f"    {detail}")
+    if failures:
+        print(f"{len(failures)} of {len(report)} hot queries scan a table")
+        return 1
+    print(f"All {len(report)} hot queries are index-backed")
+    return 0
+
+def main(argv=None) -> int:
+    """Parse arguments and run the selected command"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, (table, _, _) in AGGREGATES.items():
+        verify = commands.add_parser(
+            f"verify-{name}",
+            help=f"Compare {table} with a full recomputation"
+        )
+        verify.add_argument("--fix", action="store_true", help="Rebuild the table if it drifted")
+        commands.add_parser(
+            f"rebuild-{name}",
+            help=f"Recompute {table} from transactions"
+        )
+
+    rebucket = commands.add_parser(
+        "rebucket-daily-totals",
+        help="Recompute daily_category_totals in chunks, committing as it goes"
+    )
+    rebucket.add_argument("--start", help="First month to rebuild (YYYY-MM)")
+    rebucket.add_argument("--end", help="Last month to rebuild (YYYY-MM)")
+    rebucket.add_argument(
+        "--chunk-months",
+        type=int,
+        default=daily_totals_queries.REBUILD_CHUNK_MONTHS,
+        help="Months aggregated per chunk"
+    )
+
+    rules = commands.add_parser(
+        "apply-rules",
+        help="Re-run the categorization rules over the ledger in chunks"
+    )
+    rules.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Also recategorize transactions that already have a category"
+    )
+    rules.add_argument(
+        "--chunk-size",
+        type=int,
+        default=transaction_queries.CATEGORIZE_CHUNK_SIZE,
+        help="Transaction IDs scanned per chunk"
+    )
+
+    commands.add_parser(
+        "checkpoint-balances",
+        help="Add missing month-end balance checkpoints; run periodically, e.g. from cron"
+    )
+
+    detect = commands.add_parser(
+        "detect-recurring",
+        help="Find subscriptions, salary and other periodic series in the ledger"
+    )
+    detect.add_argument(
+        "--min-occurrences",
+        type=int,
+        default=recurring_queries.MIN_OCCURRENCES,
+        help="Occurrences a series needs to be reported"
+    )
+    detect.add_argument(
+        "--chunk-size",
+        type=int,
+        default=recurring_queries.DETECT_CHUNK_SIZE,
+        help="Transactions read per chunk"
+    )
+    detect.add_argument("--create", action="store_true", help="Create a recurring rule for every series found")
+
+    generate = commands.add_parser(
+        "generate-recurring",
+        help="Create the transactions recurring rules owe; run daily, e.g. from cron"
+    )
+    generate.add_argument(
+        "--through",
+        type=date.fromisoformat,
+        help="Last day to generate (YYYY-MM-DD, default today); later days create future transactions"
+    )
+
+    fx = commands.add_parser(
+        "load-fx-rates",
+        help="Load FX rates from a CSV file with date, currency and rate columns"
+    )
+    fx.add_argument("path", help="CSV file; each rate is base currency per unit of currency")
+
+    plans = commands.add_parser(
+        "check-query-plans",
+        help="EXPLAIN every hot query and fail on full table scans"
+    )
+    plans.add_argument("--verbose", action="store_true", help="Print every plan")
+
+    args = parser.parse_args(argv)
+    if args.command == "check-query-plans":
+        return asyncio.run(check_query_plans(args.verbose))
+    if args.command == "checkpoint-balances":
+        return asyncio.run(checkpoint_balances())
+    if args.command == "detect-recurring":
+        return asyncio.run(detect_recurring(args.min_occurrences, args.chunk_size, args.create))
+    if args.command == "generate-recurring":
+        return asyncio.run(generate_recurring(args.through))
+    if args.command == "load-fx-rates":
+        return asyncio.run(load_fx_rates(args.path))
+    if args.command == "apply-rules":
+        return asyncio.run(apply_rules(args.overwrite, args.chunk_size))
+    if args.command == "rebucket-daily-totals":
+        return asyncio.run(rebucket_daily_totals(args.start, args.end, args.chunk_months))
+    action, name = args.command.split("-", 1)
+    if action == "verify":
+        return asyncio.run(verify_aggregate(name, args.fix))
+    return asyncio.run(rebuild_aggregate(name))
+
+if __name__ == "__main__":
+    sys.exit(main())
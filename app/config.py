@@ -5,11 +5,52 @@ class Settings(BaseSettings):
     # Application settings
     APP_NAME: str = "Financial Tracker"
     DEBUG: bool = True
+    DEFAULT_CURRENCY: str = "USD"  # ISO 4217 code for transactions that do not name one
+    BASE_CURRENCY: str = "USD"  # Reports and dashboard totals are converted into this currency
     
     # Database settings
     DATABASE_URL: str = "sqlite:///./financial_tracker.db"
     ASYNC_DATABASE_URL: str = "sqlite+aiosqlite:///./financial_tracker.db"
     
+    # SQLite performance profile, applied to every connection on connect
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers proceed while a writer commits
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # No fsync per commit; with WAL this cannot corrupt the DB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes of the file to memory-map
+    SQLITE_CACHE_SIZE: int = -64000  # Negative values are KiB, so ~64 MB per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait for locks instead of "database is locked"
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    
+    # Connection pools: several read-only connections, one writer connection
+    DB_READ_POOL_SIZE: int = 8
+    DB_POOL_TIMEOUT: float = 30.0
+    
+    # In-process response cache for GET routes; entries are also dropped when
+    # a committed write touches a table the route reads. Cached counts and
+    # template fragments expire after the same TTL
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: float = 60.0  # Bounds staleness from writes made outside this process
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1024 * 1024
+    COUNT_CACHE_MAX_ENTRIES: int = 256  # Capped "N results" counts, keyed by filter
+    
+    # Templates are compiled to bytecode once and reused across restarts from
+    # this directory; an empty value keeps compiled templates in memory only
+    TEMPLATE_CACHE_DIR: str = "./template_cache"
+    FRAGMENT_CACHE_MAX_ENTRIES: int = 4096  # Rendered {% cache %} blocks, such as table rows
+    
+    # Per-route latency, DB/render/serialization time and query counts,
+    # exposed in the Prometheus text format at /metrics
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 250.0  # Statements slower than this are logged with their query plan
+    
+    # Background jobs (imports, rebuilds, re-categorization) run on these
+    # asyncio tasks inside the app process, committing after every chunk
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 1  # Capped at the number of writer connections, which is one
+    JOB_PROCESSES: int = 1  # Processes parsing uploads; 0 parses on a thread instead
+    JOB_POLL_SECONDS: float = 5.0  # Fallback check for queued jobs when nothing wakes the workers
+    JOB_SPOOL_DIR: str = "./job_spool"  # Uploaded files wait here until their import job ends
+    
     # Security settings
     SECRET_KEY: str = "your-secret-key"  # Change this in production!
     
@@ -0,0 +1,296 @@
+# app/core/cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+
+from app.config import settings
+
+# Session.info key collecting the tables written in the current DB transaction
+CHANGED_TABLES_KEY = "changed_tables"
+
+# Tables every write to the ledger touches, directly or through apply_ledger_changes
+LEDGER_TABLES = (
+    "transactions", "category_stats", "monthly_category_totals", "daily_category_totals",
+    "account_balance_checkpoints"
+)
+
+@dataclass
+class CacheEntry:
+    """A buffered response and the table versions it was rendered from"""
+    versions: Tuple[int, ...]
+    expires_at: float
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+
+class ResponseCache:
+    """LRU/TTL cache of rendered GET responses, invalidated by table versions.
+
+    Each table has a version counter that is bumped when a DB transaction
+    writing it commits. An entry remembers the versions of the tables its
+    route reads, and is only served while all of them are unchanged.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_body_bytes: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_body_bytes = max_body_bytes
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.table_versions: Dict[str, int] = {}
+        self.counters = {
+            "hits": 0, "misses": 0, "not_modified": 0, "stale": 0, "evictions": 0, "bypassed": 0
+        }
+
+    def versions(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Current versions of the given tables, in the given order"""
+        return tuple(self.table_versions.get(table, 0) for table in tables)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        """Invalidate every entry that depends on any of the given tables"""
+        for table in tables:
+            self.table_versions[table] = self.table_versions.get(table, 0) + 1
+
+    def get(self, key: str, versions: Tuple[int, ...]) -> Optional[CacheEntry]:
+        """Return a fresh entry for ``key``, or None on a miss"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        if entry.versions != versions or entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            self.counters["stale"] += 1
+            self.counters["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones past the limit"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry; versions and counters are kept"""
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the current size"""
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": self.counters["hits"] / lookups if lookups else 0.0,
+        }
+
+class VersionedCache:
+    """LRU of computed values, each valid while the table versions it was computed from hold.
+
+    Versions only see writes committed by this process; with ``ttl_seconds``
+    an entry also expires, which bounds how long a write from another
+    process (a CLI command run from cron) goes unnoticed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Tuple[Tuple[int, ...], float, Any]]" = OrderedDict()
+
+    def get(self, key: str, versions: Tuple[int, ...]) -> Any:
+        """Return the value stored for ``key`` at these versions, or None"""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != versions or entry[1] <= time.monotonic():
+            return None
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: str, versions: Tuple[int, ...], value: Any) -> None:
+        """Store a value, evicting the least recently used ones past the limit"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        self.entries[key] = (versions, expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+# Create single shared instances of the caches
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_body_bytes=settings.RESPONSE_CACHE_MAX_BODY_BYTES
+)
+count_cache = VersionedCache(
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+fragment_cache = VersionedCache(
+    max_entries=settings.FRAGMENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+def mark_changed(db, tables: Iterable[str]) -> None:
+    """Record that the session's current DB transaction writes ``tables``.
+
+    The versions are bumped only once the transaction commits, so a
+    concurrent reader can never cache data that is about to be rolled back
+    or that it could not see yet.
+
+    Args:
+        db: An AsyncSession or Session
+        tables: Names of the tables written
+    """
+    db.info.setdefault(CHANGED_TABLES_KEY, set()).update(tables)
+
+@event.listens_for(Session, "after_commit")
+def bump_committed_tables(session: Session) -> None:
+    tables = session.info.pop(CHANGED_TABLES_KEY, None)
+    if tables:
+        response_cache.bump(tables)
+
+@event.listens_for(Session, "after_rollback")
+def discard_rolled_back_tables(session: Session) -> None:
+    session.info.pop(CHANGED_TABLES_KEY, None)
+
+def cache_response(*tables: str) -> Callable:
+    """Mark a GET endpoint as cacheable, given the tables its response reads.
+
+    Args:
+        tables: Names of the tables whose writes invalidate the response
+
+    Returns:
+        A decorator that returns the endpoint unchanged
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.cache_tables = tuple(sorted(set(tables)))
+        return endpoint
+    return decorator
+
+def request_cache_key(scope: dict) -> str:
+    """Key a request by path, sorted query parameters and HTMX request header"""
+    query = b"&".join(sorted(scope.get("query_string", b"").split(b"&")))
+    htmx = b"1" if any(name == b"hx-request" for name, _ in scope["headers"]) else b"0"
+    return f"{scope['path']}?{query.decode('latin-1')}#{htmx.decode()}"
+
+def response_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers ``etag``"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving GET routes marked with cache_response from the cache.
+
+    Responses carry an ETag, and a matching If-None-Match gets a 304.
+    Streaming routes should not be marked: the whole body is buffered.
+    """
+
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+        self.cached_routes: Optional[List[Tuple[Any, Tuple[str, ...]]]] = None
+
+    def route_tables(self, scope: dict) -> Optional[Tuple[str, ...]]:
+        """Tables read by the marked route matching ``scope``, if any"""
+        if self.cached_routes is None:
+            self.cached_routes = [
+                (route, route.endpoint.cache_tables)
+                for route in scope["app"].router.routes
+                if hasattr(getattr(route, "endpoint", None), "cache_tables")
+            ]
+        for route, tables in self.cached_routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                # Lets the metrics middleware label responses served from the cache
+                scope["route"] = route
+                return tables
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        tables = self.route_tables(scope)
+        if tables is None:
+            return await self.app(scope, receive, send)
+
+        key = request_cache_key(scope)
+        if_none_match = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"if-none-match"),
+            None
+        )
+        # Snapshot before rendering: a write committed meanwhile makes the entry stale
+        versions = self.cache.versions(tables)
+        entry = self.cache.get(key, versions)
+        if entry is None:
+            entry = await self.render(scope, receive, send, versions)
+            if entry is None:
+                return
+        await self.send_entry(entry, if_none_match, send)
+
+    async def render(self, scope, receive, send, versions) -> Optional[CacheEntry]:
+        """Run the route and buffer its response; stream it through unchanged if unsuitable"""
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            chunks.append(message.get("body", b""))
+            size = sum(len(chunk) for chunk in chunks)
+            if start.get("status") != 200 or size > self.cache.max_body_bytes:
+                # Not cacheable: flush what was buffered and stop buffering
+                passthrough = True
+                self.cache.counters["bypassed"] += 1
+                await send(start)
+                await send({**message, "body": b"".join(chunks)})
+
+        await self.app(scope, receive, capture)
+        if passthrough:
+            return None
+
+        body = b"".join(chunks)
+        headers = [
+            (name, value) for name, value in start.get("headers", [])
+            if name.lower() not in (b"content-length", b"etag")
+        ]
+        entry = CacheEntry(
+            versions=versions,
+            expires_at=time.monotonic() + self.cache.ttl_seconds,
+            status=start["status"],
+            headers=headers,
+            body=body,
+            etag=response_etag(body)
+        )
+        self.cache.put(request_cache_key(scope), entry)
+        return entry
+
+    async def send_entry(self, entry: CacheEntry, if_none_match: Optional[str], send) -> None:
+        """Send a cached entry, or a bare 304 if the client already has it"""
+        validators = [(b"etag", entry.etag.encode("latin-1")), (b"cache-control", b"no-cache")]
+        if etag_matches(if_none_match, entry.etag):
+            self.cache.counters["not_modified"] += 1
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = entry.headers + validators + [(b"content-length", str(len(entry.body)).encode())]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
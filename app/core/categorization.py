@@ -0,0 +1,122 @@
+# app/core/categorization.py
+import math
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+
+# Distinct descriptions whose candidate rules are remembered per matcher
+MATCH_CACHE_SIZE = 100_000
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation of ``words`` factored into a prefix trie.
+
+    "uber", "uber eats" and "udemy" become ``u(?:ber(?: eats)?|demy)``, so
+    the regex engine follows one path per position instead of trying every
+    word in turn, much like an Aho-Corasick automaton.
+
+    Args:
+        words: Literal strings to match
+
+    Returns:
+        A regex source string matching the longest word at a position
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if terminal else "")
+
+    return build(trie)
+
+class RuleMatcher:
+    """All categorization rules compiled into one matcher.
+
+    Substring rules share a single case-insensitive trie regex that is
+    scanned once per description; regex rules are compiled individually.
+    Rules without a pattern match every description. The set of candidate
+    rules only depends on the description, which repeats heavily in a
+    ledger, so it is memoized and the per-row cost is usually one dict
+    lookup plus the amount checks.
+    """
+
+    def __init__(self, rules: Iterable[Mapping[str, Any]]):
+        ordered = sorted(rules, key=lambda rule: (-rule["priority"], rule["id"]))
+        self.rule_count = len(ordered)
+        self.category_ids = [rule["category_id"] for rule in ordered]
+        self.amount_ranges = [
+            (
+                -math.inf if rule["min_amount"] is None else rule["min_amount"],
+                math.inf if rule["max_amount"] is None else rule["max_amount"],
+            )
+            for rule in ordered
+        ]
+        self.unconditional: List[int] = []
+        self.regexes: List[Tuple[int, Pattern]] = []
+        keywords: Dict[str, List[int]] = {}
+        for position, rule in enumerate(ordered):
+            pattern = rule["pattern"]
+            if not pattern:
+                self.unconditional.append(position)
+            elif rule["match_type"] == "regex":
+                self.regexes.append((position, re.compile(pattern, re.IGNORECASE)))
+            else:
+                keywords.setdefault(pattern.casefold(), []).append(position)
+
+        # The scanner reports the longest keyword at each position, so a hit
+        # also stands for the keywords that are prefixes of it
+        self.keyword_rules: Dict[str, Tuple[int, ...]] = {
+            keyword: tuple(
+                position
+                for other, positions in keywords.items() if keyword.startswith(other)
+                for position in positions
+            )
+            for keyword in keywords
+        }
+        self.scanner: Optional[Pattern] = (
+            re.compile(f"(?=({trie_pattern(keywords)}))") if keywords else None
+        )
+        self.candidate_cache: Dict[Optional[str], Tuple[int, ...]] = {}
+
+    def candidates(self, description: Optional[str]) -> Tuple[int, ...]:
+        """Positions, in priority order, of the rules whose pattern matches ``description``"""
+        cached = self.candidate_cache.get(description)
+        if cached is not None:
+            return cached
+        found = set(self.unconditional)
+        if description:
+            if self.scanner is not None:
+                for match in self.scanner.finditer(description.casefold()):
+                    found.update(self.keyword_rules[match.group(1)])
+            for position, regex in self.regexes:
+                if regex.search(description):
+                    found.add(position)
+        result = tuple(sorted(found))
+        if len(self.candidate_cache) >= MATCH_CACHE_SIZE:
+            self.candidate_cache.clear()
+        self.candidate_cache[description] = result
+        return result
+
+    def categorize(self, description: Optional[str], amount: float) -> Optional[int]:
+        """Category of the first rule matching a transaction, or None.
+
+        Args:
+            description: The transaction description
+            amount: The signed transaction amount
+
+        Returns:
+            The category ID to assign, or None if no rule matches
+        """
+        for position in self.candidates(description):
+            low, high = self.amount_ranges[position]
+            if low <= amount <= high:
+                return self.category_ids[position]
+        return None
\ No newline at end of file
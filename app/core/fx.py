@@ -0,0 +1,81 @@
+# app/core/fx.py
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+from app.utils.money_utils import CENT
+
+class MissingRateError(LookupError):
+    """Raised when amounts in a currency without any FX rates need converting"""
+
+    def __init__(self, currencies: Iterable[str]):
+        self.currencies = sorted(set(currencies))
+        super().__init__(f"No FX rates loaded for {', '.join(self.currencies)}")
+
+class RateIndex:
+    """Exchange rates into one base currency, indexed for lookup by day.
+
+    Each currency keeps a sorted list of 'YYYY-MM-DD' days and the rates
+    that took effect on them. The rate for a day is the latest one on or
+    before it, found with bisect; days before a currency's first rate use
+    that first rate. The base currency always converts at 1.
+    """
+
+    def __init__(self, base_currency: str, rates: Iterable[Mapping[str, Any]]):
+        self.base_currency = base_currency
+        by_currency: Dict[str, List[Tuple[str, Decimal]]] = {}
+        for row in rates:
+            # Rates are stored as REAL; their shortest repr is the loaded text
+            rate = row["rate"] if isinstance(row["rate"], Decimal) else Decimal(repr(row["rate"]))
+            by_currency.setdefault(row["currency"], []).append((row["date"].isoformat(), rate))
+        self.days: Dict[str, List[str]] = {}
+        self.rates: Dict[str, List[Decimal]] = {}
+        for currency, entries in by_currency.items():
+            entries.sort()
+            self.days[currency] = [day for day, _ in entries]
+            self.rates[currency] = [rate for _, rate in entries]
+
+    def missing_currencies(self, currencies: Iterable[str]) -> Set[str]:
+        """The currencies, other than the base one, that have no rates"""
+        return {
+            currency for currency in currencies
+            if currency != self.base_currency and currency not in self.days
+        }
+
+    def rate(self, currency: str, day: str) -> Decimal:
+        """Rate into the base currency of one unit of ``currency`` on ``day``.
+
+        Raises:
+            MissingRateError: If the currency has no rates
+        """
+        if currency == self.base_currency:
+            return Decimal(1)
+        days = self.days.get(currency)
+        if not days:
+            raise MissingRateError([currency])
+        return self.rates[currency][max(bisect_right(days, day) - 1, 0)]
+
+    def rates_for(self, keys: Sequence[Tuple[str, str]]) -> List[Decimal]:
+        """Rates for many (currency, day) pairs, in the same order.
+
+        Each distinct pair is looked up once, so converting the rows of a
+        report costs one bisect per currency and day rather than per row.
+
+        Raises:
+            MissingRateError: Naming every currency in ``keys`` without rates
+        """
+        missing = self.missing_currencies(currency for currency, _ in keys)
+        if missing:
+            raise MissingRateError(missing)
+        found: Dict[Tuple[str, str], Decimal] = {}
+        result = []
+        for key in keys:
+            rate = found.get(key)
+            if rate is None:
+                rate = found[key] = self.rate(*key)
+            result.append(rate)
+        return result
+
+def convert_amount(amount: Decimal, rate: Decimal) -> Decimal:
+    """Convert an amount at ``rate``, rounding half to even to whole cents"""
+    return (amount * rate).quantize(CENT, rounding=ROUND_HALF_EVEN)
\ No newline at end of file
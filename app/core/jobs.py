@@ -0,0 +1,124 @@
+# app/core/jobs.py
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+from app.config import settings
+from app.db import WRITE_POOL_SIZE
+from app.models.domain import Job
+from app.queries import jobs as job_queries
+
+logger = logging.getLogger(__name__)
+
+class JobRunner:
+    """Runs queued jobs on asyncio tasks inside the app process.
+
+    Each job gets its own session. After every chunk its handler yields, the
+    runner saves the handler's progress and commits, so the chunk's writes
+    and the checkpoint covering them land together, then checks whether the
+    job was cancelled. Committing between chunks also hands the single
+    writer connection back to request handlers, so a web write waits for at
+    most one chunk. A second worker would make it wait behind the chunks of
+    two jobs, so the app never runs more workers than writer connections.
+    Jobs a previous process left running are queued again on start and
+    resume from their last checkpoint. CPU-bound parsing goes to a small
+    process pool.
+    """
+
+    def __init__(self, workers: int, processes: int, poll_seconds: float):
+        self.workers = workers
+        self.processes = processes
+        self.poll_seconds = poll_seconds
+        self._session_factory: Optional[Callable] = None
+        self._executor: Optional[Executor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, session_factory: Callable) -> int:
+        """Queue interrupted jobs again and start the workers, returning how many were requeued"""
+        self._session_factory = session_factory
+        async with session_factory() as db:
+            requeued = await job_queries.requeue_interrupted_jobs(db)
+            await db.commit()
+        if self.processes > 0:
+            # Forking a process that runs aiosqlite threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return requeued
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running stay running and resume on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def notify(self) -> None:
+        """Wake idle workers once a newly queued job has been committed"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        """Claim and run queued jobs until cancelled, waiting for a wake-up while there are none"""
+        while True:
+            self._wakeup.clear()
+            try:
+                async with self._session_factory() as db:
+                    job = await job_queries.claim_next_job(db)
+                    await db.commit()
+                if job is not None:
+                    await self.run_job(job)
+                    continue
+            except Exception:
+                logger.exception("Background job worker failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_job(self, job: Job) -> None:
+        """Run a claimed job until it succeeds, fails or is cancelled"""
+        handler = job_queries.JOB_HANDLERS.get(job.kind)
+        async with self._session_factory() as db:
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job.kind}")
+                status = "succeeded"
+                body = handler(db, job, self._executor)
+                try:
+                    async for progress in body:
+                        await job_queries.save_job_progress(db, job.id, progress)
+                        await db.commit()
+                        if await job_queries.is_cancel_requested(db, job.id):
+                            status = "cancelled"
+                            break
+                finally:
+                    await body.aclose()
+                await job_queries.finish_job(db, job.id, status)
+                await db.commit()
+            except Exception as exc:
+                # The failed chunk is rolled back; earlier chunks stay committed
+                await db.rollback()
+                await job_queries.finish_job(db, job.id, "failed", f"{type(exc).__name__}: {exc}")
+                await db.commit()
+        # Not reached when the runner is stopped mid-job, so a resumed import still has its files
+        job_queries.remove_job_files(job)
+
+# Single runner shared by the app; main.py starts and stops it with the app
+job_runner = JobRunner(
+    workers=min(settings.JOB_WORKERS, WRITE_POOL_SIZE),
+    processes=settings.JOB_PROCESSES,
+    poll_seconds=settings.JOB_POLL_SECONDS
+)
\ No newline at end of file
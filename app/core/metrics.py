@@ -0,0 +1,277 @@
+# app/core/metrics.py
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Upper bounds of the queries-per-request buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Connection.info key holding the start times of the statements in flight
+QUERY_START_KEY = "query_start_times"
+
+# Statements EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+class RequestTimings:
+    """Time a request spent in the database, in templates and serializing JSON"""
+    __slots__ = ("db", "render", "serialize", "queries")
+
+    def __init__(self):
+        self.db = 0.0
+        self.render = 0.0
+        self.serialize = 0.0
+        self.queries = 0
+
+# Timings of the request being handled; statements run by background jobs see None
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render ``{name="value",...}``, or nothing when there are no labels"""
+    pairs = [f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value: float) -> str:
+    """Render a sample value the way Prometheus clients do"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """A monotonically increasing value per label set"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}")
+        return lines
+
+class Histogram:
+    """Observations counted into fixed buckets per label set, plus their sum.
+
+    Each observation increments a single bucket; the cumulative counts
+    Prometheus expects are only computed when the metrics are scraped.
+    """
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # Per label set: [count in each bucket..., count above the last bucket, sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else format_value(bound)
+                bucket_labels = format_labels(self.labels, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {format_value(series[-1])}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+class Metrics:
+    """The request and query metrics of this process"""
+
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+        )
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time from receiving a request to sending its last byte",
+            REQUEST_BUCKETS, ("method", "route")
+        )
+        self.request_phase = Histogram(
+            "http_request_phase_seconds",
+            "Time a request spent running SQL, rendering templates and serializing JSON",
+            REQUEST_BUCKETS, ("method", "route", "phase")
+        )
+        self.request_queries = Histogram(
+            "http_request_queries", "SQL statements executed per request",
+            QUERY_COUNT_BUCKETS, ("method", "route")
+        )
+        self.query_duration = Histogram(
+            "db_query_duration_seconds", "Time the database took to execute a statement", QUERY_BUCKETS
+        )
+        self.slow_queries = Counter(
+            "db_slow_queries_total", f"Statements slower than {settings.SLOW_QUERY_MS:g}ms"
+        )
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        timings: RequestTimings
+    ) -> None:
+        """Record a finished request"""
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.request_duration.observe(seconds, labels)
+        self.request_phase.observe(timings.db, (method, route, "db"))
+        self.request_phase.observe(timings.render, (method, route, "render"))
+        self.request_phase.observe(timings.serialize, (method, route, "serialize"))
+        self.request_queries.observe(timings.queries, labels)
+
+    def expose(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in (
+            self.requests, self.request_duration, self.request_phase, self.request_queries,
+            self.query_duration, self.slow_queries
+        ):
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+# Create a single shared instance of the metrics
+metrics = Metrics()
+
+def record_render(seconds: float) -> None:
+    """Add template rendering time to the current request"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.render += seconds
+
+class RenderTimer:
+    """Times rendering interleaved with queries, such as a template streamed while its rows are read.
+
+    The time between start() and stop() counts as rendering for the current
+    request, less the SQL time the request spent meanwhile.
+    """
+    __slots__ = ("timings", "started", "db_before")
+
+    def start(self) -> None:
+        self.timings = current_timings.get()
+        self.db_before = self.timings.db if self.timings is not None else 0.0
+        self.started = time.perf_counter()
+
+    def stop(self) -> None:
+        if self.timings is not None:
+            elapsed = time.perf_counter() - self.started
+            self.timings.render += elapsed - (self.timings.db - self.db_before)
+
+def record_serialize(seconds: float) -> None:
+    """Add JSON serialization time to the current request"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.serialize += seconds
+
+def explain_slow_query(conn, statement: str, parameters) -> List[str]:
+    """Plan details of a statement, run on the DBAPI connection that executed it"""
+    explain = conn.connection.cursor()
+    try:
+        explain.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in explain.fetchall()]
+    finally:
+        explain.close()
+
+def instrument_engine(engine, registry: Metrics = metrics) -> None:
+    """Time every statement an engine runs, counting it against the current request.
+
+    Statements slower than settings.SLOW_QUERY_MS are logged with their
+    EXPLAIN QUERY PLAN on SQLite.
+
+    Args:
+        engine: A sync Engine, or the sync_engine of an AsyncEngine
+        registry: Metrics to record into
+    """
+    slow_seconds = settings.SLOW_QUERY_MS / 1000
+    explain_plans = engine.dialect.name == "sqlite"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query_time(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info[QUERY_START_KEY].pop()
+        registry.query_duration.observe(elapsed)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.db += elapsed
+            timings.queries += 1
+        if elapsed < slow_seconds:
+            return
+        registry.slow_queries.inc()
+        plan: List[str] = []
+        if explain_plans and not executemany and statement.lstrip()[:7].upper().startswith(EXPLAINABLE):
+            try:
+                plan = explain_slow_query(conn, statement, parameters)
+            except Exception:
+                logger.debug("Could not explain a slow query", exc_info=True)
+        logger.warning(
+            "Slow query (%.1fms): %s\n%s",
+            elapsed * 1000,
+            " ".join(statement.split()),
+            "\n".join(f"  {detail}" for detail in plan) or "  (no plan)"
+        )
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency, DB/render/serialization time and query count of each request.
+
+    Requests are labelled with the template of the route that handled them
+    (``/api/transactions/{transaction_id}``), so paths with IDs share a series.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = 500
+        started = time.perf_counter()
+
+        async def record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_timings.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.registry.observe_request(scope["method"], route, status, elapsed, timings)
\ No newline at end of file
@@ -0,0 +1,178 @@
+# app/core/recurring.py
+import calendar
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from statistics import median
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Nominal period in days and the tolerance of each cadence. The tolerances
+# absorb month lengths and payments moved to the next business day.
+CADENCES: Dict[str, Tuple[int, int]] = {
+    "weekly": (7, 1),
+    "biweekly": (14, 2),
+    "monthly": (30, 3),
+    "quarterly": (91, 7),
+    "yearly": (365, 10),
+}
+
+# Cadences that keep the day of the month, with their length in months
+MONTHLY_CADENCES = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+# A series needs this many occurrences to be reported
+MIN_OCCURRENCES = 3
+
+# Share of intervals (and of amounts) that must fit the series' cadence (and amount)
+MIN_REGULARITY = 0.75
+
+# Relative distance from the median amount that still counts as the same amount
+AMOUNT_TOLERANCE = Decimal("0.10")
+
+# Tokens with digits (reference numbers, dates, card numbers) and punctuation
+NOISE_PATTERN = re.compile(r"\S*\d\S*|[^\w\s]")
+
+# Distinct descriptions whose normalized form is remembered per detector
+NORMALIZE_CACHE_SIZE = 200_000
+
+# A series: (normalized description, currency, income or expense)
+SeriesKey = Tuple[str, str, bool]
+
+def normalize_description(description: Optional[str]) -> Optional[str]:
+    """Reduce a description to the part that repeats between occurrences.
+
+    "NETFLIX.COM 866-579-7172 ref 0042" and "Netflix.com 866-579-7172 ref
+    0043" both become "netflix com ref".
+
+    Returns:
+        The normalized text, or None if nothing is left
+    """
+    if not description:
+        return None
+    normalized = " ".join(NOISE_PATTERN.sub(" ", description.lower()).split())
+    return normalized or None
+
+def add_cadence(day: date, cadence: str, anchor_day: int) -> date:
+    """The occurrence after ``day`` for a cadence.
+
+    Monthly-based cadences return to ``anchor_day`` (the day of the month
+    the series started on), clamped to the length of shorter months, so a
+    series starting on the 31st does not drift to the 28th.
+    """
+    months = MONTHLY_CADENCES.get(cadence)
+    if months is None:
+        return day + timedelta(days=CADENCES[cadence][0])
+    index = day.year * 12 + (day.month - 1) + months
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+class SeriesState:
+    """The occurrences of one series seen so far, in date order"""
+    __slots__ = ("days", "amounts", "last_row")
+
+    def __init__(self):
+        self.days: List[int] = []
+        self.amounts: List[Decimal] = []
+        self.last_row: Optional[Mapping[str, Any]] = None
+
+class RecurringDetector:
+    """Finds periodic series in a ledger streamed in date order.
+
+    Rows are grouped by normalized description, currency and sign. Because
+    the ledger arrives sorted by date, every series is built already in
+    order and its intervals are just differences between neighbours: one
+    merge pass over the ledger, with no sorting or pairwise comparison.
+    Several rows of a series on one day count as a single occurrence.
+    """
+
+    def __init__(self):
+        self.series: Dict[SeriesKey, SeriesState] = {}
+        self.normalized: Dict[str, Optional[str]] = {}
+        self.scanned = 0
+        self.last_day: Optional[int] = None
+
+    def add(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Fold a chunk of rows, which must continue the ledger's date order"""
+        normalized_cache = self.normalized
+        for row in rows:
+            self.scanned += 1
+            description = row["description"]
+            if not description:
+                continue
+            normalized = normalized_cache.get(description, False)
+            if normalized is False:
+                normalized = normalize_description(description)
+                if len(normalized_cache) < NORMALIZE_CACHE_SIZE:
+                    normalized_cache[description] = normalized
+            if normalized is None:
+                continue
+            key = (normalized, row["currency"], row["amount"] > 0)
+            state = self.series.get(key)
+            if state is None:
+                state = self.series[key] = SeriesState()
+            day = row["date"].toordinal()
+            if not state.days or state.days[-1] != day:
+                state.days.append(day)
+                state.amounts.append(row["amount"])
+            state.last_row = row
+            self.last_day = day
+
+    def candidates(
+        self,
+        min_occurrences: int = MIN_OCCURRENCES,
+        as_of: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Describe every series regular enough in timing and amount to be recurring.
+
+        Series whose next occurrence is overdue by more than a whole period
+        at ``as_of`` (by default the last day in the ledger) have stopped
+        and are left out.
+
+        Returns:
+            One dict per series, the most frequent first
+        """
+        if self.last_day is None:
+            return []
+        today = as_of.toordinal() if as_of else self.last_day
+        found = []
+        for (normalized, currency, _), state in self.series.items():
+            days = state.days
+            if len(days) < min_occurrences:
+                continue
+            intervals = [later - earlier for earlier, later in zip(days, days[1:])]
+            typical = median(intervals)
+            cadence = next(
+                (name for name, (period, tolerance) in CADENCES.items()
+                 if abs(typical - period) <= tolerance),
+                None
+            )
+            if cadence is None:
+                continue
+            period, tolerance = CADENCES[cadence]
+            regular = sum(1 for interval in intervals if abs(interval - period) <= tolerance)
+            if regular < MIN_REGULARITY * len(intervals):
+                continue
+            amount = median(state.amounts)
+            steady = sum(1 for value in state.amounts if abs(value - amount) <= abs(amount) * AMOUNT_TOLERANCE)
+            if steady < MIN_REGULARITY * len(state.amounts):
+                continue
+            if today - days[-1] > 2 * period + tolerance:
+                continue
+
+            last_row = state.last_row
+            first_date, last_date = date.fromordinal(days[0]), date.fromordinal(days[-1])
+            found.append({
+                "description": last_row["description"],
+                "normalized_description": normalized,
+                "cadence": cadence,
+                "amount": last_row["amount"],
+                "currency": currency,
+                "category_id": last_row["category_id"],
+                "account_id": last_row["account_id"],
+                "occurrences": len(days),
+                "first_date": first_date,
+                "last_date": last_date,
+                "next_date": add_cadence(last_date, cadence, first_date.day),
+                "regularity": round(regular / len(intervals), 3),
+            })
+        found.sort(key=lambda candidate: (-candidate["occurrences"], candidate["normalized_description"]))
+        return found
@@ -1,16 +1,191 @@
 # app/core/templates.py
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, Template, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.config import settings
+from app.core.cache import fragment_cache
+from app.core.metrics import RenderTimer, record_render
 from app.utils.date_utils import get_current_year
 from app.utils.template_utils import add_template_globals
 from app.utils.filter_utils import pluralize
 
-# Create a single shared instance of templates
-templates = Jinja2Templates(directory="app/templates")
+# Characters of streamed HTML gathered before a chunk is sent
+STREAM_BUFFER_CHARS = 16 * 1024
 
-# Add global functions
-add_template_globals(templates.env, {
-    "current_year": get_current_year
-})
+# Output piece {% flush %} stands for in a streamed template
+FLUSH_MARKER = "\x00flush\x00"
 
-# Add custom filters
-templates.env.filters["pluralize"] = pluralize
\ No newline at end of file
+class TimedTemplate(Template):
+    """Template whose rendering time counts towards the current request's metrics"""
+
+    def render(self, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            record_render(time.perf_counter() - started)
+
+class FragmentCacheExtension(Extension):
+    """``{% cache key, versions %}...{% endcache %}`` renders its body once per key and versions.
+
+    ``versions`` is a snapshot of the table versions the body reads, taken
+    before the data was queried; the block is rendered uncached when it is
+    missing, so templates shared with routes that do not pass one still work.
+    Fragments also expire after RESPONSE_CACHE_TTL_SECONDS, as writes from
+    other processes do not bump the versions.
+    """
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        parser.stream.expect("comma")
+        versions = parser.parse_expression()
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("render_cached", [key, versions]), [], [], body
+        ).set_lineno(lineno)
+
+    def render_cached(self, key: str, versions: Optional[Tuple[int, ...]], caller: Callable[[], Any]) -> Any:
+        # In an async environment caller() returns an awaitable, and so may this
+        if not versions:
+            return caller()
+        fragment = fragment_cache.get(key, versions)
+        if fragment is not None:
+            return fragment
+        if self.environment.is_async:
+            return self.store_async(key, versions, caller())
+        return self.store(key, versions, caller())
+
+    def store(self, key: str, versions: Tuple[int, ...], rendered: str) -> Markup:
+        fragment = Markup(rendered)
+        fragment_cache.put(key, versions, fragment)
+        return fragment
+
+    async def store_async(self, key: str, versions: Tuple[int, ...], rendering: Awaitable[str]) -> Markup:
+        return self.store(key, versions, await rendering)
+
+class StreamFlushExtension(Extension):
+    """``{% flush %}`` sends the output rendered so far when a template is streamed.
+
+    Place it before anything slow to produce, such as rows read from the
+    database, so the browser can start on the page meanwhile. It renders
+    nothing outside stream_template.
+    """
+    tags = {"flush"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        if not self.environment.is_async:
+            return []
+        return nodes.Output([nodes.TemplateData(FLUSH_MARKER)]).set_lineno(lineno)
+
+# Environment options that change the code a template compiles to
+COMPILE_OPTIONS = {
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+    "extensions": [FragmentCacheExtension, StreamFlushExtension]
+}
+
+def bytecode_cache(directory: str, options: Dict[str, Any]) -> Optional[FileSystemBytecodeCache]:
+    """On-disk cache of compiled templates, or None when ``directory`` is empty
+
+    Jinja only checks a template's source against its cached bytecode, so
+    the file names also carry a fingerprint of the compile options: changing
+    them recompiles every template instead of reusing stale code.
+    """
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    fingerprint = hashlib.blake2b(repr(sorted(options.items())).encode(), digest_size=6).hexdigest()
+    return FileSystemBytecodeCache(directory, pattern=f"__jinja2_{fingerprint}_%s.cache")
+
+def create_templates(**options: Any) -> Jinja2Templates:
+    """Templates from app/templates with the app's globals, filters and caches"""
+    options = {**COMPILE_OPTIONS, **options}
+    instance = Jinja2Templates(
+        directory="app/templates",
+        bytecode_cache=bytecode_cache(settings.TEMPLATE_CACHE_DIR, options),
+        auto_reload=settings.DEBUG,
+        **options
+    )
+    
+    # Add global functions
+    add_template_globals(instance.env, {
+        "current_year": get_current_year,
+        "now": datetime.now
+    })
+    
+    # Add custom filters
+    instance.env.filters["pluralize"] = pluralize
+    return instance
+
+# Create single shared instances of templates: one rendering whole
+# responses, and one whose generate_async() streams them and whose for
+# loops can read async iterators
+templates = create_templates()
+if settings.METRICS_ENABLED:
+    templates.env.template_class = TimedTemplate
+streaming_templates = create_templates(enable_async=True)
+
+async def stream_template(
+    name: str,
+    context: Dict[str, Any],
+    buffer_chars: int = STREAM_BUFFER_CHARS
+) -> AsyncIterator[str]:
+    """Render a template progressively, yielding its output in chunks.
+
+    generate_async() produces many small pieces, which are joined until
+    ``buffer_chars`` have been rendered or a ``{% flush %}`` is reached.
+    The time spent producing each chunk, less the SQL it ran, is recorded
+    as the request's render time.
+
+    Args:
+        name: Template name
+        context: Template context; it may hold async iterators to loop over
+        buffer_chars: Characters to gather before yielding a chunk
+    """
+    template = streaming_templates.get_template(name)
+    pending: List[str] = []
+    size = 0
+    timer = RenderTimer()
+    timer.start()
+    async for piece in template.generate_async(context):
+        if piece == FLUSH_MARKER:
+            if pending:
+                timer.stop()
+                yield "".join(pending)
+                timer.start()
+                pending, size = [], 0
+            continue
+        pending.append(piece)
+        size += len(piece)
+        if size >= buffer_chars:
+            timer.stop()
+            yield "".join(pending)
+            timer.start()
+            pending, size = [], 0
+    timer.stop()
+    if pending:
+        yield "".join(pending)
+
+def precompile_templates() -> int:
+    """Load every template, for both renderers, so the first requests do not pay for compiling them.
+
+    With a bytecode cache, templates compiled by an earlier run are read
+    from disk instead of being compiled again.
+
+    Returns:
+        The number of templates loaded
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+        streaming_templates.env.get_template(name)
+    return len(names)
\ No newline at end of file
@@ -1,26 +1,110 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator, Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Generator, List
 
-from app.config import settings
+from app.config import settings, Settings
+from app.core.metrics import instrument_engine
+
+# SQLite allows one writer at a time, so writes share a single connection
+WRITE_POOL_SIZE = 1
+
+def sqlite_pragmas(config: Settings, read_only: bool = False) -> List[str]:
+    """Build the PRAGMA statements for a connection.
+
+    Args:
+        config: Settings holding the SQLite performance profile
+        read_only: Whether the connection belongs to the read-only pool
+
+    Returns:
+        PRAGMA statements to run on connect, in order
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = {int(config.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size = {int(config.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA temp_store = {config.SQLITE_TEMP_STORE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # The journal mode is persistent in the file, so the writer sets it
+        pragmas.insert(0, f"PRAGMA journal_mode = {config.SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+def apply_sqlite_pragmas(engine, pragmas: List[str]) -> None:
+    """Run the given PRAGMA statements on every new DBAPI connection.
+
+    Args:
+        engine: A sync Engine, or the sync_engine of an AsyncEngine
+        pragmas: Statements from sqlite_pragmas
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def create_write_engine(config: Settings) -> AsyncEngine:
+    """Create the async engine for writes: a single connection, so writers queue in the pool"""
+    # aiosqlite defaults to NullPool, which would open a new connection per session
+    write_engine = create_async_engine(
+        config.ASYNC_DATABASE_URL,
+        echo=config.DEBUG,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=WRITE_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=config.DB_POOL_TIMEOUT
+    )
+    apply_sqlite_pragmas(write_engine.sync_engine, sqlite_pragmas(config))
+    if config.METRICS_ENABLED:
+        instrument_engine(write_engine.sync_engine)
+    return write_engine
+
+def create_read_engine(config: Settings) -> AsyncEngine:
+    """Create the async engine for reads: a pool of query_only connections"""
+    read_engine = create_async_engine(
+        config.ASYNC_DATABASE_URL,
+        echo=config.DEBUG,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.DB_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=config.DB_POOL_TIMEOUT
+    )
+    apply_sqlite_pragmas(read_engine.sync_engine, sqlite_pragmas(config, read_only=True))
+    if config.METRICS_ENABLED:
+        instrument_engine(read_engine.sync_engine)
+    return read_engine
 
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG
 )
+apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
 
-# Create async engine
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    echo=settings.DEBUG
-)
+# Create async engines
+async_engine = create_write_engine(settings)
+async_read_engine = create_read_engine(settings)
 
-# Create sessionmaker for async sessions
+# Create sessionmakers for async sessions
 async_session = sessionmaker(
-    async_engine, 
-    class_=AsyncSession, 
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+async_read_session = sessionmaker(
+    async_read_engine,
+    class_=AsyncSession,
     expire_on_commit=False
 )
 
@@ -34,4 +118,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting a read-only async db session from the reader pool"""
+    async with async_read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
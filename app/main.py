@@ -1,27 +1,61 @@
-from fastapi import FastAPI, Request, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Depends, HTTPException, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.templates import templates
+from app.core.templates import templates, precompile_templates
+from app.core.cache import ResponseCacheMiddleware, cache_response, response_cache
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.serialization import TimedJSONResponse
+from app.core.fx import MissingRateError
+from app.core.jobs import job_runner
 from app.config import settings
-from app.db import get_db, engine
-from app.api import transactions, categories
+from app.db import get_read_db, engine, async_session
+from app.api import transactions, categories, reports, rules, accounts, budgets, recurring, jobs
 from app.queries import transactions as transaction_queries
 from app.queries import categories as category_queries
+from app.queries import dashboard as dashboard_queries
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile the templates, then run background jobs for as long as the app serves requests"""
+    precompile_templates()
+    if settings.JOBS_ENABLED:
+        await job_runner.start(async_session)
+    yield
+    await job_runner.stop()
 
 # Create the FastAPI app
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=TimedJSONResponse)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+# Serve unchanged GET responses from the in-process cache
+if settings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
+# Record request metrics; added last so it also times responses served from the cache
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Include routers
 app.include_router(transactions.router, tags=["transactions"])
 app.include_router(categories.router, tags=["categories"])
+app.include_router(reports.router, tags=["reports"])
+app.include_router(rules.router, tags=["rules"])
+app.include_router(accounts.router, tags=["accounts"])
+app.include_router(budgets.router, tags=["budgets"])
+app.include_router(recurring.router, tags=["recurring"])
+app.include_router(jobs.router, tags=["jobs"])
 
 # Root route
 @app.get("/")
-async def index(request: Request, db: AsyncSession = Depends(get_db)):
+@cache_response(
+    "transactions", "categories", "category_stats", "monthly_category_totals",
+    "daily_category_totals", "fx_rates"
+)
+async def index(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Home page with dashboard"""
     # Get recent transactions
     recent_transactions = await transaction_queries.list_transactions(db, limit=5)
@@ -29,18 +63,12 @@ async def index(request: Request, db: AsyncSession = Depends(get_db)):
     # Get categories with counts
     categories = await category_queries.list_categories_with_counts(db)
     
-    # Calculate basic statistics
-    total_transactions = sum(cat["transaction_count"] for cat in categories)
-    
-    # Sum of all transaction amounts
-    total_spending = sum(
-        transaction.amount if transaction.amount < 0 else 0 
-        for transaction in recent_transactions
-    )
-    total_income = sum(
-        transaction.amount if transaction.amount > 0 else 0 
-        for transaction in recent_transactions
-    )
+    # Totals are aggregated in SQL from the monthly rollup, plus converted
+    # daily totals for transactions in other currencies
+    try:
+        stats = await dashboard_queries.get_dashboard_stats(db)
+    except MissingRateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     
     return templates.TemplateResponse(
         "index.html",
@@ -48,12 +76,7 @@ async def index(request: Request, db: AsyncSession = Depends(get_db)):
             "request": request,
             "recent_transactions": recent_transactions,
             "categories": categories,
-            "stats": {
-                "total_transactions": total_transactions,
-                "total_spending": abs(total_spending),
-                "total_income": total_income,
-                "net": total_income + total_spending  # Spending is negative
-            }
+            "stats": stats
         }
     )
 
@@ -63,6 +86,18 @@ async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+# Response cache metrics
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache hit/miss counters"""
+    return response_cache.stats()
+
+# Prometheus metrics
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request and query metrics in the Prometheus text format"""
+    return Response(content=metrics.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Run the application
 if __name__ == "__main__":
     import uvicorn
@@ -1,6 +1,19 @@
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator, PlainSerializer
+import re
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Optional, List, Literal, Dict, Any
+from typing_extensions import Annotated
+
+from app.config import settings
+
+# Amounts are exact Decimals with at most two decimal places, matching the
+# integer cents they are stored as, and plain numbers in JSON
+Money = Annotated[
+    Decimal,
+    Field(decimal_places=2),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
 
 class CategoryBase(BaseModel):
     name: str
@@ -9,6 +22,10 @@ class CategoryBase(BaseModel):
 class CategoryCreate(CategoryBase):
     pass
 
+class CategoryUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+
 class Category(CategoryBase):
     id: int
     created_at: datetime
@@ -16,10 +33,19 @@ class Category(CategoryBase):
     model_config = ConfigDict(from_attributes=True)
 
 class TransactionBase(BaseModel):
-    amount: float
+    amount: Money
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=r"^[A-Z]{3}$")
     description: Optional[str] = None
     date: datetime = Field(default_factory=datetime.now)
     category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    
+    # Imported files may leave the currency blank or write it in lower case
+    @field_validator('currency', mode='before')
+    def default_currency(cls, v):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return settings.DEFAULT_CURRENCY
+        return v.strip().upper() if isinstance(v, str) else v
 
 class TransactionCreate(TransactionBase):
     # Replace validator with field_validator in Pydantic v2
@@ -29,6 +55,20 @@ class TransactionCreate(TransactionBase):
             raise ValueError('Amount cannot be zero')
         return v
 
+class TransactionUpdate(BaseModel):
+    amount: Optional[Money] = None
+    currency: Optional[str] = Field(default=None, pattern=r"^[A-Z]{3}$")
+    description: Optional[str] = None
+    date: Optional[datetime] = None
+    category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    
+    @field_validator('amount')
+    def amount_must_be_nonzero(cls, v):
+        if v == 0:
+            raise ValueError('Amount cannot be zero')
+        return v
+
 class Transaction(TransactionBase):
     id: int
     created_at: datetime
@@ -36,4 +76,310 @@ class Transaction(TransactionBase):
     model_config = ConfigDict(from_attributes=True)
 
 class TransactionWithCategory(Transaction):
-    category: Optional[Category] = None
\ No newline at end of file
+    category: Optional[Category] = None
+
+class TransactionFilter(BaseModel):
+    start: Optional[date] = None
+    end: Optional[date] = None
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    sign: Optional[Literal["income", "expense"]] = None
+    category_ids: List[int] = []
+    uncategorized: bool = False
+    q: Optional[str] = None
+    
+    # HTML forms submit empty strings for fields left blank
+    @field_validator('start', 'end', 'min_amount', 'max_amount', 'sign', 'q', mode='before')
+    def blank_means_unset(cls, v):
+        return None if isinstance(v, str) and not v.strip() else v
+    
+    @field_validator('category_ids', mode='before')
+    def drop_blank_categories(cls, v):
+        return [item for item in v if item != ""] if isinstance(v, list) else v
+    
+    @field_validator('uncategorized', mode='before')
+    def blank_means_false(cls, v):
+        return False if v is None or v == "" else v
+
+class ResultCount(BaseModel):
+    count: int
+    exact: bool = True
+
+class TransactionPage(BaseModel):
+    items: List[TransactionWithCategory]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[ResultCount] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+class DashboardStats(BaseModel):
+    total_transactions: int
+    total_income: Money
+    total_spending: Money
+    net: Money
+    month_income: Money
+    month_spending: Money
+    month_net: Money
+    year_income: Money
+    year_spending: Money
+    year_net: Money
+    currency: str = settings.BASE_CURRENCY
+
+class TimeseriesPoint(BaseModel):
+    bucket: str
+    category_id: Optional[int] = None
+    transaction_count: int
+    income: Money
+    spending: Money
+    net: Money
+    currency: str = settings.BASE_CURRENCY
+
+class TransactionBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    data: Dict[str, Any] = {}
+
+class TransactionBatch(BaseModel):
+    operations: List[TransactionBatchOperation]
+    atomic: bool = True
+
+class CategoryBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete", "merge"]
+    id: Optional[int] = None
+    into: Optional[int] = None
+    data: Dict[str, Any] = {}
+
+class CategoryBatch(BaseModel):
+    operations: List[CategoryBatchOperation]
+    atomic: bool = True
+
+class BatchItemResult(BaseModel):
+    index: int
+    op: str
+    ok: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    applied: bool
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+class CategorizationRuleBase(BaseModel):
+    category_id: int
+    pattern: Optional[str] = None
+    match_type: Literal["contains", "regex"] = "contains"
+    min_amount: Optional[Money] = None
+    max_amount: Optional[Money] = None
+    priority: int = 0
+
+class CategorizationRuleCreate(CategorizationRuleBase):
+    @field_validator('pattern', mode='before')
+    def blank_means_unset(cls, v):
+        return None if isinstance(v, str) and not v.strip() else v
+    
+    @model_validator(mode='after')
+    def check_conditions(self):
+        if self.pattern is None and self.min_amount is None and self.max_amount is None:
+            raise ValueError('A rule needs a pattern or an amount range')
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValueError('min_amount cannot be greater than max_amount')
+        if self.pattern is not None and self.match_type == "regex":
+            try:
+                re.compile(self.pattern)
+            except re.error as exc:
+                raise ValueError(f'Invalid regular expression: {exc}')
+        return self
+
+class CategorizationRule(CategorizationRuleBase):
+    id: int
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class CategorizationResult(BaseModel):
+    scanned: int
+    categorized: int
+    elapsed_seconds: float
+    rows_per_second: float
+
+class FxRateCreate(BaseModel):
+    currency: str = Field(pattern=r"^[A-Z]{3}$")
+    date: date
+    rate: Decimal = Field(gt=0)
+    
+    @field_validator('currency', mode='before')
+    def upper_case_currency(cls, v):
+        return v.strip().upper() if isinstance(v, str) else v
+
+class AccountBase(BaseModel):
+    name: str
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=r"^[A-Z]{3}$")
+    opening_balance: Money = Decimal(0)
+    
+    @field_validator('currency', mode='before')
+    def upper_case_currency(cls, v):
+        return v.strip().upper() if isinstance(v, str) else v
+
+class AccountCreate(AccountBase):
+    pass
+
+class Account(AccountBase):
+    id: int
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class AccountBalance(BaseModel):
+    account_id: int
+    as_of: date
+    balance: Money
+    currency: str
+    checkpoint_month: Optional[str] = None
+
+class RunningBalanceEntry(Transaction):
+    balance: Money
+
+class RunningBalancePage(BaseModel):
+    account_id: int
+    opening_balance: Money
+    items: List[RunningBalanceEntry]
+    next_cursor: Optional[str] = None
+
+class BudgetBase(BaseModel):
+    amount: Money = Field(gt=0)
+
+class BudgetCreate(BudgetBase):
+    pass
+
+class Budget(BudgetBase):
+    category_id: int
+    category_name: str
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class BudgetStatus(BaseModel):
+    category_id: int
+    category_name: str
+    budget: Money
+    spent: Money
+    remaining: Money
+    percent_used: float
+    projected: Money
+    projected_over: bool
+    currency: str = settings.BASE_CURRENCY
+
+class BudgetReport(BaseModel):
+    month: str
+    days_elapsed: int
+    days_in_month: int
+    total_budget: Money
+    total_spent: Money
+    total_projected: Money
+    items: List[BudgetStatus]
+    currency: str = settings.BASE_CURRENCY
+
+Cadence = Literal["weekly", "biweekly", "monthly", "quarterly", "yearly"]
+
+class RecurringRuleBase(BaseModel):
+    description: Optional[str] = None
+    amount: Money
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=r"^[A-Z]{3}$")
+    category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    cadence: Cadence
+    start_date: date
+    end_date: Optional[date] = None
+    
+    @field_validator('amount')
+    def amount_must_be_nonzero(cls, v):
+        if v == 0:
+            raise ValueError('Amount cannot be zero')
+        return v
+    
+    @field_validator('currency', mode='before')
+    def upper_case_currency(cls, v):
+        return v.strip().upper() if isinstance(v, str) else v
+    
+    @model_validator(mode='after')
+    def check_dates(self):
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError('end_date cannot be before start_date')
+        return self
+
+class RecurringRuleCreate(RecurringRuleBase):
+    pass
+
+class RecurringRule(RecurringRuleBase):
+    id: int
+    next_date: date
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class RecurringCandidate(BaseModel):
+    description: str
+    normalized_description: str
+    cadence: Cadence
+    amount: Money
+    currency: str
+    category_id: Optional[int] = None
+    account_id: Optional[int] = None
+    occurrences: int
+    first_date: date
+    last_date: date
+    next_date: date
+    regularity: float
+
+class RecurringDetection(BaseModel):
+    scanned: int
+    series: int
+    candidates: List[RecurringCandidate]
+    elapsed_seconds: float
+    rows_per_second: float
+
+class RecurringGeneration(BaseModel):
+    through: date
+    rules: int
+    generated: int
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    params: Dict[str, Any]
+    progress: Optional[Dict[str, Any]] = None
+    done: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+    
+    @property
+    def percent(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return round(min(self.done / self.total, 1.0) * 100, 1)
\ No newline at end of file
@@ -1,7 +1,29 @@
-from sqlalchemy import Table, Column, Integer, String, Float, DateTime, ForeignKey, MetaData
+from sqlalchemy import (
+    Table, Column, Integer, String, Float, Date, DateTime, ForeignKey, MetaData, Index, DDL, event,
+    table, column, TypeDecorator, Boolean, Text, JSON
+)
 from sqlalchemy.sql import func
 from datetime import datetime
 
+from app.config import settings
+from app.utils.money_utils import to_cents, from_cents
+
+class Cents(TypeDecorator):
+    """Money stored as an INTEGER number of cents and read back as a Decimal.
+
+    Bound values (including literals in comparisons) are converted to cents,
+    so SQL expressions on these columns keep using currency units in Python
+    while SQLite sums and indexes plain integers.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
+
 # Metadata instance that holds the schema definitions
 metadata = MetaData()
 
@@ -15,14 +37,229 @@ categories = Table(
     Column('created_at', DateTime, default=func.now(), nullable=False),
 )
 
+# Accounts table. Balances are opening_balance plus the account's transactions.
+accounts = Table(
+    'accounts',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False, unique=True),
+    Column('currency', String(3), nullable=False, default=settings.DEFAULT_CURRENCY),
+    Column('opening_balance', Cents, nullable=False, default=0),
+    Column('created_at', DateTime, default=func.now(), nullable=False),
+)
+
 # Transactions table
 transactions = Table(
     'transactions',
     metadata,
     Column('id', Integer, primary_key=True),
-    Column('amount', Float, nullable=False),
+    Column('amount', Cents, nullable=False),
+    Column('currency', String(3), nullable=False, default=settings.DEFAULT_CURRENCY),
     Column('description', String(255)),
     Column('date', DateTime, nullable=False, default=func.now()),
     Column('category_id', Integer, ForeignKey('categories.id')),
+    Column('account_id', Integer, ForeignKey('accounts.id')),
     Column('created_at', DateTime, default=func.now(), nullable=False),
-)
\ No newline at end of file
+    # Keyset pagination walks (date, id) newest first, optionally within a category
+    Index('ix_transactions_date_id', 'date', 'id'),
+    Index('ix_transactions_category_id_date_id', 'category_id', 'date', 'id'),
+    # Balance deltas and running balances read an account's rows by date
+    Index('ix_transactions_account_id_date_id', 'account_id', 'date', 'id'),
+)
+
+# Per-category aggregates kept in step with transactions by the write
+# functions in app.queries.transactions. Uncategorized transactions are
+# tracked under category_id 0.
+category_stats = Table(
+    'category_stats',
+    metadata,
+    Column('category_id', Integer, primary_key=True, autoincrement=False),
+    Column('transaction_count', Integer, nullable=False, default=0),
+    Column('income_total', Cents, nullable=False, default=0),
+    Column('spending_total', Cents, nullable=False, default=0),
+    Column('first_date', DateTime),
+    Column('last_date', DateTime),
+)
+
+# Per-(month, category, currency) totals kept in step with transactions,
+# used for dashboard and period statistics. Months are 'YYYY-MM' strings and
+# uncategorized transactions use category_id 0, as in category_stats. Totals
+# are in the transactions' own currency.
+monthly_category_totals = Table(
+    'monthly_category_totals',
+    metadata,
+    Column('month', String(7), primary_key=True),
+    Column('category_id', Integer, primary_key=True, autoincrement=False),
+    Column('currency', String(3), primary_key=True),
+    Column('transaction_count', Integer, nullable=False, default=0),
+    Column('income_total', Cents, nullable=False, default=0),
+    Column('spending_total', Cents, nullable=False, default=0),
+)
+
+# Per-(day, category, currency) totals kept in step with transactions, used
+# for daily and weekly report buckets and for converting other currencies at
+# the rate of the day. Days are 'YYYY-MM-DD' strings.
+daily_category_totals = Table(
+    'daily_category_totals',
+    metadata,
+    Column('day', String(10), primary_key=True),
+    Column('category_id', Integer, primary_key=True, autoincrement=False),
+    Column('currency', String(3), primary_key=True),
+    Column('transaction_count', Integer, nullable=False, default=0),
+    Column('income_total', Cents, nullable=False, default=0),
+    Column('spending_total', Cents, nullable=False, default=0),
+    # Finds the rows in currencies other than the base one without a scan
+    Index('ix_daily_category_totals_currency_day', 'currency', 'day'),
+)
+
+# Month-end balance checkpoints per account: balance is the sum of the
+# account's transactions dated before the month after 'YYYY-MM' month
+# in the account's currency (opening_balance and other currencies excluded).
+# Written by app.queries.accounts for complete months; a write to an
+# account's transactions adds its delta to the checkpoints from the month it
+# changed onwards, in the same DB transaction.
+account_balance_checkpoints = Table(
+    'account_balance_checkpoints',
+    metadata,
+    Column('account_id', Integer, ForeignKey('accounts.id'), primary_key=True, autoincrement=False),
+    Column('month', String(7), primary_key=True),
+    Column('balance', Cents, nullable=False),
+)
+
+# Exchange rates into settings.BASE_CURRENCY, loaded from a local CSV file.
+# rate is the amount of base currency one unit of currency bought on date.
+fx_rates = Table(
+    'fx_rates',
+    metadata,
+    Column('currency', String(3), primary_key=True),
+    Column('date', Date, primary_key=True),
+    Column('rate', Float, nullable=False),
+)
+
+# Auto-categorization rules. A rule matches a transaction whose description
+# contains (or, for match_type 'regex', matches) pattern and whose amount lies
+# in [min_amount, max_amount]; unset conditions always hold. The first
+# matching rule by priority (highest first), then id, assigns its category.
+categorization_rules = Table(
+    'categorization_rules',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), nullable=False),
+    Column('pattern', String(255)),
+    Column('match_type', String(10), nullable=False, default='contains'),
+    Column('min_amount', Cents),
+    Column('max_amount', Cents),
+    Column('priority', Integer, nullable=False, default=0),
+    Column('created_at', DateTime, default=func.now(), nullable=False),
+)
+
+# Monthly spending limits per category, in settings.BASE_CURRENCY. The same
+# amount applies to every month; actual spending comes from
+# monthly_category_totals (and daily_category_totals for other currencies).
+budgets = Table(
+    'budgets',
+    metadata,
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True, autoincrement=False),
+    Column('amount', Cents, nullable=False),
+    Column('created_at', DateTime, default=func.now(), nullable=False),
+)
+
+# Scheduled transactions. Each rule creates a transaction on next_date and
+# moves next_date on by its cadence until end_date (inclusive) is passed;
+# monthly-based cadences keep the day of the month of start_date.
+recurring_rules = Table(
+    'recurring_rules',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('description', String(255)),
+    Column('amount', Cents, nullable=False),
+    Column('currency', String(3), nullable=False, default=settings.DEFAULT_CURRENCY),
+    Column('category_id', Integer, ForeignKey('categories.id')),
+    Column('account_id', Integer, ForeignKey('accounts.id')),
+    Column('cadence', String(10), nullable=False),
+    Column('start_date', Date, nullable=False),
+    Column('next_date', Date, nullable=False),
+    Column('end_date', Date),
+    Column('created_at', DateTime, default=func.now(), nullable=False),
+    # Finds the rules that are due without reading the others
+    Index('ix_recurring_rules_next_date', 'next_date'),
+)
+
+# Background jobs, run by app.core.jobs. progress is the handler's latest
+# checkpoint and is committed in the same DB transaction as the chunk it
+# covers, so a job interrupted by a restart resumes from it; done/total
+# drive the progress bar. A cancelled job keeps the chunks it committed.
+jobs = Table(
+    'jobs',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('kind', String(40), nullable=False),
+    Column('status', String(10), nullable=False, default='queued'),
+    Column('params', JSON, nullable=False),
+    Column('progress', JSON),
+    Column('done', Integer, nullable=False, default=0),
+    Column('total', Integer),
+    Column('result', JSON),
+    Column('error', Text),
+    Column('cancel_requested', Boolean, nullable=False, default=False),
+    Column('created_at', DateTime, default=func.now(), nullable=False),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    # Workers look up the oldest queued job without reading finished ones
+    Index('ix_jobs_status', 'status', 'id'),
+)
+
+# Full-text index over transactions.description. SQLAlchemy cannot describe
+# FTS5 virtual tables, so it is created with raw DDL whenever transactions is
+# created. It is an external-content index (the text is only stored once, in
+# transactions) kept in step by triggers, so every write path, including bulk
+# imports and maintenance scripts, updates it in the same DB transaction.
+TRANSACTIONS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description,
+        content='transactions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+for statement in TRANSACTIONS_FTS_DDL:
+    event.listen(transactions, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    transactions,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS transactions_fts").execute_if(dialect="sqlite")
+)
+
+# Lightweight handle on the FTS table for queries; it is deliberately not part
+# of metadata. rowid is the transaction id and rank is the bm25 score.
+transactions_fts = table(
+    'transactions_fts',
+    column('rowid', Integer),
+    column('description', String),
+    column('rank', Float),
+)
+
+# Names of FTS tables and their shadow tables, which autogenerate must ignore
+FTS_TABLE_PREFIXES = ('transactions_fts',)
\ No newline at end of file
@@ -0,0 +1,465 @@
+from sqlalchemy import select, insert, update, delete, func, tuple_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Iterable, Mapping, Tuple
+from datetime import date, datetime, time as day_start, timedelta
+from decimal import Decimal
+
+from app.models.schema import Cents, accounts, transactions, account_balance_checkpoints
+from app.models.domain import (
+    Account, AccountCreate, AccountBalance, RunningBalanceEntry, RunningBalancePage
+)
+from app.core.cache import mark_changed
+from app.queries.daily_totals import month_start
+from app.utils.date_utils import month_key, add_months
+from app.utils.pagination_utils import encode_cursor, decode_cursor
+
+# Tables that account writes touch
+ACCOUNT_TABLES = ("accounts",)
+
+# A position in an account's (date, id) order; balances are taken through it
+Position = Tuple[datetime, int]
+
+# Pure function to build a query for listing accounts
+def list_accounts_query():
+    """Build a query for listing accounts by name"""
+    return select(accounts).order_by(accounts.c.name)
+
+# Pure function to build a query for getting a single account
+def get_account_query(account_id: int):
+    """Build a query to get a single account by ID"""
+    return (
+        select(accounts)
+        .where(accounts.c.id == account_id)
+    )
+
+# Pure function to build an insert statement for creating an account
+def create_account_statement(account_data: AccountCreate):
+    """Build an insert statement for creating an account"""
+    return (
+        insert(accounts)
+        .values(**account_data.dict())
+        .returning(accounts)
+    )
+
+# Pure function to build a delete statement for deleting an account
+def delete_account_statement(account_id: int):
+    """Build a delete statement for deleting an account"""
+    return (
+        delete(accounts)
+        .where(accounts.c.id == account_id)
+    )
+
+# Pure function to build a delete statement for an account's checkpoints
+def delete_account_checkpoints_statement(account_id: int):
+    """Build a delete statement for every checkpoint of an account"""
+    return (
+        delete(account_balance_checkpoints)
+        .where(account_balance_checkpoints.c.account_id == account_id)
+    )
+
+# Pure function to build a query for the currencies of some accounts
+def account_currencies_query(account_ids: Iterable[int]):
+    """Build a query for the (id, currency) of the given accounts"""
+    return select(accounts.c.id, accounts.c.currency).where(accounts.c.id.in_(list(account_ids)))
+
+# Pure function to build a query for whether an account has transactions
+def account_has_transactions_query(account_id: int):
+    """Build a query returning one transaction ID of the account, if any"""
+    return (
+        select(transactions.c.id)
+        .where(transactions.c.account_id == account_id)
+        .limit(1)
+    )
+
+# Pure function to build a query for the checkpoint a balance starts from
+def latest_checkpoint_query(account_id: int, before_month: Optional[str] = None):
+    """Build a query for the account's latest checkpoint with month < before_month
+
+    A primary key seek returning at most one row.
+    """
+    checkpoints = account_balance_checkpoints.c
+    query = (
+        select(checkpoints.month, checkpoints.balance)
+        .where(checkpoints.account_id == account_id)
+        .order_by(checkpoints.month.desc())
+        .limit(1)
+    )
+    if before_month is not None:
+        query = query.where(checkpoints.month < before_month)
+    return query
+
+# Pure function to build the delta query added to a checkpoint
+def balance_delta_query(
+    account_id: int,
+    currency: str,
+    through: Position,
+    after_month: Optional[str] = None
+):
+    """Build a query summing the account's transactions in currency after after_month, up to and including through
+
+    The bounds are a range seek on ix_transactions_account_id_date_id, so
+    with a recent checkpoint only a few weeks of rows are read.
+    """
+    query = (
+        select(func.coalesce(func.sum(transactions.c.amount), 0))
+        .where(
+            transactions.c.account_id == account_id,
+            tuple_(transactions.c.date, transactions.c.id) <= tuple_(*through),
+            transactions.c.currency == currency
+        )
+    )
+    if after_month is not None:
+        query = query.where(transactions.c.date >= month_start(add_months(after_month, 1)))
+    return query
+
+# Pure function to build a query for the rows of a running balance
+def running_balance_query(account_id: int, after: Position, limit: int = 100):
+    """Build a query for the account's transactions after a (date, id) position, oldest first"""
+    return (
+        select(transactions)
+        .where(
+            transactions.c.account_id == account_id,
+            tuple_(transactions.c.date, transactions.c.id) > tuple_(*after)
+        )
+        .order_by(transactions.c.date, transactions.c.id)
+        .limit(limit)
+    )
+
+# Pure function to build a query for an account's per-month sums
+def account_month_sums_query(account_id: int, currency: str, start: Optional[datetime], end: datetime):
+    """Build a query summing the account's transactions in currency per month for dates in [start, end)"""
+    month = func.strftime('%Y-%m', transactions.c.date)
+    query = (
+        select(month.label('month'), func.sum(transactions.c.amount).label('total'))
+        .where(
+            transactions.c.account_id == account_id,
+            transactions.c.date < end,
+            transactions.c.currency == currency
+        )
+        .group_by(month)
+    )
+    if start is not None:
+        query = query.where(transactions.c.date >= start)
+    return query
+
+# Pure function to build a query for listing stored checkpoints
+def list_checkpoints_query():
+    """Build a query for listing stored checkpoints"""
+    return select(account_balance_checkpoints).order_by(
+        account_balance_checkpoints.c.account_id, account_balance_checkpoints.c.month
+    )
+
+# Pure function to build an insert for checkpoints, executed with a list of rows
+def create_checkpoints_statement():
+    """Build an insert statement for executemany-style checkpoint creation"""
+    return insert(account_balance_checkpoints)
+
+# Pure function to build an update for shifted checkpoints, executed with a list of rows
+def shift_checkpoints_statement():
+    """Build an update adding a delta to an account's checkpoints from a month onwards
+
+    Executed with one {"shift_account_id", "shift_month", "delta"} parameter
+    set per changed (account, month).
+    """
+    checkpoints = account_balance_checkpoints.c
+    return (
+        update(account_balance_checkpoints)
+        .where(
+            checkpoints.account_id == bindparam('shift_account_id'),
+            checkpoints.month >= bindparam('shift_month')
+        )
+        .values(balance=checkpoints.balance + bindparam('delta', type_=Cents))
+    )
+
+# Pure function to build a statement clearing stored checkpoints
+def clear_checkpoints_statement():
+    """Build a delete statement removing all stored checkpoints"""
+    return delete(account_balance_checkpoints)
+
+# Pure function to find how a ledger change moves the checkpoints
+def balance_changes(
+    currencies: Mapping[int, str],
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> Dict[Tuple[int, str], Decimal]:
+    """Net removed and added rows into one balance change per (account, month)
+
+    currencies maps account IDs to their currency; rows in another currency
+    are not part of any balance and are skipped. Edits that leave a month's
+    total alone (a new category or description) give no change.
+    """
+    net: Dict[Tuple[int, str], Decimal] = {}
+    for rows, sign in ((removed, -1), (added, 1)):
+        for row in rows:
+            if row["account_id"] is None or row["currency"] != currencies.get(row["account_id"]):
+                continue
+            key = (row["account_id"], month_key(row["date"]))
+            net[key] = net.get(key, Decimal(0)) + sign * row["amount"]
+    return {key: amount for key, amount in net.items() if amount != 0}
+
+# Pure function to lay out checkpoints month by month
+def cumulative_checkpoints(
+    account_id: int,
+    first_month: str,
+    last_month: str,
+    opening: Decimal,
+    month_sums: Mapping[str, Decimal]
+) -> List[Dict[str, Any]]:
+    """Build one checkpoint row per month in [first_month, last_month], carrying the balance forward"""
+    rows = []
+    balance, month = opening, first_month
+    while month <= last_month:
+        balance += month_sums.get(month, Decimal(0))
+        rows.append({"account_id": account_id, "month": month, "balance": balance})
+        month = add_months(month, 1)
+    return rows
+
+def end_of_day(day: date) -> Position:
+    """The position just after every transaction dated on ``day``"""
+    return (datetime.combine(day + timedelta(days=1), day_start()), 0)
+
+# --- Handler functions that compose the above functions ---
+
+async def list_accounts(db: AsyncSession) -> List[Account]:
+    """List accounts"""
+    result = await db.execute(list_accounts_query())
+    return [Account.from_orm(row) for row in result]
+
+async def get_account(
+    db: AsyncSession,
+    account_id: int
+) -> Optional[Account]:
+    """Get a single account by ID"""
+    result = await db.execute(get_account_query(account_id))
+    row = result.first()
+    return Account.from_orm(row) if row else None
+
+async def create_account(
+    db: AsyncSession,
+    account_data: AccountCreate
+) -> Account:
+    """Create a new account"""
+    # Build statement using pure function
+    stmt = create_account_statement(account_data)
+    
+    # Execute statement (side effect)
+    result = await db.execute(stmt)
+    mark_changed(db, ACCOUNT_TABLES)
+    
+    # Convert to domain model and return
+    return Account.from_orm(result.first())
+
+async def delete_account(
+    db: AsyncSession,
+    account_id: int
+) -> bool:
+    """Delete an account, which must not have transactions
+    
+    Raises:
+        ValueError: If transactions still belong to the account
+    """
+    if (await db.execute(account_has_transactions_query(account_id))).first():
+        raise ValueError("Account still has transactions")
+    await db.execute(delete_account_checkpoints_statement(account_id))
+    result = await db.execute(delete_account_statement(account_id))
+    mark_changed(db, ACCOUNT_TABLES + ("account_balance_checkpoints",))
+    return result.rowcount > 0
+
+async def balance_through(
+    db: AsyncSession,
+    account_id: int,
+    currency: str,
+    position: Position
+) -> Tuple[Decimal, Optional[str]]:
+    """Sum of the account's transactions in its currency up to and including a (date, id) position
+    
+    Starts from the latest checkpoint of a month before the position's and
+    adds the transactions since, so the cost does not grow with history.
+    Opening balances are not included.
+    
+    Returns:
+        The sum and the month of the checkpoint used, if any
+    """
+    checkpoint = (
+        await db.execute(latest_checkpoint_query(account_id, month_key(position[0])))
+    ).first()
+    after_month = checkpoint.month if checkpoint else None
+    delta = (
+        await db.execute(balance_delta_query(account_id, currency, position, after_month))
+    ).scalar()
+    return (checkpoint.balance if checkpoint else Decimal(0)) + delta, after_month
+
+async def get_account_balance(
+    db: AsyncSession,
+    account: Account,
+    as_of: date
+) -> AccountBalance:
+    """Get an account's balance at the end of a day"""
+    total, checkpoint_month = await balance_through(db, account.id, account.currency, end_of_day(as_of))
+    return AccountBalance(
+        account_id=account.id,
+        as_of=as_of,
+        balance=account.opening_balance + total,
+        currency=account.currency,
+        checkpoint_month=checkpoint_month
+    )
+
+async def get_running_balance(
+    db: AsyncSession,
+    account: Account,
+    start: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> RunningBalancePage:
+    """List an account's transactions oldest first, each with the balance after it
+    
+    The page starts at ``start`` (or the first transaction), or after the
+    row a ``next_cursor`` of a previous page points at. Transactions in a
+    currency other than the account's are listed but leave the balance alone.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        _, cursor_date, row_id = decode_cursor(cursor)
+        after: Position = (cursor_date, row_id)
+    elif start is not None:
+        after = (datetime.combine(start, day_start()), 0)
+    else:
+        after = (datetime.min, 0)
+    
+    # The balance before the page comes from a checkpoint plus a small delta
+    if after[0] == datetime.min:
+        opening = account.opening_balance
+    else:
+        total, _ = await balance_through(db, account.id, account.currency, after)
+        opening = account.opening_balance + total
+    
+    # Execute query (side effect), fetching one extra row to detect another page
+    rows = (await db.execute(running_balance_query(account.id, after, limit + 1))).all()
+    has_more = len(rows) > limit
+    
+    items = []
+    balance = opening
+    for row in rows[:limit]:
+        if row.currency == account.currency:
+            balance += row.amount
+        items.append(RunningBalanceEntry(**row._mapping, balance=balance))
+    
+    return RunningBalancePage(
+        account_id=account.id,
+        opening_balance=opening,
+        items=items,
+        next_cursor=encode_cursor(items[-1].date, items[-1].id) if has_more else None
+    )
+
+async def shift_balance_checkpoints(
+    db: AsyncSession,
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> None:
+    """Keep the checkpoints in step with removed/added transaction rows
+    
+    Each (account, month) whose total changed adds its delta to the
+    account's checkpoints from that month onwards, so a back-dated write
+    leaves every checkpoint usable. Must be called in the same DB
+    transaction as the write it describes.
+    """
+    removed, added = list(removed), list(added)
+    account_ids = {row["account_id"] for row in removed + added if row["account_id"] is not None}
+    if not account_ids:
+        return
+    currencies = dict((await db.execute(account_currencies_query(account_ids))).all())
+    changes = balance_changes(currencies, removed, added)
+    
+    if not changes:
+        return
+    await db.execute(shift_checkpoints_statement(), [
+        {"shift_account_id": account_id, "shift_month": month, "delta": delta}
+        for (account_id, month), delta in changes.items()
+    ])
+
+async def refresh_balance_checkpoints(
+    db: AsyncSession,
+    today: Optional[date] = None
+) -> int:
+    """Add the missing month-end checkpoints of every account, returning the number written
+    
+    Each account continues from its latest checkpoint (or its first
+    transaction) through the last complete month, reading only the
+    transactions after that checkpoint.
+    """
+    current_month = month_key(today or date.today())
+    last_month = add_months(current_month, -1)
+    end = month_start(current_month)
+    
+    written = 0
+    for account_id, currency in (await db.execute(select(accounts.c.id, accounts.c.currency))).all():
+        checkpoint = (await db.execute(latest_checkpoint_query(account_id))).first()
+        start_month = add_months(checkpoint.month, 1) if checkpoint else None
+        if start_month is not None and start_month > last_month:
+            continue
+        
+        # Execute query (side effect)
+        sums = {
+            row.month: row.total
+            for row in await db.execute(account_month_sums_query(
+                account_id, currency, month_start(start_month) if start_month else None, end
+            ))
+        }
+        if start_month is None:
+            if not sums:
+                continue
+            start_month = min(sums)
+        
+        rows = cumulative_checkpoints(
+            account_id, start_month, last_month,
+            checkpoint.balance if checkpoint else Decimal(0), sums
+        )
+        if rows:
+            await db.execute(create_checkpoints_statement(), rows)
+            written += len(rows)
+    
+    if written:
+        mark_changed(db, ("account_balance_checkpoints",))
+    return written
+
+async def rebuild_balance_checkpoints(db: AsyncSession) -> int:
+    """Recompute every checkpoint from scratch, returning the number of rows written"""
+    await db.execute(clear_checkpoints_statement())
+    mark_changed(db, ("account_balance_checkpoints",))
+    return await refresh_balance_checkpoints(db)
+
+async def verify_balance_checkpoints(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Compare stored checkpoints with the account histories
+    
+    Missing checkpoints are not drift; refresh_balance_checkpoints adds them.
+    
+    Returns:
+        One entry per stored (account, month) whose balance is wrong
+    """
+    stored: Dict[int, List[Any]] = {}
+    for row in await db.execute(list_checkpoints_query()):
+        stored.setdefault(row.account_id, []).append(row)
+    currencies = dict((await db.execute(account_currencies_query(stored))).all())
+    
+    drift = []
+    for account_id, checkpoints in stored.items():
+        end = month_start(add_months(checkpoints[-1].month, 1))
+        sums = sorted(
+            (row.month, row.total)
+            for row in await db.execute(account_month_sums_query(account_id, currencies[account_id], None, end))
+        )
+        expected, position = Decimal(0), 0
+        for checkpoint in checkpoints:
+            while position < len(sums) and sums[position][0] <= checkpoint.month:
+                expected += sums[position][1]
+                position += 1
+            if checkpoint.balance != expected:
+                drift.append({
+                    "account_id": account_id,
+                    "month": checkpoint.month,
+                    "stored": checkpoint.balance,
+                    "expected": expected,
+                })
+    return drift
\ No newline at end of file
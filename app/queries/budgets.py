@@ -0,0 +1,215 @@
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Mapping, Tuple
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+import calendar
+import hashlib
+
+from app.config import settings
+from app.models.schema import budgets, categories
+from app.models.domain import Budget, BudgetStatus, BudgetReport, TimeseriesPoint
+from app.core.cache import VersionedCache, mark_changed, response_cache
+from app.queries import reports as report_queries
+from app.utils.date_utils import month_key
+from app.utils.money_utils import CENT
+
+# Tables that budget writes touch
+BUDGET_TABLES = ("budgets",)
+
+# Tables a budget report is computed from
+BUDGET_REPORT_TABLES = (
+    "budgets", "categories", "monthly_category_totals", "daily_category_totals", "fx_rates"
+)
+
+# Budget reports by (month, today), reused until a write to BUDGET_REPORT_TABLES
+# commits, so polling the budgets page does not query the rollups again
+budget_report_cache = VersionedCache(max_entries=12)
+
+# Pure function to build a query for listing budgets
+def list_budgets_query():
+    """Build a query for listing budgets with their category names"""
+    return (
+        select(budgets, categories.c.name.label('category_name'))
+        .join(categories, budgets.c.category_id == categories.c.id)
+        .order_by(categories.c.name)
+    )
+
+# Pure function to build a query for getting a single budget
+def get_budget_query(category_id: int):
+    """Build a query to get a category's budget"""
+    return list_budgets_query().where(budgets.c.category_id == category_id)
+
+# Pure function to build an upsert setting a category's budget
+def set_budget_statement(category_id: int, amount: Decimal):
+    """Build an upsert that creates a category's budget or replaces its amount"""
+    stmt = sqlite_insert(budgets).values(category_id=category_id, amount=amount)
+    return stmt.on_conflict_do_update(
+        index_elements=[budgets.c.category_id],
+        set_={"amount": stmt.excluded.amount}
+    )
+
+# Pure function to build a delete statement for a category's budget
+def delete_budget_statement(category_id: int):
+    """Build a delete statement for a category's budget"""
+    return (
+        delete(budgets)
+        .where(budgets.c.category_id == category_id)
+    )
+
+# Pure function to measure how far through a month a day is
+def month_progress(month: str, today: date) -> Tuple[int, int]:
+    """Return the days of a 'YYYY-MM' month elapsed by today (counting today) and its length"""
+    year, month_number = (int(part) for part in month.split("-"))
+    days_in_month = calendar.monthrange(year, month_number)[1]
+    current_month = month_key(today)
+    if month < current_month:
+        return days_in_month, days_in_month
+    if month > current_month:
+        return 0, days_in_month
+    return today.day, days_in_month
+
+# Pure function to project a month's spending to its end
+def project_spending(spent: Decimal, days_elapsed: int, days_in_month: int) -> Decimal:
+    """Extrapolate spending so far at the month's average daily rate
+
+    Complete months are not extrapolated, and neither are future ones.
+    """
+    if days_elapsed in (0, days_in_month):
+        return spent
+    return (spent * days_in_month / days_elapsed).quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+# Pure function to compare budgets with actual spending
+def build_budget_report(
+    month: str,
+    today: date,
+    budget_list: List[Budget],
+    points: List[TimeseriesPoint]
+) -> BudgetReport:
+    """Build the budget-vs-actual report of a month from its per-category totals"""
+    days_elapsed, days_in_month = month_progress(month, today)
+    spending = {point.category_id: point.spending for point in points}
+    items = []
+    for budget in budget_list:
+        spent = spending.get(budget.category_id, Decimal(0))
+        projected = project_spending(spent, days_elapsed, days_in_month)
+        items.append(BudgetStatus(
+            category_id=budget.category_id,
+            category_name=budget.category_name,
+            budget=budget.amount,
+            spent=spent,
+            remaining=budget.amount - spent,
+            percent_used=round(float(spent / budget.amount * 100), 1),
+            projected=projected,
+            projected_over=projected > budget.amount,
+            currency=settings.BASE_CURRENCY
+        ))
+    return BudgetReport(
+        month=month,
+        days_elapsed=days_elapsed,
+        days_in_month=days_in_month,
+        total_budget=sum((item.budget for item in items), Decimal(0)),
+        total_spent=sum((item.spent for item in items), Decimal(0)),
+        total_projected=sum((item.projected for item in items), Decimal(0)),
+        items=items,
+        currency=settings.BASE_CURRENCY
+    )
+
+# Pure function to fingerprint how a budget bar renders
+def budget_status_fingerprint(status: BudgetStatus) -> str:
+    """Short digest of a budget status; equal digests render the same bar"""
+    return hashlib.blake2b(status.model_dump_json().encode(), digest_size=6).hexdigest()
+
+# Pure function to find the budget bars a client has to redraw
+def changed_budget_statuses(
+    report: BudgetReport,
+    fingerprints: Mapping[int, str]
+) -> Tuple[List[BudgetStatus], List[BudgetStatus], List[int]]:
+    """Compare a report with the fingerprints of the bars a client shows
+
+    Returns:
+        The statuses whose bars changed, those without a bar yet, and the
+        category IDs of bars whose budget no longer exists
+    """
+    changed, added = [], []
+    for item in report.items:
+        if item.category_id not in fingerprints:
+            added.append(item)
+        elif fingerprints[item.category_id] != budget_status_fingerprint(item):
+            changed.append(item)
+    current = {item.category_id for item in report.items}
+    removed = [category_id for category_id in fingerprints if category_id not in current]
+    return changed, added, removed
+
+# --- Handler functions that compose the above functions ---
+
+async def list_budgets(db: AsyncSession) -> List[Budget]:
+    """List budgets"""
+    result = await db.execute(list_budgets_query())
+    return [Budget.from_orm(row) for row in result]
+
+async def get_budget(
+    db: AsyncSession,
+    category_id: int
+) -> Optional[Budget]:
+    """Get a category's budget"""
+    result = await db.execute(get_budget_query(category_id))
+    row = result.first()
+    return Budget.from_orm(row) if row else None
+
+async def set_budget(
+    db: AsyncSession,
+    category_id: int,
+    amount: Decimal
+) -> Budget:
+    """Create or replace a category's monthly budget"""
+    # Execute statement (side effect)
+    await db.execute(set_budget_statement(category_id, amount))
+    mark_changed(db, BUDGET_TABLES)
+    
+    return await get_budget(db, category_id)
+
+async def delete_budget(
+    db: AsyncSession,
+    category_id: int
+) -> bool:
+    """Delete a category's budget"""
+    result = await db.execute(delete_budget_statement(category_id))
+    mark_changed(db, BUDGET_TABLES)
+    return result.rowcount > 0
+
+async def get_budget_report(
+    db: AsyncSession,
+    month: Optional[str] = None,
+    today: Optional[date] = None
+) -> BudgetReport:
+    """Compare each budget with the category's spending in a month, the current one by default
+    
+    Spending is read from the monthly rollups that transaction writes keep
+    up to date (converted into settings.BASE_CURRENCY like the reports),
+    never from transactions, and the report is cached until one of
+    BUDGET_REPORT_TABLES changes.
+    
+    Raises:
+        MissingRateError: If a currency spent in the month has no FX rates
+    """
+    today = today or date.today()
+    month = month or month_key(today)
+    cache_key = f"{month}|{today.isoformat()}"
+    versions = response_cache.versions(BUDGET_REPORT_TABLES)
+    report = budget_report_cache.get(cache_key, versions)
+    if report is not None:
+        return report
+    
+    budget_list = await list_budgets(db)
+    points = []
+    if budget_list:
+        first_day = date(*(int(part) for part in month.split("-")), 1)
+        points = await report_queries.get_timeseries(
+            db, "month", first_day, first_day,
+            [budget.category_id for budget in budget_list], by_category=True
+        )
+    report = build_budget_report(month, today, budget_list, points)
+    budget_report_cache.put(cache_key, versions, report)
+    return report
\ No newline at end of file
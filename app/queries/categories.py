@@ -1,48 +1,58 @@
-from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy import select, insert, update, delete, func, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
 from typing import List, Optional, Dict, Any
+from functools import lru_cache
 
-from app.models.schema import categories, transactions
-from app.models.domain import Category, CategoryCreate
+from app.models.schema import categories, transactions, category_stats
+from app.models.domain import (
+    Category, CategoryCreate, CategoryUpdate, CategoryBatchOperation, BatchItemResult, BatchResult
+)
+from app.core.cache import mark_changed
+from app.queries import transactions as transaction_queries
+from app.queries import rules as rule_queries
+from app.queries import budgets as budget_queries
 
 # Pure function to build a query for listing categories
-def list_categories_query(limit: int = 100, offset: int = 0):
-    """Build a query for listing categories"""
+@lru_cache(maxsize=None)
+def list_categories_query():
+    """Build a query for listing categories, executed with {"limit", "offset"}
+
+    Built once, like the other parameterless builders here, so its compiled
+    form is found by a cache key computed once.
+    """
     return (
         select(categories)
         .order_by(categories.c.name)
-        .limit(limit)
-        .offset(offset)
+        .limit(bindparam('limit'))
+        .offset(bindparam('offset'))
     )
 
 # Pure function to build a query for getting a single category
-def get_category_query(category_id: int):
-    """Build a query to get a single category by ID"""
+@lru_cache(maxsize=None)
+def get_category_query():
+    """Build a query to get a single category, executed with {"category_id"}"""
     return (
         select(categories)
-        .where(categories.c.id == category_id)
+        .where(categories.c.id == bindparam('category_id'))
     )
 
 # Pure function to build a query for getting categories with transaction counts
+@lru_cache(maxsize=None)
 def list_categories_with_counts_query():
-    """Build a query for listing categories with transaction counts"""
-    count_subq = (
-        select(
-            transactions.c.category_id,
-            func.count().label('transaction_count')
-        )
-        .group_by(transactions.c.category_id)
-        .alias('count_subq')
-    )
+    """Build a query for listing categories with transaction counts
     
+    Counts come from the incrementally maintained category_stats table,
+    so this costs O(#categories) regardless of ledger size.
+    """
     return (
         select(
             categories,
-            func.coalesce(count_subq.c.transaction_count, 0).label('transaction_count')
+            func.coalesce(category_stats.c.transaction_count, 0).label('transaction_count')
         )
         .outerjoin(
-            count_subq,
-            categories.c.id == count_subq.c.category_id
+            category_stats,
+            categories.c.id == category_stats.c.category_id
         )
         .order_by(categories.c.name)
     )
@@ -74,6 +84,24 @@ def delete_category_statement(category_id: int):
         .where(categories.c.id == category_id)
     )
 
+# Pure function to build a query for every category's name
+@lru_cache(maxsize=None)
+def list_category_names_query():
+    """Build a query for the (id, name) of all categories"""
+    return select(categories.c.id, categories.c.name)
+
+# Pure function to build the statement moving all transactions of one category to another
+def merge_category_transactions_statement(source_id: int, target_id: int):
+    """Build a single UPDATE reassigning a category's transactions, returning the moved rows"""
+    return (
+        update(transactions)
+        .where(transactions.c.category_id == source_id)
+        .values(category_id=target_id)
+        .returning(
+            transactions.c.amount, transactions.c.currency, transactions.c.date, transactions.c.account_id
+        )
+    )
+
 # --- Handler functions that compose the above functions ---
 
 async def list_categories(
@@ -83,10 +111,10 @@ async def list_categories(
 ) -> List[Category]:
     """List categories"""
     # Build query using pure function
-    query = list_categories_query(limit, offset)
+    query = list_categories_query()
     
     # Execute query (side effect)
-    result = await db.execute(query)
+    result = await db.execute(query, {"limit": limit, "offset": offset})
     
     # Transform results
     return [Category.from_orm(row) for row in result]
@@ -97,10 +125,10 @@ async def get_category(
 ) -> Optional[Category]:
     """Get a single category by ID"""
     # Build query using pure function
-    query = get_category_query(category_id)
+    query = get_category_query()
     
     # Execute query (side effect)
-    result = await db.execute(query)
+    result = await db.execute(query, {"category_id": category_id})
     row = result.first()
     
     # Return None if not found or transform
@@ -133,6 +161,7 @@ async def create_category(
     
     # Execute statement (side effect)
     result = await db.execute(stmt)
+    mark_changed(db, ("categories",))
     
     # Get the created category
     category_row = result.first()
@@ -151,6 +180,7 @@ async def update_category(
     
     # Execute statement (side effect)
     result = await db.execute(stmt)
+    mark_changed(db, ("categories",))
     
     # Get the updated category
     category_row = result.first()
@@ -162,12 +192,119 @@ async def delete_category(
     db: AsyncSession,
     category_id: int
 ) -> bool:
-    """Delete a category"""
+    """Delete a category, the categorization rules that assign it and its budget"""
     # Build statement using pure function
     stmt = delete_category_statement(category_id)
     
     # Execute statement (side effect)
     result = await db.execute(stmt)
+    await db.execute(rule_queries.delete_category_rules_statement(category_id))
+    await db.execute(budget_queries.delete_budget_statement(category_id))
+    mark_changed(db, ("categories",) + rule_queries.RULE_TABLES + budget_queries.BUDGET_TABLES)
     
     # Return whether deletion was successful
-    return result.rowcount > 0
\ No newline at end of file
+    return result.rowcount > 0
+
+async def merge_category(
+    db: AsyncSession,
+    source_id: int,
+    target_id: int
+) -> int:
+    """Move every transaction and rule of one category to another and delete the first
+
+    Returns:
+        The number of transactions reassigned
+    """
+    # Execute statement (side effect)
+    result = await db.execute(merge_category_transactions_statement(source_id, target_id))
+    moved = [row._mapping for row in result]
+    if moved:
+        await transaction_queries.apply_ledger_changes(
+            db,
+            removed=[{**row, "category_id": source_id} for row in moved],
+            added=[{**row, "category_id": target_id} for row in moved]
+        )
+    await db.execute(rule_queries.reassign_category_rules_statement(source_id, target_id))
+    await delete_category(db, source_id)
+    return len(moved)
+
+async def apply_category_batch(
+    db: AsyncSession,
+    operations: List[CategoryBatchOperation],
+    atomic: bool = True
+) -> BatchResult:
+    """Apply create/update/delete/merge operations to categories in order
+
+    The batch is first validated against the current names and IDs, replaying
+    its own effects (a category renamed or deleted earlier in the batch frees
+    its name), so unique-name violations are reported per operation instead of
+    aborting the DB transaction. In atomic mode any failure means nothing is
+    written and the result has applied=False.
+    """
+    results = [BatchItemResult(index=index, op=operation.op, ok=True, id=operation.id)
+               for index, operation in enumerate(operations)]
+    names = {row.id: row.name for row in await db.execute(list_category_names_query())}
+    planned = []
+    
+    for index, operation in enumerate(operations):
+        error = None
+        values: Dict[str, Any] = {}
+        try:
+            if operation.op == "create":
+                values = CategoryCreate(**operation.data).dict()
+                if values["name"] in names.values():
+                    error = f"Category name already exists: {values['name']}"
+            elif operation.id not in names:
+                error = "Category not found"
+            elif operation.op == "update":
+                values = CategoryUpdate(**operation.data).dict(exclude_unset=True)
+                if not values:
+                    error = "data must change at least one field"
+                elif values.get("name") is None and "name" in values:
+                    error = "name cannot be null"
+                elif values.get("name") in set(names.values()) - {names[operation.id]}:
+                    error = f"Category name already exists: {values['name']}"
+            elif operation.op == "merge":
+                if operation.into not in names:
+                    error = "Target category not found"
+                elif operation.into == operation.id:
+                    error = "Cannot merge a category into itself"
+        except ValidationError as exc:
+            error = transaction_queries.validation_error_message(exc)
+        
+        if error:
+            results[index].ok = False
+            results[index].error = error
+            continue
+        
+        # Replay the operation's effect on the names later operations see
+        if operation.op == "create":
+            names[("new", index)] = values["name"]
+        elif operation.op == "update" and "name" in values:
+            names[operation.id] = values["name"]
+        elif operation.op in ("delete", "merge"):
+            del names[operation.id]
+        planned.append((index, operation, values))
+    
+    failed = sum(1 for item in results if not item.ok)
+    if atomic and failed:
+        return BatchResult(applied=False, succeeded=0, failed=failed, results=results)
+    
+    # Execute the validated operations in order (side effect)
+    for index, operation, values in planned:
+        if operation.op == "create":
+            category = await create_category(db, CategoryCreate(**values))
+            results[index].id = category.id
+        elif operation.op == "update":
+            await update_category(db, operation.id, values)
+        elif operation.op == "delete":
+            await delete_category(db, operation.id)
+        else:
+            await merge_category(db, operation.id, operation.into)
+    
+    return BatchResult(
+        applied=True,
+        succeeded=len(results) - failed,
+        failed=failed,
+        results=results
+    )
\ No newline at end of file
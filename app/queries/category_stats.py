@@ -0,0 +1,210 @@
+from sqlalchemy import select, insert, update, delete, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Iterable, Mapping
+from decimal import Decimal
+
+from app.models.schema import transactions, category_stats
+
+# Stats key used for transactions without a category
+UNCATEGORIZED_STATS_ID = 0
+
+def stats_key(category_id: Optional[int]) -> int:
+    """Map a transaction's category_id to its category_stats key"""
+    return category_id if category_id is not None else UNCATEGORIZED_STATS_ID
+
+# Pure function to fold transaction changes into per-category deltas
+def summarize_transaction_changes(
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> Dict[int, Dict[str, Any]]:
+    """Fold removed and added transaction rows into one delta per stats key.
+
+    Each delta carries count/income/spending adjustments, the date range of the
+    added rows, and whether any row was removed (which may shrink the range).
+    """
+    deltas: Dict[int, Dict[str, Any]] = {}
+
+    def delta_for(row: Mapping[str, Any]) -> Dict[str, Any]:
+        key = stats_key(row["category_id"])
+        if key not in deltas:
+            deltas[key] = {
+                "count": 0,
+                "income": Decimal(0),
+                "spending": Decimal(0),
+                "first_date": None,
+                "last_date": None,
+                "removed": False,
+            }
+        return deltas[key]
+
+    for row in removed:
+        delta = delta_for(row)
+        delta["count"] -= 1
+        if row["amount"] > 0:
+            delta["income"] -= row["amount"]
+        else:
+            delta["spending"] += row["amount"]
+        delta["removed"] = True
+
+    for row in added:
+        delta = delta_for(row)
+        delta["count"] += 1
+        if row["amount"] > 0:
+            delta["income"] += row["amount"]
+        else:
+            delta["spending"] -= row["amount"]
+        if delta["first_date"] is None or row["date"] < delta["first_date"]:
+            delta["first_date"] = row["date"]
+        if delta["last_date"] is None or row["date"] > delta["last_date"]:
+            delta["last_date"] = row["date"]
+
+    return deltas
+
+# Pure function to build an upsert applying one delta to category_stats
+def apply_category_stats_delta_statement(category_key: int, delta: Dict[str, Any]):
+    """Build an upsert that adds a delta to a category's stats row"""
+    stmt = sqlite_insert(category_stats).values(
+        category_id=category_key,
+        transaction_count=delta["count"],
+        income_total=delta["income"],
+        spending_total=delta["spending"],
+        first_date=delta["first_date"],
+        last_date=delta["last_date"],
+    )
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[category_stats.c.category_id],
+        set_={
+            "transaction_count": category_stats.c.transaction_count + excluded.transaction_count,
+            "income_total": category_stats.c.income_total + excluded.income_total,
+            "spending_total": category_stats.c.spending_total + excluded.spending_total,
+            "first_date": func.min(
+                func.coalesce(category_stats.c.first_date, excluded.first_date),
+                func.coalesce(excluded.first_date, category_stats.c.first_date)
+            ),
+            "last_date": func.max(
+                func.coalesce(category_stats.c.last_date, excluded.last_date),
+                func.coalesce(excluded.last_date, category_stats.c.last_date)
+            ),
+        }
+    )
+
+# Pure function to build a statement re-deriving a category's date range
+def refresh_category_stats_dates_statement(category_key: int):
+    """Build an update that recomputes first/last date after removals.
+
+    Both subqueries are single seeks on ix_transactions_category_id_date_id.
+    """
+    if category_key == UNCATEGORIZED_STATS_ID:
+        condition = transactions.c.category_id.is_(None)
+    else:
+        condition = transactions.c.category_id == category_key
+
+    return (
+        update(category_stats)
+        .where(category_stats.c.category_id == category_key)
+        .values(
+            first_date=select(func.min(transactions.c.date)).where(condition).scalar_subquery(),
+            last_date=select(func.max(transactions.c.date)).where(condition).scalar_subquery(),
+        )
+    )
+
+# Pure function to build the full-scan aggregate that category_stats caches
+def compute_category_stats_query():
+    """Build a query computing category stats directly from transactions"""
+    return (
+        select(
+            func.coalesce(transactions.c.category_id, UNCATEGORIZED_STATS_ID).label('category_id'),
+            func.count().label('transaction_count'),
+            func.sum(
+                case((transactions.c.amount > 0, transactions.c.amount), else_=0)
+            ).label('income_total'),
+            func.sum(
+                case((transactions.c.amount < 0, -transactions.c.amount), else_=0)
+            ).label('spending_total'),
+            func.min(transactions.c.date).label('first_date'),
+            func.max(transactions.c.date).label('last_date'),
+        )
+        .group_by(func.coalesce(transactions.c.category_id, UNCATEGORIZED_STATS_ID))
+    )
+
+# Pure function to build a query for reading the stored stats
+def list_category_stats_query():
+    """Build a query for listing stored category stats"""
+    return select(category_stats).order_by(category_stats.c.category_id)
+
+# Pure function to build a statement clearing the stored stats
+def clear_category_stats_statement():
+    """Build a delete statement removing all stored stats"""
+    return delete(category_stats)
+
+# Pure function to build a statement repopulating stats from transactions
+def rebuild_category_stats_statement():
+    """Build an insert-from-select that recomputes every stats row"""
+    return insert(category_stats).from_select(
+        [
+            'category_id', 'transaction_count', 'income_total',
+            'spending_total', 'first_date', 'last_date'
+        ],
+        compute_category_stats_query()
+    )
+
+# --- Handler functions that compose the above functions ---
+
+async def apply_transaction_changes(
+    db: AsyncSession,
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> None:
+    """Apply removed/added transaction rows to category_stats"""
+    deltas = summarize_transaction_changes(removed, added)
+
+    for category_key, delta in deltas.items():
+        await db.execute(apply_category_stats_delta_statement(category_key, delta))
+        if delta["removed"]:
+            await db.execute(refresh_category_stats_dates_statement(category_key))
+
+async def rebuild_category_stats(db: AsyncSession) -> int:
+    """Recompute category_stats from scratch, returning the number of rows written"""
+    await db.execute(clear_category_stats_statement())
+    result = await db.execute(rebuild_category_stats_statement())
+    return result.rowcount
+
+async def verify_category_stats(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Compare stored stats with a full recomputation
+
+    Returns:
+        One entry per drifted category with the stored and expected rows
+    """
+    expected = {
+        row.category_id: row._mapping
+        for row in await db.execute(compute_category_stats_query())
+    }
+    stored = {
+        row.category_id: row._mapping
+        for row in await db.execute(list_category_stats_query())
+    }
+
+    def normalize(row: Optional[Mapping[str, Any]]) -> Optional[tuple]:
+        # Empty stats rows are equivalent to missing ones
+        if row is None or row["transaction_count"] == 0:
+            return None
+        return (
+            row["transaction_count"],
+            row["income_total"],
+            row["spending_total"],
+            row["first_date"],
+            row["last_date"],
+        )
+
+    drift = []
+    for category_key in sorted(expected.keys() | stored.keys()):
+        stored_row, expected_row = stored.get(category_key), expected.get(category_key)
+        if normalize(stored_row) != normalize(expected_row):
+            drift.append({
+                "category_id": category_key,
+                "stored": dict(stored_row) if stored_row else None,
+                "expected": dict(expected_row) if expected_row else None,
+            })
+    return drift
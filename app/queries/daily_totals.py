@@ -0,0 +1,213 @@
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Iterable, Mapping, Tuple, AsyncIterator
+from datetime import datetime
+
+from app.models.schema import transactions, daily_category_totals
+from app.queries.category_stats import UNCATEGORIZED_STATS_ID
+from app.queries.monthly_totals import summarize_period_changes
+from app.utils.date_utils import day_key, month_key, add_months
+
+# SQL expression for a transaction's 'YYYY-MM-DD' day key
+transaction_day = func.strftime('%Y-%m-%d', transactions.c.date)
+
+# Months of transactions aggregated per statement during chunked rebuilds
+REBUILD_CHUNK_MONTHS = 3
+
+def month_start(month: str) -> datetime:
+    """Convert a 'YYYY-MM' key to the datetime at the start of that month"""
+    return datetime.strptime(month, "%Y-%m")
+
+# Pure function to build an upsert adding deltas to daily_category_totals
+def apply_daily_deltas_statement():
+    """Build an upsert adding one delta per parameter set to a (day, category, currency) row
+
+    Executed with a list of parameter sets, so the statement is compiled once
+    however many rows a change touches.
+    """
+    stmt = sqlite_insert(daily_category_totals)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            daily_category_totals.c.day,
+            daily_category_totals.c.category_id,
+            daily_category_totals.c.currency,
+        ],
+        set_={
+            "transaction_count": daily_category_totals.c.transaction_count + excluded.transaction_count,
+            "income_total": daily_category_totals.c.income_total + excluded.income_total,
+            "spending_total": daily_category_totals.c.spending_total + excluded.spending_total,
+        }
+    )
+
+# Pure function to build the aggregate that daily_category_totals caches
+def compute_daily_totals_query(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Build a query computing daily totals from transactions dated in [start, end)
+
+    The date bounds are a range seek on ix_transactions_date_id.
+    """
+    category_key = func.coalesce(transactions.c.category_id, UNCATEGORIZED_STATS_ID)
+    query = (
+        select(
+            transaction_day.label('day'),
+            category_key.label('category_id'),
+            transactions.c.currency,
+            func.count().label('transaction_count'),
+            func.sum(
+                case((transactions.c.amount > 0, transactions.c.amount), else_=0)
+            ).label('income_total'),
+            func.sum(
+                case((transactions.c.amount < 0, -transactions.c.amount), else_=0)
+            ).label('spending_total'),
+        )
+        .group_by(transaction_day, category_key, transactions.c.currency)
+    )
+    if start is not None:
+        query = query.where(transactions.c.date >= start)
+    if end is not None:
+        query = query.where(transactions.c.date < end)
+    return query
+
+# Pure function to build a query for reading the stored totals
+def list_daily_totals_query():
+    """Build a query for listing stored daily totals"""
+    return select(daily_category_totals).order_by(
+        daily_category_totals.c.day,
+        daily_category_totals.c.category_id,
+        daily_category_totals.c.currency
+    )
+
+# Pure function to build a query for the range of transaction dates
+def transaction_date_range_query():
+    """Build a query for the earliest and latest transaction dates"""
+    return select(
+        func.min(transactions.c.date).label('first_date'),
+        func.max(transactions.c.date).label('last_date'),
+    )
+
+# Pure function to build a statement clearing stored totals
+def clear_daily_totals_statement(
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None
+):
+    """Build a delete statement for stored daily totals with day in [start_day, end_day)"""
+    stmt = delete(daily_category_totals)
+    if start_day is not None:
+        stmt = stmt.where(daily_category_totals.c.day >= start_day)
+    if end_day is not None:
+        stmt = stmt.where(daily_category_totals.c.day < end_day)
+    return stmt
+
+# Pure function to build a statement repopulating totals for a date range
+def rebuild_daily_totals_statement(start: datetime, end: datetime):
+    """Build an insert-from-select that recomputes daily rows for [start, end)"""
+    return insert(daily_category_totals).from_select(
+        ['day', 'category_id', 'currency', 'transaction_count', 'income_total', 'spending_total'],
+        compute_daily_totals_query(start, end)
+    )
+
+# --- Handler functions that compose the above functions ---
+
+async def apply_transaction_changes(
+    db: AsyncSession,
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> None:
+    """Apply removed/added transaction rows to daily_category_totals"""
+    deltas = summarize_period_changes(removed, added, day_key)
+
+    if not deltas:
+        return
+    await db.execute(apply_daily_deltas_statement(), [
+        {
+            "day": day,
+            "category_id": category_key,
+            "currency": currency,
+            "transaction_count": delta["count"],
+            "income_total": delta["income"],
+            "spending_total": delta["spending"],
+        }
+        for (day, category_key, currency), delta in deltas.items()
+    ])
+
+async def rebuild_daily_totals_chunks(
+    db: AsyncSession,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    chunk_months: int = REBUILD_CHUNK_MONTHS
+) -> AsyncIterator[Dict[str, Any]]:
+    """Re-bucket daily totals chunk by chunk, yielding progress after each one
+
+    Covers the months start_month..end_month inclusive ('YYYY-MM'), defaulting
+    to the whole ledger, in which case the table is cleared first. Each chunk
+    is one range-bounded INSERT ... SELECT, so callers may commit between
+    chunks to keep write transactions short.
+    """
+    full_rebuild = start_month is None and end_month is None
+    if start_month is None or end_month is None:
+        first_date, last_date = (await db.execute(transaction_date_range_query())).one()
+        if first_date is None:
+            if full_rebuild:
+                await db.execute(clear_daily_totals_statement())
+            return
+        start_month = start_month or month_key(first_date)
+        end_month = end_month or month_key(last_date)
+    if full_rebuild:
+        await db.execute(clear_daily_totals_statement())
+
+    chunk_start = start_month
+    while chunk_start <= end_month:
+        chunk_end = min(add_months(chunk_start, chunk_months), add_months(end_month, 1))
+        start, end = month_start(chunk_start), month_start(chunk_end)
+        if not full_rebuild:
+            await db.execute(clear_daily_totals_statement(day_key(start), day_key(end)))
+        result = await db.execute(rebuild_daily_totals_statement(start, end))
+        yield {"start_month": chunk_start, "end_month": chunk_end, "rows": result.rowcount}
+        chunk_start = chunk_end
+
+async def rebuild_daily_totals(db: AsyncSession) -> int:
+    """Recompute daily_category_totals from scratch, returning the number of rows written"""
+    rows = 0
+    async for progress in rebuild_daily_totals_chunks(db):
+        rows += progress["rows"]
+    return rows
+
+async def verify_daily_totals(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Compare stored daily totals with a full recomputation
+
+    Returns:
+        One entry per drifted (day, category, currency) with the stored and expected rows
+    """
+    def key(row) -> Tuple[str, int, str]:
+        return (row.day, row.category_id, row.currency)
+
+    expected = {key(row): row._mapping for row in await db.execute(compute_daily_totals_query())}
+    stored = {key(row): row._mapping for row in await db.execute(list_daily_totals_query())}
+
+    def normalize(row: Optional[Mapping[str, Any]]) -> Optional[tuple]:
+        # Empty rows are equivalent to missing ones
+        if row is None or row["transaction_count"] == 0:
+            return None
+        return (
+            row["transaction_count"],
+            row["income_total"],
+            row["spending_total"],
+        )
+
+    drift = []
+    for day, category_key, currency in sorted(expected.keys() | stored.keys()):
+        key_values = (day, category_key, currency)
+        stored_row, expected_row = stored.get(key_values), expected.get(key_values)
+        if normalize(stored_row) != normalize(expected_row):
+            drift.append({
+                "day": day,
+                "category_id": category_key,
+                "currency": currency,
+                "stored": dict(stored_row) if stored_row else None,
+                "expected": dict(expected_row) if expected_row else None,
+            })
+    return drift
@@ -0,0 +1,115 @@
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any, Sequence
+from datetime import datetime
+
+from app.config import settings
+from app.models.schema import monthly_category_totals
+from app.models.domain import DashboardStats
+from app.core.fx import RateIndex, convert_amount
+from app.queries import fx_rates as fx_queries
+from app.queries import reports as report_queries
+from app.utils.date_utils import month_key
+
+# Pure function to build a query for the dashboard statistics
+def dashboard_stats_query(
+    current_month: str,
+    year_start_month: str,
+    currency: str = settings.BASE_CURRENCY
+):
+    """Build a single aggregate query for all-time, month-to-date and year-to-date totals
+
+    Reads the monthly_category_totals rollup, so the cost grows with the
+    number of (month, category) pairs rather than with the ledger. Only
+    transactions in the given currency are included.
+    """
+    totals = monthly_category_totals.c
+    in_month = totals.month == current_month
+    in_year = and_(totals.month >= year_start_month, totals.month <= current_month)
+
+    def total(column, condition=None):
+        value = column if condition is None else case((condition, column), else_=0)
+        return func.coalesce(func.sum(value), 0)
+
+    return select(
+        total(totals.transaction_count).label('total_transactions'),
+        total(totals.income_total).label('total_income'),
+        total(totals.spending_total).label('total_spending'),
+        total(totals.income_total, in_month).label('month_income'),
+        total(totals.spending_total, in_month).label('month_spending'),
+        total(totals.income_total, in_year).label('year_income'),
+        total(totals.spending_total, in_year).label('year_spending'),
+    ).where(totals.currency == currency)
+
+# Pure function to add converted foreign-currency days to the dashboard totals
+def add_converted_stats(
+    stats: Dict[str, Any],
+    rows: Sequence[Any],
+    rate_index: RateIndex,
+    current_month: str,
+    year_start_month: str
+) -> Dict[str, Any]:
+    """Convert daily foreign-currency totals and add them to a copy of the stats
+
+    Raises:
+        MissingRateError: If a row's currency has no rates
+    """
+    merged = dict(stats)
+    rates = rate_index.rates_for([(row.currency, row.day) for row in rows])
+    for row, rate in zip(rows, rates):
+        income, spending = convert_amount(row.income, rate), convert_amount(row.spending, rate)
+        month = row.day[:7]
+        merged["total_transactions"] += row.transaction_count
+        merged["total_income"] += income
+        merged["total_spending"] += spending
+        if month == current_month:
+            merged["month_income"] += income
+            merged["month_spending"] += spending
+        if year_start_month <= month <= current_month:
+            merged["year_income"] += income
+            merged["year_spending"] += spending
+    return merged
+
+# --- Handler functions that compose the above functions ---
+
+async def get_dashboard_stats(
+    db: AsyncSession,
+    today: Optional[datetime] = None
+) -> DashboardStats:
+    """Get dashboard totals for all time, the current month and the current year
+
+    Totals are in settings.BASE_CURRENCY; transactions in other currencies
+    are converted at the rate of their day.
+
+    Raises:
+        MissingRateError: If a currency in the ledger has no FX rates
+    """
+    today = today or datetime.now()
+    current_month, year_start_month = month_key(today), f"{today.year:04d}-01"
+    base_currency = settings.BASE_CURRENCY
+    
+    # Build queries using pure functions
+    query = dashboard_stats_query(current_month, year_start_month, base_currency)
+    foreign_query = report_queries.foreign_currency_totals_query("day", base_currency=base_currency)
+    
+    # Execute queries (side effect)
+    stats = dict((await db.execute(query)).one()._mapping)
+    foreign_rows = (await db.execute(foreign_query)).all()
+    if foreign_rows:
+        rate_index = await fx_queries.get_rate_index(db, {row.currency for row in foreign_rows})
+        stats = add_converted_stats(stats, foreign_rows, rate_index, current_month, year_start_month)
+    
+    # Spending totals are stored as positive amounts
+    return DashboardStats(
+        total_transactions=stats["total_transactions"],
+        total_income=stats["total_income"],
+        total_spending=stats["total_spending"],
+        net=stats["total_income"] - stats["total_spending"],
+        month_income=stats["month_income"],
+        month_spending=stats["month_spending"],
+        month_net=stats["month_income"] - stats["month_spending"],
+        year_income=stats["year_income"],
+        year_spending=stats["year_spending"],
+        year_net=stats["year_income"] - stats["year_spending"],
+        currency=base_currency
+    )
\ No newline at end of file
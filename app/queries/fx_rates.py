@@ -0,0 +1,107 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
+from typing import Iterable, List, Optional
+import time
+
+from app.config import settings
+from app.models.schema import fx_rates
+from app.models.domain import FxRateCreate, ImportResult, ImportRowError
+from app.core.cache import VersionedCache, mark_changed, response_cache
+from app.core.fx import RateIndex
+from app.queries.transactions import validation_error_message
+from app.utils.import_utils import ImportRow, batched
+
+# Tables whose committed writes invalidate the rate index
+FX_TABLES = ("fx_rates",)
+
+# Rows per executemany when loading a rates file
+FX_LOAD_BATCH_SIZE = 5000
+
+# Maximum number of row errors reported back from a load
+MAX_FX_LOAD_ERRORS = 100
+
+# The in-memory rate index, reused until the rates change
+rate_index_cache = VersionedCache(max_entries=1)
+
+# Pure function to build a query for listing rates
+def list_fx_rates_query(currency: Optional[str] = None):
+    """Build a query for listing rates by currency and date"""
+    query = select(fx_rates).order_by(fx_rates.c.currency, fx_rates.c.date)
+    if currency is not None:
+        query = query.where(fx_rates.c.currency == currency)
+    return query
+
+# Pure function to build an upsert storing rates, executed with a list of rows
+def upsert_fx_rates_statement():
+    """Build an upsert that replaces the rate of an existing (currency, date)"""
+    stmt = sqlite_insert(fx_rates)
+    return stmt.on_conflict_do_update(
+        index_elements=[fx_rates.c.currency, fx_rates.c.date],
+        set_={"rate": stmt.excluded.rate}
+    )
+
+# --- Handler functions that compose the above functions ---
+
+async def list_fx_rates(db: AsyncSession, currency: Optional[str] = None) -> List[FxRateCreate]:
+    """List stored rates, optionally for one currency"""
+    result = await db.execute(list_fx_rates_query(currency))
+    return [FxRateCreate.model_validate(row._mapping) for row in result]
+
+async def load_fx_rates(
+    db: AsyncSession,
+    rows: Iterable[ImportRow],
+    batch_size: int = FX_LOAD_BATCH_SIZE
+) -> ImportResult:
+    """Validate and upsert parsed rate rows in batches
+    
+    Rows that fail validation are skipped and reported; everything else is
+    written within the caller's transaction. A rate loaded again for the
+    same currency and date replaces the stored one.
+    """
+    started = time.perf_counter()
+    loaded, failed = 0, 0
+    errors: List[ImportRowError] = []
+    stmt = upsert_fx_rates_statement()
+    
+    for batch in batched(rows, batch_size):
+        values = []
+        for position, raw in batch:
+            try:
+                values.append(FxRateCreate(**raw).dict())
+            except ValidationError as exc:
+                failed += 1
+                if len(errors) < MAX_FX_LOAD_ERRORS:
+                    errors.append(ImportRowError(row=position, error=validation_error_message(exc)))
+        
+        # Execute statement as a single executemany (side effect)
+        if values:
+            await db.execute(stmt, values)
+            mark_changed(db, FX_TABLES)
+            loaded += len(values)
+    
+    elapsed = time.perf_counter() - started
+    return ImportResult(
+        imported=loaded,
+        failed=failed,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round((loaded + failed) / elapsed, 1) if elapsed else 0.0
+    )
+
+async def get_rate_index(db: AsyncSession, currencies: Iterable[str] = ()) -> RateIndex:
+    """Return the in-memory index of the stored rates into settings.BASE_CURRENCY
+    
+    The rates are loaded and indexed again after a committed write to
+    fx_rates, or when the cached index has no rates for one of currencies,
+    which is how rates loaded by another process (such as the CLI) are
+    picked up.
+    """
+    versions = response_cache.versions(FX_TABLES)
+    index = rate_index_cache.get(settings.BASE_CURRENCY, versions)
+    if index is None or index.missing_currencies(currencies):
+        result = await db.execute(list_fx_rates_query())
+        index = RateIndex(settings.BASE_CURRENCY, (row._mapping for row in result))
+        rate_index_cache.put(settings.BASE_CURRENCY, versions, index)
+    return index
\ No newline at end of file
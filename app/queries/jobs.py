@@ -0,0 +1,446 @@
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from concurrent.futures import Executor
+from typing import List, Optional, Dict, Any, Tuple, Iterator, AsyncIterator, Callable
+import asyncio
+import os
+import pickle
+import time
+
+from app.models.schema import jobs
+from app.models.domain import Job, ImportResult, ImportRowError
+from app.core.cache import mark_changed
+from app.core.recurring import RecurringDetector
+from app.utils.import_utils import iter_import_rows, batched
+from app.utils.date_utils import month_key
+from app.queries import transactions as transaction_queries
+from app.queries import category_stats as category_stats_queries
+from app.queries import monthly_totals as monthly_totals_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import search as search_queries
+from app.queries import accounts as account_queries
+from app.queries import recurring as recurring_queries
+
+# Statuses a job never leaves
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Most recent jobs listed on the jobs page and by GET /api/jobs/
+JOB_LIST_LIMIT = 50
+
+# What a job handler yields after every chunk: "done" and optionally "total"
+# for the progress bar, "checkpoint" to resume from and, once the work is
+# complete, "result". The runner commits each one with the chunk's writes.
+JobProgress = Dict[str, Any]
+JobHandler = Callable[[AsyncSession, Job, Optional[Executor]], AsyncIterator[JobProgress]]
+
+# Derived tables a rebuild job recomputes in one statement, by their app.cli
+# name; daily totals are re-bucketed in chunks by their own job instead
+REBUILDS = {
+    "category-stats": ("category_stats", category_stats_queries.rebuild_category_stats),
+    "monthly-totals": ("monthly_category_totals", monthly_totals_queries.rebuild_monthly_totals),
+    "search-index": ("transactions_fts", search_queries.rebuild_search_index),
+    "balance-checkpoints": ("account_balance_checkpoints", account_queries.rebuild_balance_checkpoints),
+}
+
+# Pure function to build an insert statement for queueing a job
+def create_job_statement(kind: str, params: Dict[str, Any]):
+    """Build an insert statement for a queued job"""
+    return (
+        insert(jobs)
+        .values(kind=kind, status="queued", params=params, done=0, cancel_requested=False)
+        .returning(jobs)
+    )
+
+# Pure function to build a query for getting a single job
+def get_job_query(job_id: int):
+    """Build a query for getting a job by ID"""
+    return (
+        select(jobs)
+        .where(jobs.c.id == job_id)
+    )
+
+# Pure function to build a query for listing jobs
+def list_jobs_query(limit: int = JOB_LIST_LIMIT):
+    """Build a query for the most recent jobs, newest first"""
+    return (
+        select(jobs)
+        .order_by(jobs.c.id.desc())
+        .limit(limit)
+    )
+
+# Pure function to build an update statement that claims the oldest queued job
+def claim_next_job_statement():
+    """Build an update marking the oldest queued job running and returning it
+
+    The job is chosen and claimed in one statement, so two workers never
+    claim the same job.
+    """
+    oldest = (
+        select(jobs.c.id)
+        .where(jobs.c.status == "queued")
+        .order_by(jobs.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        update(jobs)
+        .where(jobs.c.id == oldest, jobs.c.status == "queued")
+        .values(status="running", started_at=func.coalesce(jobs.c.started_at, func.now()))
+        .returning(jobs)
+    )
+
+# Pure function to build an update statement recording a job's progress
+def save_job_progress_statement(job_id: int, progress: JobProgress):
+    """Build an update storing the counters, checkpoint and result a handler yielded"""
+    values = {"done": progress["done"]}
+    for key in ("total", "checkpoint", "result"):
+        if key in progress:
+            values["progress" if key == "checkpoint" else key] = progress[key]
+    return (
+        update(jobs)
+        .where(jobs.c.id == job_id)
+        .values(**values)
+    )
+
+# Pure function to build an update statement ending a job
+def finish_job_statement(job_id: int, status: str, error: Optional[str] = None):
+    """Build an update giving a job its final status"""
+    return (
+        update(jobs)
+        .where(jobs.c.id == job_id)
+        .values(status=status, error=error, finished_at=func.now())
+    )
+
+# Pure function to build an update statement cancelling a job that has not started
+def cancel_queued_job_statement(job_id: int):
+    """Build an update cancelling a job if it is still queued"""
+    return (
+        update(jobs)
+        .where(jobs.c.id == job_id, jobs.c.status == "queued")
+        .values(status="cancelled", cancel_requested=True, finished_at=func.now())
+    )
+
+# Pure function to build an update statement asking a running job to stop
+def request_job_cancel_statement(job_id: int):
+    """Build an update flagging a running job, which stops after its current chunk"""
+    return (
+        update(jobs)
+        .where(jobs.c.id == job_id, jobs.c.status == "running")
+        .values(cancel_requested=True)
+    )
+
+# Pure function to build a query for a job's cancellation flag
+def cancel_requested_query(job_id: int):
+    """Build a query for whether a job was asked to stop"""
+    return select(jobs.c.cancel_requested).where(jobs.c.id == job_id)
+
+# Pure function to build an update statement queueing interrupted jobs again
+def requeue_interrupted_jobs_statement():
+    """Build an update returning jobs left running by a previous process to the queue"""
+    return (
+        update(jobs)
+        .where(jobs.c.status == "running")
+        .values(status="queued")
+    )
+
+# Pure function to count the months of an inclusive 'YYYY-MM' range
+def month_span(start_month: str, end_month: str) -> int:
+    """Number of months from start_month to end_month inclusive"""
+    start_year, start = map(int, start_month.split("-"))
+    end_year, end = map(int, end_month.split("-"))
+    return max((end_year - start_year) * 12 + end - start + 1, 0)
+
+# Pure function to parse and validate an uploaded file into batches on disk
+def spool_import_file(path: str, import_format: str, batch_size: int) -> Dict[str, int]:
+    """Parse and validate an import file, pickling (values, errors) batches to path + '.batches'
+
+    Parsing and validation are CPU-bound, so import jobs run this in the
+    runner's process pool; the event loop only inserts the batches.
+    """
+    rows, batches = 0, 0
+    with open(path, "rb") as stream, open(path + ".batches", "wb") as spool:
+        for batch in batched(iter_import_rows(stream, import_format), batch_size):
+            values, failures = transaction_queries.validate_import_batch(batch)
+            pickle.dump((values, [failure.dict() for failure in failures]), spool, pickle.HIGHEST_PROTOCOL)
+            rows += len(batch)
+            batches += 1
+    return {"rows": rows, "batches": batches}
+
+# Pure function to read spooled import batches back
+def read_spooled_batches(path: str, skip: int = 0) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Yield the (values, errors) batches spool_import_file wrote, after the first ``skip``"""
+    with open(path + ".batches", "rb") as spool:
+        for index in range(skip):
+            pickle.load(spool)
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
+
+# Pure function to delete the files a job was given
+def remove_job_files(job: Job) -> None:
+    """Delete a job's uploaded file and its parsed batches, if it had any"""
+    path = job.params.get("path")
+    if not path:
+        return
+    for name in (path, path + ".batches"):
+        if os.path.exists(name):
+            os.remove(name)
+
+# --- Handler functions that compose the above functions ---
+
+async def create_job(
+    db: AsyncSession,
+    kind: str,
+    params: Dict[str, Any]
+) -> Job:
+    """Queue a job; the runner picks it up once the caller commits"""
+    # Build statement using pure function
+    stmt = create_job_statement(kind, params)
+    
+    # Execute statement (side effect)
+    result = await db.execute(stmt)
+    return Job.from_orm(result.first())
+
+async def get_job(
+    db: AsyncSession,
+    job_id: int
+) -> Optional[Job]:
+    """Get a job by ID"""
+    # Build query using pure function
+    query = get_job_query(job_id)
+    
+    # Execute query (side effect)
+    result = await db.execute(query)
+    row = result.first()
+    return Job.from_orm(row) if row else None
+
+async def list_jobs(
+    db: AsyncSession,
+    limit: int = JOB_LIST_LIMIT
+) -> List[Job]:
+    """List the most recent jobs, newest first"""
+    # Build query using pure function
+    query = list_jobs_query(limit)
+    
+    # Execute query (side effect)
+    result = await db.execute(query)
+    return [Job.from_orm(row) for row in result]
+
+async def claim_next_job(db: AsyncSession) -> Optional[Job]:
+    """Mark the oldest queued job running and return it, or None if the queue is empty"""
+    # Execute statement (side effect)
+    result = await db.execute(claim_next_job_statement())
+    row = result.first()
+    return Job.from_orm(row) if row else None
+
+async def save_job_progress(
+    db: AsyncSession,
+    job_id: int,
+    progress: JobProgress
+) -> None:
+    """Record what a handler yielded, in the DB transaction of the chunk it describes"""
+    # Execute statement (side effect)
+    await db.execute(save_job_progress_statement(job_id, progress))
+
+async def finish_job(
+    db: AsyncSession,
+    job_id: int,
+    status: str,
+    error: Optional[str] = None
+) -> None:
+    """Give a job its final status"""
+    # Execute statement (side effect)
+    await db.execute(finish_job_statement(job_id, status, error))
+
+async def cancel_job(
+    db: AsyncSession,
+    job_id: int
+) -> Optional[Job]:
+    """Cancel a queued job at once, or ask a running one to stop after its current chunk
+    
+    Chunks a running job has already committed stay applied.
+    """
+    # Execute statements (side effect)
+    result = await db.execute(cancel_queued_job_statement(job_id))
+    if not result.rowcount:
+        await db.execute(request_job_cancel_statement(job_id))
+    job = await get_job(db, job_id)
+    if job and job.status == "cancelled":
+        remove_job_files(job)
+    return job
+
+async def is_cancel_requested(
+    db: AsyncSession,
+    job_id: int
+) -> bool:
+    """Whether a job was asked to stop"""
+    # Execute query (side effect)
+    result = await db.execute(cancel_requested_query(job_id))
+    return bool(result.scalar())
+
+async def requeue_interrupted_jobs(db: AsyncSession) -> int:
+    """Queue the jobs a previous process left running again, returning how many there were"""
+    # Execute statement (side effect)
+    result = await db.execute(requeue_interrupted_jobs_statement())
+    return result.rowcount
+
+async def run_import_job(
+    db: AsyncSession,
+    job: Job,
+    executor: Optional[Executor]
+) -> AsyncIterator[JobProgress]:
+    """Import an uploaded file: parse it in the process pool, then insert it batch by batch
+    
+    The checkpoint counts the batches inserted, so a resumed job skips them.
+    """
+    params, checkpoint = job.params, job.progress
+    if checkpoint is None:
+        loop = asyncio.get_running_loop()
+        
+        # Parse and validate off the event loop (side effect)
+        spooled = await loop.run_in_executor(
+            executor, spool_import_file, params["path"], params["format"], params["batch_size"]
+        )
+        checkpoint = {
+            "rows": spooled["rows"], "batches": 0, "imported": 0, "failed": 0,
+            "errors": [], "elapsed_seconds": 0.0
+        }
+        yield {"done": 0, "total": spooled["rows"], "checkpoint": checkpoint}
+    
+    for values, failures in read_spooled_batches(params["path"], checkpoint["batches"]):
+        started = time.perf_counter()
+        
+        # Insert the valid rows of the batch (side effect)
+        if values:
+            await transaction_queries.insert_transaction_rows(db, values)
+        errors = checkpoint["errors"]
+        checkpoint = {
+            **checkpoint,
+            "batches": checkpoint["batches"] + 1,
+            "imported": checkpoint["imported"] + len(values),
+            "failed": checkpoint["failed"] + len(failures),
+            "errors": errors + failures[:transaction_queries.MAX_IMPORT_ERRORS - len(errors)],
+            "elapsed_seconds": checkpoint["elapsed_seconds"] + time.perf_counter() - started,
+        }
+        yield {"done": checkpoint["imported"] + checkpoint["failed"], "checkpoint": checkpoint}
+    
+    elapsed = checkpoint["elapsed_seconds"]
+    result = ImportResult(
+        imported=checkpoint["imported"],
+        failed=checkpoint["failed"],
+        errors=[ImportRowError(**error) for error in checkpoint["errors"]],
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(checkpoint["rows"] / elapsed, 1) if elapsed else 0.0
+    )
+    yield {"done": checkpoint["rows"], "result": result.model_dump(mode="json")}
+
+async def run_categorize_job(
+    db: AsyncSession,
+    job: Job,
+    executor: Optional[Executor]
+) -> AsyncIterator[JobProgress]:
+    """Re-run the categorization rules over the ledger, resuming after the last committed window"""
+    params = job.params
+    checkpoint = job.progress or {"after_id": 0, "scanned": 0, "categorized": 0}
+    last_id = (await db.execute(transaction_queries.max_transaction_id_query())).scalar() or 0
+    
+    chunks = transaction_queries.categorize_transactions_chunks(
+        db, params["overwrite"], params["chunk_size"], checkpoint["after_id"]
+    )
+    async for progress in chunks:
+        checkpoint = {
+            "after_id": progress["last_id"],
+            "scanned": checkpoint["scanned"] + progress["scanned"],
+            "categorized": checkpoint["categorized"] + progress["categorized"],
+        }
+        yield {"done": progress["last_id"], "total": last_id, "checkpoint": checkpoint}
+    
+    result = {"scanned": checkpoint["scanned"], "categorized": checkpoint["categorized"]}
+    yield {"done": last_id, "total": last_id, "result": result}
+
+async def run_rebucket_job(
+    db: AsyncSession,
+    job: Job,
+    executor: Optional[Executor]
+) -> AsyncIterator[JobProgress]:
+    """Re-bucket daily totals month range by month range, resuming at the first range not committed"""
+    params, checkpoint = job.params, job.progress
+    if checkpoint is None:
+        first_date, last_date = (await db.execute(daily_totals_queries.transaction_date_range_query())).one()
+        start_month = params["start_month"] or (month_key(first_date) if first_date else None)
+        end_month = params["end_month"] or (month_key(last_date) if last_date else None)
+        checkpoint = {"start_month": start_month, "end_month": end_month, "next_month": None, "rows": 0}
+        chunks = daily_totals_queries.rebuild_daily_totals_chunks(
+            db, params["start_month"], params["end_month"], params["chunk_months"]
+        )
+    else:
+        chunks = daily_totals_queries.rebuild_daily_totals_chunks(
+            db, checkpoint["next_month"], checkpoint["end_month"], params["chunk_months"]
+        )
+    total = month_span(checkpoint["start_month"], checkpoint["end_month"]) if checkpoint["start_month"] else 0
+    
+    async for progress in chunks:
+        mark_changed(db, ("daily_category_totals",))
+        checkpoint = {
+            **checkpoint,
+            "next_month": progress["end_month"],
+            "rows": checkpoint["rows"] + progress["rows"],
+        }
+        # end_month of a chunk is the first month after it
+        done = month_span(checkpoint["start_month"], progress["end_month"]) - 1
+        yield {"done": done, "total": total, "checkpoint": checkpoint}
+    
+    yield {"done": total, "total": total, "result": {"rows": checkpoint["rows"]}}
+
+async def run_rebuild_job(
+    db: AsyncSession,
+    job: Job,
+    executor: Optional[Executor]
+) -> AsyncIterator[JobProgress]:
+    """Recompute one derived table from transactions in a single step"""
+    table, rebuild = REBUILDS[job.params["aggregate"]]
+    rows = await rebuild(db)
+    mark_changed(db, (table,))
+    yield {"done": 1, "total": 1, "result": {"table": table, "rows": rows}}
+
+async def run_detect_recurring_job(
+    db: AsyncSession,
+    job: Job,
+    executor: Optional[Executor]
+) -> AsyncIterator[JobProgress]:
+    """Scan the ledger for recurring series, optionally creating rules for them
+    
+    The detector's state only lives in memory, so an interrupted scan starts over.
+    """
+    params = job.params
+    started = time.perf_counter()
+    detector = RecurringDetector()
+    async for progress in recurring_queries.scan_recurring_series(db, detector, params["chunk_size"]):
+        yield {"done": progress["scanned"]}
+    
+    detection = await recurring_queries.summarize_recurring_detection(
+        db, detector, params["min_occurrences"], started
+    )
+    if params["create"] and detection.candidates:
+        await recurring_queries.create_rules_from_candidates(db, detection.candidates)
+    yield {"done": detector.scanned, "total": detector.scanned, "result": detection.model_dump(mode="json")}
+
+# Job bodies by kind, each an async generator of JobProgress
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    "import": run_import_job,
+    "apply-rules": run_categorize_job,
+    "rebucket-daily-totals": run_rebucket_job,
+    "rebuild": run_rebuild_job,
+    "detect-recurring": run_detect_recurring_job,
+}
+
+# Names shown for each kind of job
+JOB_LABELS = {
+    "import": "Import",
+    "apply-rules": "Apply categorization rules",
+    "rebucket-daily-totals": "Re-bucket daily totals",
+    "rebuild": "Rebuild",
+    "detect-recurring": "Detect recurring series",
+}
\ No newline at end of file
@@ -0,0 +1,172 @@
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Iterable, Mapping, Tuple, Callable
+from decimal import Decimal
+from datetime import datetime
+
+from app.models.schema import transactions, monthly_category_totals
+from app.queries.category_stats import stats_key, UNCATEGORIZED_STATS_ID
+from app.utils.date_utils import month_key
+
+# SQL expression for a transaction's 'YYYY-MM' month key
+transaction_month = func.strftime('%Y-%m', transactions.c.date)
+
+# Pure function to fold transaction changes into per-(period, category, currency) deltas
+def summarize_period_changes(
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = (),
+    period_key: Callable[[datetime], str] = month_key
+) -> Dict[Tuple[str, int, str], Dict[str, Any]]:
+    """Fold removed and added transaction rows into one delta per (period, category, currency)"""
+    deltas: Dict[Tuple[str, int, str], Dict[str, Any]] = {}
+
+    for rows, sign in ((removed, -1), (added, 1)):
+        for row in rows:
+            key = (period_key(row["date"]), stats_key(row["category_id"]), row["currency"])
+            delta = deltas.setdefault(key, {"count": 0, "income": Decimal(0), "spending": Decimal(0)})
+            delta["count"] += sign
+            if row["amount"] > 0:
+                delta["income"] += sign * row["amount"]
+            else:
+                delta["spending"] -= sign * row["amount"]
+
+    return deltas
+
+# Pure function to build an upsert adding deltas to monthly_category_totals
+def apply_monthly_deltas_statement():
+    """Build an upsert adding one delta per parameter set to a (month, category, currency) row
+
+    Executed with a list of parameter sets, so the statement is compiled once
+    however many rows a change touches.
+    """
+    stmt = sqlite_insert(monthly_category_totals)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            monthly_category_totals.c.month,
+            monthly_category_totals.c.category_id,
+            monthly_category_totals.c.currency,
+        ],
+        set_={
+            "transaction_count": monthly_category_totals.c.transaction_count + excluded.transaction_count,
+            "income_total": monthly_category_totals.c.income_total + excluded.income_total,
+            "spending_total": monthly_category_totals.c.spending_total + excluded.spending_total,
+        }
+    )
+
+# Pure function to build the full-scan aggregate that monthly_category_totals caches
+def compute_monthly_totals_query():
+    """Build a query computing monthly totals directly from transactions"""
+    category_key = func.coalesce(transactions.c.category_id, UNCATEGORIZED_STATS_ID)
+    return (
+        select(
+            transaction_month.label('month'),
+            category_key.label('category_id'),
+            transactions.c.currency,
+            func.count().label('transaction_count'),
+            func.sum(
+                case((transactions.c.amount > 0, transactions.c.amount), else_=0)
+            ).label('income_total'),
+            func.sum(
+                case((transactions.c.amount < 0, -transactions.c.amount), else_=0)
+            ).label('spending_total'),
+        )
+        .group_by(transaction_month, category_key, transactions.c.currency)
+    )
+
+# Pure function to build a query for reading the stored totals
+def list_monthly_totals_query(
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None
+):
+    """Build a query for stored monthly totals, optionally within a month range"""
+    query = select(monthly_category_totals).order_by(
+        monthly_category_totals.c.month,
+        monthly_category_totals.c.category_id,
+        monthly_category_totals.c.currency
+    )
+    if start_month is not None:
+        query = query.where(monthly_category_totals.c.month >= start_month)
+    if end_month is not None:
+        query = query.where(monthly_category_totals.c.month <= end_month)
+    return query
+
+# Pure function to build a statement clearing the stored totals
+def clear_monthly_totals_statement():
+    """Build a delete statement removing all stored monthly totals"""
+    return delete(monthly_category_totals)
+
+# Pure function to build a statement repopulating totals from transactions
+def rebuild_monthly_totals_statement():
+    """Build an insert-from-select that recomputes every monthly row"""
+    return insert(monthly_category_totals).from_select(
+        ['month', 'category_id', 'currency', 'transaction_count', 'income_total', 'spending_total'],
+        compute_monthly_totals_query()
+    )
+
+# --- Handler functions that compose the above functions ---
+
+async def apply_transaction_changes(
+    db: AsyncSession,
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> None:
+    """Apply removed/added transaction rows to monthly_category_totals"""
+    deltas = summarize_period_changes(removed, added, month_key)
+
+    if not deltas:
+        return
+    await db.execute(apply_monthly_deltas_statement(), [
+        {
+            "month": month,
+            "category_id": category_key,
+            "currency": currency,
+            "transaction_count": delta["count"],
+            "income_total": delta["income"],
+            "spending_total": delta["spending"],
+        }
+        for (month, category_key, currency), delta in deltas.items()
+    ])
+
+async def rebuild_monthly_totals(db: AsyncSession) -> int:
+    """Recompute monthly_category_totals from scratch, returning the number of rows written"""
+    await db.execute(clear_monthly_totals_statement())
+    result = await db.execute(rebuild_monthly_totals_statement())
+    return result.rowcount
+
+async def verify_monthly_totals(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Compare stored monthly totals with a full recomputation
+
+    Returns:
+        One entry per drifted (month, category, currency) with the stored and expected rows
+    """
+    def key(row) -> Tuple[str, int, str]:
+        return (row.month, row.category_id, row.currency)
+
+    expected = {key(row): row._mapping for row in await db.execute(compute_monthly_totals_query())}
+    stored = {key(row): row._mapping for row in await db.execute(list_monthly_totals_query())}
+
+    def normalize(row: Optional[Mapping[str, Any]]) -> Optional[tuple]:
+        # Empty rows are equivalent to missing ones
+        if row is None or row["transaction_count"] == 0:
+            return None
+        return (
+            row["transaction_count"],
+            row["income_total"],
+            row["spending_total"],
+        )
+
+    drift = []
+    for month, category_key, currency in sorted(expected.keys() | stored.keys()):
+        stored_row = stored.get((month, category_key, currency))
+        expected_row = expected.get((month, category_key, currency))
+        if normalize(stored_row) != normalize(expected_row):
+            drift.append({
+                "month": month,
+                "category_id": category_key,
+                "currency": currency,
+                "stored": dict(stored_row) if stored_row else None,
+                "expected": dict(expected_row) if expected_row else None,
+            })
+    return drift
@@ -0,0 +1,202 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Tuple, FrozenSet
+from datetime import datetime, date
+
+from app.models.domain import TransactionFilter
+from app.queries import categories as category_queries
+from app.queries import transactions as transaction_queries
+from app.queries import category_stats as category_stats_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import dashboard as dashboard_queries
+from app.queries import reports as report_queries
+from app.queries import search as search_queries
+from app.queries import accounts as account_queries
+from app.queries import recurring as recurring_queries
+from app.queries import jobs as job_queries
+
+# A hot query: (name, statement, tables it may scan in full). Rollup tables
+# are pre-aggregated and small, so scanning them is expected.
+HotQuery = Tuple[str, Any, FrozenSet[str]]
+
+ROLLUP_TABLES = frozenset({"monthly_category_totals", "daily_category_totals"})
+
+# Pure function to list the statements that must stay index-backed
+def hot_queries() -> List[HotQuery]:
+    """Build the hot statements of app.queries with representative parameters"""
+    cursor = (datetime(2024, 6, 1), 1000)
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    no_scans = frozenset()
+
+    return [
+        (
+            "list_categories",
+            category_queries.list_categories_query().params(limit=100, offset=0),
+            no_scans,
+        ),
+        ("get_category", category_queries.get_category_query().params(category_id=1), no_scans),
+        ("list_categories_with_counts", category_queries.list_categories_with_counts_query(), no_scans),
+        ("list_transactions", transaction_queries.list_transactions_query(100, 0), no_scans),
+        ("list_transactions_by_category", transaction_queries.list_transactions_query(100, 0, 1), no_scans),
+        ("list_transactions_keyset", transaction_queries.list_transactions_keyset_query(101), no_scans),
+        (
+            "list_transactions_keyset_after",
+            transaction_queries.list_transactions_keyset_query(101, after=cursor),
+            no_scans,
+        ),
+        (
+            "list_transactions_keyset_before_by_category",
+            transaction_queries.list_transactions_keyset_query(101, 1, before=cursor),
+            no_scans,
+        ),
+        (
+            "search_transactions",
+            search_queries.search_transactions_query('"amaz"*', 50, TransactionFilter(category_ids=[1])),
+            no_scans,
+        ),
+        *[
+            (
+                f"list_transactions_filtered_{name}",
+                transaction_queries.list_transactions_keyset_query(
+                    101, filters=filters, use_category_index=use_category_index
+                ),
+                no_scans,
+            )
+            for name, filters, use_category_index in [
+                ("dates_amounts", TransactionFilter(start=start, end=end, min_amount=-50), True),
+                ("income", TransactionFilter(sign="income"), True),
+                ("uncategorized", TransactionFilter(uncategorized=True, sign="expense"), True),
+                ("categories", TransactionFilter(category_ids=[1, 2]), True),
+                ("categories_by_date", TransactionFilter(category_ids=[1, 2], uncategorized=True), False),
+                ("search", TransactionFilter(q="amaz", start=start), True),
+            ]
+        ],
+        (
+            "count_transactions_rollup",
+            transaction_queries.rollup_count_query(TransactionFilter(category_ids=[1, 2], start=start)),
+            no_scans,
+        ),
+        (
+            "count_transactions_capped",
+            transaction_queries.capped_count_query(TransactionFilter(category_ids=[1], sign="income")),
+            no_scans,
+        ),
+        (
+            "categorize_uncategorized_window",
+            transaction_queries.categorize_window_query(0, transaction_queries.CATEGORIZE_CHUNK_SIZE),
+            no_scans,
+        ),
+        (
+            "get_transaction",
+            transaction_queries.get_transaction_query().params(transaction_id=1),
+            no_scans,
+        ),
+        (
+            "get_transaction_row",
+            transaction_queries.get_transaction_row_query().params(transaction_id=1),
+            no_scans,
+        ),
+        ("delete_transaction", transaction_queries.delete_transaction_statement(1), no_scans),
+        (
+            "refresh_category_stats_dates",
+            category_stats_queries.refresh_category_stats_dates_statement(1),
+            no_scans,
+        ),
+        (
+            "refresh_uncategorized_stats_dates",
+            category_stats_queries.refresh_category_stats_dates_statement(
+                category_stats_queries.UNCATEGORIZED_STATS_ID
+            ),
+            no_scans,
+        ),
+        (
+            "compute_daily_totals_chunk",
+            daily_totals_queries.compute_daily_totals_query(datetime(2024, 1, 1), datetime(2024, 4, 1)),
+            no_scans,
+        ),
+        ("latest_balance_checkpoint", account_queries.latest_checkpoint_query(1, "2024-06"), no_scans),
+        (
+            "account_balance_delta",
+            account_queries.balance_delta_query(1, "USD", (datetime(2024, 6, 15), 0), "2024-05"),
+            no_scans,
+        ),
+        ("account_running_balance", account_queries.running_balance_query(1, cursor, 101), no_scans),
+        (
+            "account_month_sums",
+            account_queries.account_month_sums_query(1, "USD", datetime(2024, 1, 1), datetime(2024, 6, 1)),
+            no_scans,
+        ),
+        ("recurring_scan_chunk", recurring_queries.recurring_scan_query(cursor), no_scans),
+        ("due_recurring_rules", recurring_queries.due_recurring_rules_query(start), no_scans),
+        ("claim_next_job", job_queries.claim_next_job_statement(), no_scans),
+        ("dashboard_stats", dashboard_queries.dashboard_stats_query("2024-06", "2024-01"), ROLLUP_TABLES),
+        (
+            "dashboard_foreign_currency_totals",
+            report_queries.foreign_currency_totals_query("day"),
+            no_scans,
+        ),
+    ] + [
+        (
+            f"timeseries_{granularity}",
+            report_queries.timeseries_query(granularity, start, end, [1, 2], currency="USD"),
+            no_scans,
+        )
+        for granularity in report_queries.GRANULARITIES
+    ] + [
+        (
+            f"timeseries_{granularity}_foreign_currency",
+            report_queries.foreign_currency_totals_query(granularity, start, end, [1, 2]),
+            no_scans,
+        )
+        for granularity in report_queries.GRANULARITIES
+    ]
+
+def find_table_scans(plan_details: List[str]) -> List[str]:
+    """Return the tables an EXPLAIN QUERY PLAN reads without an index.
+
+    Args:
+        plan_details: The detail column of each plan row
+
+    Returns:
+        Names of tables that are scanned row by row
+    """
+    # Subqueries are evaluated into co-routines or temporary tables whose
+    # own plans are listed separately; scanning those is not a table scan
+    subqueries = {
+        detail.split()[1] for detail in plan_details
+        if detail.split()[0] in ("CO-ROUTINE", "MATERIALIZE") and len(detail.split()) >= 2
+    }
+    scanned = []
+    for detail in plan_details:
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and "INDEX" not in words and words[1] not in subqueries:
+            scanned.append(words[1])
+    return scanned
+
+# --- Handler functions that compose the above functions ---
+
+async def explain_query_plan(db: AsyncSession, statement: Any) -> List[str]:
+    """Run EXPLAIN QUERY PLAN for a statement and return the plan details"""
+    connection = await db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    # Expand IN lists and run bind processors (e.g. Cents) as execute() would
+    expanded = compiled.construct_expanded_state()
+    processors = {**compiled._bind_processors, **expanded.processors}
+    positional = tuple(
+        processors[name](value) if name in processors else value
+        for name, value in zip(expanded.positiontup, expanded.positional_parameters)
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {expanded.statement}", positional)
+    return [row[-1] for row in result]
+
+async def check_query_plans(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Explain every hot query and report those that fall back to a table scan
+
+    Returns:
+        One entry per hot query with its plan and any disallowed scans
+    """
+    report = []
+    for name, statement, allowed_scans in hot_queries():
+        plan = await explain_query_plan(db, statement)
+        scans = [table for table in find_table_scans(plan) if table not in allowed_scans]
+        report.append({"name": name, "plan": plan, "table_scans": scans})
+    return report
@@ -0,0 +1,265 @@
+from sqlalchemy import select, insert, update, delete, tuple_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+from datetime import date, datetime, time as day_start
+import time
+
+from app.models.schema import recurring_rules, transactions
+from app.models.domain import (
+    RecurringRule, RecurringRuleCreate, RecurringCandidate, RecurringDetection, RecurringGeneration
+)
+from app.core.cache import mark_changed
+from app.core.recurring import RecurringDetector, MIN_OCCURRENCES, add_cadence, normalize_description
+from app.queries import transactions as transaction_queries
+from app.utils.import_utils import batched
+
+# Tables that recurring rule writes touch
+RECURRING_TABLES = ("recurring_rules",)
+
+# Rows per chunk of the detector's scan
+DETECT_CHUNK_SIZE = 20000
+
+# Pure function to build a query for listing recurring rules
+def list_recurring_rules_query():
+    """Build a query for listing recurring rules by next date"""
+    return select(recurring_rules).order_by(recurring_rules.c.next_date, recurring_rules.c.id)
+
+# Pure function to build a query for getting a single recurring rule
+def get_recurring_rule_query(rule_id: int):
+    """Build a query to get a single recurring rule by ID"""
+    return (
+        select(recurring_rules)
+        .where(recurring_rules.c.id == rule_id)
+    )
+
+# Pure function to build an insert statement for creating a recurring rule
+def create_recurring_rule_statement(rule_data: RecurringRuleCreate):
+    """Build an insert statement for creating a recurring rule, first due on its start date"""
+    return (
+        insert(recurring_rules)
+        .values(**rule_data.dict(), next_date=rule_data.start_date)
+        .returning(recurring_rules)
+    )
+
+# Pure function to build a delete statement for deleting a recurring rule
+def delete_recurring_rule_statement(rule_id: int):
+    """Build a delete statement for deleting a recurring rule"""
+    return (
+        delete(recurring_rules)
+        .where(recurring_rules.c.id == rule_id)
+    )
+
+# Pure function to build a query for the rules with occurrences to generate
+def due_recurring_rules_query(through: date):
+    """Build a query for the rules whose next occurrence is on or before through and before their end"""
+    return (
+        select(recurring_rules)
+        .where(
+            recurring_rules.c.next_date <= through,
+            or_(recurring_rules.c.end_date.is_(None), recurring_rules.c.next_date <= recurring_rules.c.end_date)
+        )
+        .order_by(recurring_rules.c.next_date, recurring_rules.c.id)
+    )
+
+# Pure function to build an update moving a rule's next occurrence
+def advance_recurring_rule_statement(rule_id: int, next_date: date):
+    """Build an update statement setting a rule's next occurrence"""
+    return (
+        update(recurring_rules)
+        .where(recurring_rules.c.id == rule_id)
+        .values(next_date=next_date)
+    )
+
+# Pure function to build one chunk of the detector's date-ordered scan
+def recurring_scan_query(after: Optional[Tuple[datetime, int]], limit: int = DETECT_CHUNK_SIZE):
+    """Build a query for the next transactions in (date, id) order, oldest first
+
+    Each chunk is a keyset seek on ix_transactions_date_id, so the scan
+    costs the same per row however far into the ledger it is.
+    """
+    query = (
+        select(
+            transactions.c.id,
+            transactions.c.date,
+            transactions.c.description,
+            transactions.c.amount,
+            transactions.c.currency,
+            transactions.c.category_id,
+            transactions.c.account_id,
+        )
+        .order_by(transactions.c.date, transactions.c.id)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(transactions.c.date, transactions.c.id) > tuple_(*after))
+    return query
+
+# Pure function to lay out the transactions a rule owes
+def recurring_occurrences(rule: RecurringRule, through: date) -> Tuple[List[Dict[str, Any]], date]:
+    """List the transaction rows of a rule's occurrences up to through
+
+    Returns:
+        The rows, and the rule's next occurrence after them
+    """
+    rows = []
+    day = rule.next_date
+    last_day = min(through, rule.end_date) if rule.end_date else through
+    while day <= last_day:
+        rows.append({
+            "amount": rule.amount,
+            "currency": rule.currency,
+            "description": rule.description,
+            "date": datetime.combine(day, day_start()),
+            "category_id": rule.category_id,
+            "account_id": rule.account_id,
+        })
+        day = add_cadence(day, rule.cadence, rule.start_date.day)
+    return rows, day
+
+# --- Handler functions that compose the above functions ---
+
+async def list_recurring_rules(db: AsyncSession) -> List[RecurringRule]:
+    """List recurring rules"""
+    result = await db.execute(list_recurring_rules_query())
+    return [RecurringRule.from_orm(row) for row in result]
+
+async def get_recurring_rule(
+    db: AsyncSession,
+    rule_id: int
+) -> Optional[RecurringRule]:
+    """Get a single recurring rule by ID"""
+    result = await db.execute(get_recurring_rule_query(rule_id))
+    row = result.first()
+    return RecurringRule.from_orm(row) if row else None
+
+async def create_recurring_rule(
+    db: AsyncSession,
+    rule_data: RecurringRuleCreate
+) -> RecurringRule:
+    """Create a new recurring rule"""
+    # Build statement using pure function
+    stmt = create_recurring_rule_statement(rule_data)
+    
+    # Execute statement (side effect)
+    result = await db.execute(stmt)
+    mark_changed(db, RECURRING_TABLES)
+    
+    # Convert to domain model and return
+    return RecurringRule.from_orm(result.first())
+
+async def delete_recurring_rule(
+    db: AsyncSession,
+    rule_id: int
+) -> bool:
+    """Delete a recurring rule; transactions it already created are kept"""
+    result = await db.execute(delete_recurring_rule_statement(rule_id))
+    mark_changed(db, RECURRING_TABLES)
+    return result.rowcount > 0
+
+async def generate_recurring_transactions(
+    db: AsyncSession,
+    through: Optional[date] = None
+) -> RecurringGeneration:
+    """Create the transactions of every occurrence due up to through (today by default)
+    
+    Rows go through the same path as imports (rules categorize those
+    without a category, rollups and checkpoints are updated), and each rule's
+    next_date is moved past them in the same DB transaction, so running this
+    again, e.g. daily from cron, never creates an occurrence twice.
+    """
+    through = through or date.today()
+    rules = [RecurringRule.from_orm(row) for row in await db.execute(due_recurring_rules_query(through))]
+    
+    values: List[Dict[str, Any]] = []
+    for rule in rules:
+        rows, next_date = recurring_occurrences(rule, through)
+        values.extend(rows)
+        await db.execute(advance_recurring_rule_statement(rule.id, next_date))
+    if rules:
+        mark_changed(db, RECURRING_TABLES)
+    
+    # Execute statement as one executemany per batch (side effect)
+    stmt = transaction_queries.create_transactions_statement()
+    for batch in batched(values, transaction_queries.IMPORT_BATCH_SIZE):
+        await transaction_queries.categorize_new_transactions(db, batch)
+        await db.execute(stmt, batch)
+        await transaction_queries.apply_ledger_changes(db, added=batch)
+    
+    return RecurringGeneration(through=through, rules=len(rules), generated=len(values))
+
+async def scan_recurring_series(
+    db: AsyncSession,
+    detector: RecurringDetector,
+    chunk_size: int = DETECT_CHUNK_SIZE
+) -> AsyncIterator[Dict[str, Any]]:
+    """Feed the whole ledger to a detector in date order, yielding progress after each chunk"""
+    after = None
+    while True:
+        # Execute query (side effect)
+        rows = (await db.execute(recurring_scan_query(after, chunk_size))).all()
+        if not rows:
+            return
+        detector.add(row._mapping for row in rows)
+        after = (rows[-1].date, rows[-1].id)
+        yield {"scanned": detector.scanned, "series": len(detector.series), "last_date": rows[-1].date}
+
+async def summarize_recurring_detection(
+    db: AsyncSession,
+    detector: RecurringDetector,
+    min_occurrences: int,
+    started: float
+) -> RecurringDetection:
+    """Report the candidates of a detector that has seen the whole ledger
+    
+    Series that an existing recurring rule already covers, by normalized
+    description and currency, are left out. ``started`` is the
+    time.perf_counter() value the scan began at.
+    """
+    covered = {
+        (normalize_description(rule.description), rule.currency)
+        for rule in await list_recurring_rules(db)
+    }
+    candidates = [
+        RecurringCandidate(**candidate)
+        for candidate in detector.candidates(min_occurrences)
+        if (candidate["normalized_description"], candidate["currency"]) not in covered
+    ]
+    
+    elapsed = time.perf_counter() - started
+    return RecurringDetection(
+        scanned=detector.scanned,
+        series=len(detector.series),
+        candidates=candidates,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(detector.scanned / elapsed, 1) if elapsed else 0.0
+    )
+
+async def detect_recurring(
+    db: AsyncSession,
+    min_occurrences: int = MIN_OCCURRENCES,
+    chunk_size: int = DETECT_CHUNK_SIZE
+) -> RecurringDetection:
+    """Find periodic series (subscriptions, salary, rent) in the ledger, minus those rules cover"""
+    started = time.perf_counter()
+    detector = RecurringDetector()
+    async for _ in scan_recurring_series(db, detector, chunk_size):
+        pass
+    return await summarize_recurring_detection(db, detector, min_occurrences, started)
+
+async def create_rules_from_candidates(
+    db: AsyncSession,
+    candidates: List[RecurringCandidate]
+) -> List[RecurringRule]:
+    """Create a recurring rule continuing each detected series from its next occurrence"""
+    return [
+        await create_recurring_rule(db, RecurringRuleCreate(
+            description=candidate.description,
+            amount=candidate.amount,
+            currency=candidate.currency,
+            category_id=candidate.category_id,
+            account_id=candidate.account_id,
+            cadence=candidate.cadence,
+            start_date=candidate.next_date
+        ))
+        for candidate in candidates
+    ]
\ No newline at end of file
@@ -0,0 +1,215 @@
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from datetime import date
+from decimal import Decimal
+
+from app.config import settings
+from app.models.schema import daily_category_totals, monthly_category_totals
+from app.models.domain import TimeseriesPoint
+from app.core.fx import RateIndex, convert_amount
+from app.queries.category_stats import UNCATEGORIZED_STATS_ID
+from app.queries import fx_rates as fx_queries
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+# Running totals per (bucket, category_id): [transaction_count, income, spending]
+BucketTotals = Dict[Tuple[str, Optional[int]], List[Any]]
+
+def day_bucket(granularity: str, day):
+    """SQL expression labelling a 'YYYY-MM-DD' day key with its bucket"""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return func.date(day, 'weekday 0', '-6 days')
+    return func.substr(day, 1, 7 if granularity == "month" else 4)
+
+# Pure function to build a time-series query over the rollup tables
+def timeseries_query(
+    granularity: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_ids: Optional[List[int]] = None,
+    by_category: bool = True,
+    currency: Optional[str] = None
+):
+    """Build a query for income/spending bucketed by day, week, month or year
+
+    Day and week buckets read daily_category_totals; month and year buckets
+    read monthly_category_totals. Either way the work is a primary key range
+    scan over pre-aggregated rows, never a scan of transactions. The start/end
+    bounds are applied at the rollup's own grain (whole months for month and
+    year buckets). Weeks are labelled by their Monday. Amounts are summed as
+    stored, so pass currency to only include transactions in that currency.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    if granularity in ("day", "week"):
+        table = daily_category_totals
+        key = table.c.day
+        lower = start.isoformat() if start else None
+        upper = end.isoformat() if end else None
+        bucket = day_bucket(granularity, key)
+    else:
+        table = monthly_category_totals
+        key = table.c.month
+        lower = start.strftime("%Y-%m") if start else None
+        upper = end.strftime("%Y-%m") if end else None
+        bucket = key if granularity == "month" else func.substr(key, 1, 4)
+
+    columns = [bucket.label('bucket')]
+    group_by = [bucket]
+    if by_category:
+        columns.append(table.c.category_id)
+        group_by.append(table.c.category_id)
+
+    query = (
+        select(
+            *columns,
+            func.sum(table.c.transaction_count).label('transaction_count'),
+            func.sum(table.c.income_total).label('income'),
+            func.sum(table.c.spending_total).label('spending'),
+        )
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+
+    if lower is not None:
+        query = query.where(key >= lower)
+    if upper is not None:
+        query = query.where(key <= upper)
+    if category_ids:
+        query = query.where(table.c.category_id.in_(category_ids))
+    if currency is not None:
+        query = query.where(table.c.currency == currency)
+
+    return query
+
+# Pure function to build a query for the totals that need converting
+def foreign_currency_totals_query(
+    granularity: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_ids: Optional[List[int]] = None,
+    base_currency: str = settings.BASE_CURRENCY
+):
+    """Build a query for daily totals in currencies other than base_currency
+
+    Rates change daily, so these rows always come from daily_category_totals
+    and are returned as stored, labelled with the bucket they belong to;
+    they are converted and summed by the caller. The start/end bounds match
+    timeseries_query's grain. The currency condition is written as two
+    ranges so that ix_daily_category_totals_currency_day answers it with
+    two seeks, which find nothing at all when the whole ledger is in the
+    base currency. (A GROUP BY here would make SQLite scan the index.)
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    table = daily_category_totals
+    key = table.c.day
+    if granularity in ("day", "week"):
+        lower = start.isoformat() if start else None
+        upper = end.isoformat() if end else None
+    else:
+        # Whole months: every day key sorts between 'YYYY-MM' and 'YYYY-MM-31'
+        lower = start.strftime("%Y-%m") if start else None
+        upper = end.strftime("%Y-%m") + "-31" if end else None
+
+    query = select(
+        day_bucket(granularity, key).label('bucket'),
+        key,
+        table.c.category_id,
+        table.c.currency,
+        table.c.transaction_count,
+        table.c.income_total.label('income'),
+        table.c.spending_total.label('spending'),
+    ).where(or_(table.c.currency < base_currency, table.c.currency > base_currency))
+
+    if lower is not None:
+        query = query.where(key >= lower)
+    if upper is not None:
+        query = query.where(key <= upper)
+    if category_ids:
+        query = query.where(table.c.category_id.in_(category_ids))
+
+    return query
+
+# Pure function to add converted foreign-currency rows to bucket totals
+def add_converted_totals(
+    totals: BucketTotals,
+    rows: Sequence[Any],
+    rate_index: RateIndex,
+    by_category: bool = True
+) -> BucketTotals:
+    """Convert rows of foreign_currency_totals_query and add them to a copy of totals
+
+    Rates for all rows are looked up in one batch, once per distinct
+    (currency, day), and each row is converted before it is added.
+
+    Raises:
+        MissingRateError: If a row's currency has no rates
+    """
+    merged = {key: list(values) for key, values in totals.items()}
+    rates = rate_index.rates_for([(row.currency, row.day) for row in rows])
+    for row, rate in zip(rows, rates):
+        key = (row.bucket, row.category_id if by_category else None)
+        entry = merged.setdefault(key, [0, Decimal(0), Decimal(0)])
+        entry[0] += row.transaction_count
+        entry[1] += convert_amount(row.income, rate)
+        entry[2] += convert_amount(row.spending, rate)
+    return merged
+
+# --- Handler functions that compose the above functions ---
+
+async def get_timeseries(
+    db: AsyncSession,
+    granularity: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_ids: Optional[List[int]] = None,
+    by_category: bool = True
+) -> List[TimeseriesPoint]:
+    """Get income/spending per bucket in settings.BASE_CURRENCY, optionally split by category
+
+    Totals in other currencies are converted at the rate of their day.
+
+    Raises:
+        ValueError: If the granularity is not supported
+        MissingRateError: If a currency in the range has no FX rates
+    """
+    base_currency = settings.BASE_CURRENCY
+    
+    # Build queries using pure functions
+    query = timeseries_query(granularity, start, end, category_ids, by_category, base_currency)
+    foreign_query = foreign_currency_totals_query(granularity, start, end, category_ids, base_currency)
+    
+    # Execute queries (side effect)
+    totals: BucketTotals = {
+        (row.bucket, row.category_id if by_category else None):
+            [row.transaction_count, row.income, row.spending]
+        for row in await db.execute(query)
+    }
+    foreign_rows = (await db.execute(foreign_query)).all()
+    if foreign_rows:
+        rate_index = await fx_queries.get_rate_index(db, {row.currency for row in foreign_rows})
+        totals = add_converted_totals(totals, foreign_rows, rate_index, by_category)
+    
+    # Transform results; uncategorized totals are reported with category_id None
+    return [
+        TimeseriesPoint(
+            bucket=bucket,
+            category_id=(
+                category_id
+                if by_category and category_id != UNCATEGORIZED_STATS_ID
+                else None
+            ),
+            transaction_count=count,
+            income=income,
+            spending=spending,
+            net=income - spending,
+            currency=base_currency
+        )
+        for (bucket, category_id), (count, income, spending) in sorted(totals.items())
+    ]
@@ -0,0 +1,124 @@
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.models.schema import categorization_rules
+from app.models.domain import CategorizationRule, CategorizationRuleCreate
+from app.core.cache import VersionedCache, mark_changed, response_cache
+from app.core.categorization import RuleMatcher
+
+# Tables whose committed writes invalidate the compiled matcher
+RULE_TABLES = ("categorization_rules",)
+
+# The compiled matcher, reused until the rules change
+matcher_cache = VersionedCache(max_entries=1)
+
+# Pure function to build a query for listing rules in evaluation order
+def list_rules_query():
+    """Build a query for listing rules, highest priority first"""
+    return (
+        select(categorization_rules)
+        .order_by(categorization_rules.c.priority.desc(), categorization_rules.c.id)
+    )
+
+# Pure function to build a query for getting a single rule
+def get_rule_query(rule_id: int):
+    """Build a query to get a single rule by ID"""
+    return (
+        select(categorization_rules)
+        .where(categorization_rules.c.id == rule_id)
+    )
+
+# Pure function to build an insert statement for creating a rule
+def create_rule_statement(rule_data: CategorizationRuleCreate):
+    """Build an insert statement for creating a rule"""
+    return (
+        insert(categorization_rules)
+        .values(**rule_data.dict())
+        .returning(categorization_rules)
+    )
+
+# Pure function to build a delete statement for deleting a rule
+def delete_rule_statement(rule_id: int):
+    """Build a delete statement for deleting a rule"""
+    return (
+        delete(categorization_rules)
+        .where(categorization_rules.c.id == rule_id)
+    )
+
+# Pure function to build a delete statement for the rules of a category
+def delete_category_rules_statement(category_id: int):
+    """Build a delete statement for every rule assigning a category"""
+    return (
+        delete(categorization_rules)
+        .where(categorization_rules.c.category_id == category_id)
+    )
+
+# Pure function to build a statement pointing one category's rules at another
+def reassign_category_rules_statement(source_id: int, target_id: int):
+    """Build an update moving every rule of a category to another one"""
+    return (
+        update(categorization_rules)
+        .where(categorization_rules.c.category_id == source_id)
+        .values(category_id=target_id)
+    )
+
+# --- Handler functions that compose the above functions ---
+
+async def list_rules(db: AsyncSession) -> List[CategorizationRule]:
+    """List rules in the order they are evaluated"""
+    # Build query using pure function
+    query = list_rules_query()
+    
+    # Execute query (side effect)
+    result = await db.execute(query)
+    
+    # Transform results
+    return [CategorizationRule.from_orm(row) for row in result]
+
+async def get_rule(
+    db: AsyncSession,
+    rule_id: int
+) -> Optional[CategorizationRule]:
+    """Get a single rule by ID"""
+    result = await db.execute(get_rule_query(rule_id))
+    row = result.first()
+    return CategorizationRule.from_orm(row) if row else None
+
+async def create_rule(
+    db: AsyncSession,
+    rule_data: CategorizationRuleCreate
+) -> CategorizationRule:
+    """Create a new rule"""
+    # Build statement using pure function
+    stmt = create_rule_statement(rule_data)
+    
+    # Execute statement (side effect)
+    result = await db.execute(stmt)
+    mark_changed(db, RULE_TABLES)
+    
+    # Convert to domain model and return
+    return CategorizationRule.from_orm(result.first())
+
+async def delete_rule(
+    db: AsyncSession,
+    rule_id: int
+) -> bool:
+    """Delete a rule"""
+    result = await db.execute(delete_rule_statement(rule_id))
+    mark_changed(db, RULE_TABLES)
+    return result.rowcount > 0
+
+async def get_rule_matcher(db: AsyncSession) -> RuleMatcher:
+    """Return the compiled matcher for the current rules
+    
+    The rules are loaded and compiled again only after a committed write to
+    categorization_rules.
+    """
+    versions = response_cache.versions(RULE_TABLES)
+    matcher = matcher_cache.get("rules", versions)
+    if matcher is None:
+        result = await db.execute(list_rules_query())
+        matcher = RuleMatcher(row._mapping for row in result)
+        matcher_cache.put("rules", versions, matcher)
+    return matcher
\ No newline at end of file
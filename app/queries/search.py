@@ -0,0 +1,95 @@
+from sqlalchemy import select, text, func
+from sqlalchemy.exc import DatabaseError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any
+
+from app.models.schema import transactions, categories, transactions_fts
+from app.models.domain import TransactionWithCategory, TransactionFilter
+from app.utils.search_utils import build_fts_query
+from app.queries.transactions import row_to_transaction_with_category, transaction_filter_clauses
+
+# Pure function to build a full-text search query over transaction descriptions
+def search_transactions_query(
+    match: str,
+    limit: int = 50,
+    filters: Optional[TransactionFilter] = None
+):
+    """Build a query ranking transactions by bm25 relevance to an FTS5 MATCH expression.
+
+    The FTS index drives the query and each hit is joined to its transaction
+    by primary key, so no row of transactions is scanned.
+    """
+    query = (
+        select(
+            transactions,
+            categories.c.name.label('category_name'),
+            categories.c.description.label('category_description')
+        )
+        .select_from(
+            transactions_fts
+            .join(transactions, transactions.c.id == transactions_fts.c.rowid)
+            .outerjoin(categories, transactions.c.category_id == categories.c.id)
+        )
+        .where(transactions_fts.c.description.match(match))
+        .order_by(transactions_fts.c.rank, transactions.c.date.desc(), transactions.c.id.desc())
+        .limit(limit)
+    )
+    
+    # Apply the other filters if provided; the search text is the MATCH itself
+    if filters is not None:
+        query = query.where(*transaction_filter_clauses(filters.model_copy(update={"q": None})))
+        
+    return query
+
+# Pure function to build the statement re-indexing every description
+def rebuild_search_index_statement():
+    """Build the FTS5 'rebuild' command, which re-reads the content table"""
+    return text("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+# Pure function to build the statement comparing the index with transactions
+def check_search_index_statement():
+    """Build the FTS5 'integrity-check' command; rank 1 also checks the content table"""
+    return text("INSERT INTO transactions_fts (transactions_fts, rank) VALUES ('integrity-check', 1)")
+
+# --- Handler functions that compose the above functions ---
+
+async def search_transactions(
+    db: AsyncSession,
+    q: str,
+    limit: int = 50,
+    filters: Optional[TransactionFilter] = None
+) -> List[TransactionWithCategory]:
+    """Search transaction descriptions by word prefixes, best matches first"""
+    match = build_fts_query(q)
+    if match is None:
+        return []
+    
+    # Build query using pure function
+    query = search_transactions_query(match, limit, filters)
+    
+    # Execute query (side effect)
+    result = await db.execute(query)
+    
+    # Transform results using pure function
+    return [row_to_transaction_with_category(row) for row in result]
+
+async def rebuild_search_index(db: AsyncSession) -> int:
+    """Re-index every transaction description, returning the number of rows indexed"""
+    await db.execute(rebuild_search_index_statement())
+    result = await db.execute(select(func.count()).select_from(transactions))
+    return result.scalar_one()
+
+async def verify_search_index(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Check that the FTS index matches transactions
+
+    Returns:
+        A single drift entry if the index is out of sync, else an empty list
+    """
+    try:
+        await db.execute(check_search_index_statement())
+    except OperationalError:
+        # Missing table or locked database, not a drifted index
+        raise
+    except DatabaseError:
+        return [{"table": "transactions_fts", "stored": "out of sync", "expected": "in sync"}]
+    return []
\ No newline at end of file
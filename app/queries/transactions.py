@@ -1,18 +1,186 @@
-from sqlalchemy import select, insert, update, delete, join
+from sqlalchemy import (
+    select, insert, update, delete, join, tuple_, Row, func, or_, case, literal_column,
+    bindparam, lambda_stmt
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Dict, Any
+from pydantic import ValidationError
+from typing import (
+    List, Optional, Dict, Any, Tuple, Iterable, Mapping, AsyncIterator, Callable
+)
+from datetime import datetime, time as day_start, timedelta
+from functools import lru_cache
+import time
 
-from app.models.schema import transactions, categories
-from app.models.domain import Transaction, TransactionCreate, TransactionWithCategory
+from app.models.schema import (
+    transactions, categories, transactions_fts, category_stats, daily_category_totals
+)
+from app.models.domain import (
+    Category, Transaction, TransactionCreate, TransactionWithCategory, TransactionPage,
+    TransactionFilter, ResultCount, ImportResult, ImportRowError, TransactionUpdate,
+    TransactionBatchOperation, BatchItemResult, BatchResult, CategorizationResult
+)
+from app.core.cache import LEDGER_TABLES, mark_changed, response_cache, count_cache
+from app.utils.date_utils import day_key
+from app.utils.search_utils import build_fts_query
+from app.utils.pagination_utils import encode_cursor, decode_cursor
+from app.utils.import_utils import ImportRow, batched
+from app.queries import category_stats as category_stats_queries
+from app.queries import monthly_totals as monthly_totals_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import rules as rule_queries
+from app.queries import accounts as account_queries
 
-# Pure function to build a query for listing transactions
-def list_transactions_query(
-    limit: int = 100, 
-    offset: int = 0,
-    category_id: Optional[int] = None
-):
-    """Build a query for listing transactions with optional filtering"""
-    query = (
+# Rows inserted per executemany call during imports
+IMPORT_BATCH_SIZE = 1000
+
+# Cap on the per-row errors kept in an import report, so memory stays bounded
+MAX_IMPORT_ERRORS = 1000
+
+# Most rows one list, page or search request may ask for
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched from the cursor and encoded per chunk during exports
+EXPORT_CHUNK_SIZE = 1000
+
+# Most operations accepted in one batch request
+MAX_BATCH_OPERATIONS = 5000
+
+# Primary key range scanned per statement when re-running categorization rules
+CATEGORIZE_CHUNK_SIZE = 5000
+
+# Filters the rollups cannot answer are counted up to this many matches
+COUNT_CAP = 10000
+
+# Above this share of the ledger, a multi-category page is read by walking the
+# date index (stopping after one page of matches) rather than by collecting
+# and sorting every match from the category index
+CATEGORY_INDEX_MAX_SHARE = 0.02
+
+# Pure function to build the WHERE clauses of a transaction filter
+def transaction_filter_clauses(
+    filters: TransactionFilter,
+    use_category_index: bool = True
+) -> List[Any]:
+    """Build the predicates of a filter, ordered so each combination is index-driven.
+
+    The most selective indexed predicate comes first and decides the access path:
+    a description search is driven by the FTS index, category and
+    uncategorized-only filters by ix_transactions_category_id_date_id (NULL is
+    indexed, so uncategorized is an equality lookup too), and everything else by
+    ix_transactions_date_id, which both bounds a date range and yields rows in
+    listing order. Amount and sign are residual checks on the rows that path
+    yields. Columns are never wrapped in functions, so every predicate stays
+    usable by an index.
+    
+    A single category is always read from the composite index, which returns it
+    in listing order. Several categories come back from it unordered, so with
+    ``use_category_index=False`` their predicate is written as ``category_id + 0``,
+    which SQLite cannot match to an index, and the date index drives instead.
+    """
+    clauses = []
+    
+    match = build_fts_query(filters.q) if filters.q else None
+    if match is not None:
+        clauses.append(transactions.c.id.in_(
+            select(transactions_fts.c.rowid).where(transactions_fts.c.description.match(match))
+        ))
+    
+    category_ids = sorted(set(filters.category_ids))
+    category = transactions.c.category_id
+    if not use_category_index:
+        category = transactions.c.category_id + literal_column("0")
+    if len(category_ids) == 1 and not filters.uncategorized:
+        clauses.append(transactions.c.category_id == category_ids[0])
+    elif category_ids and filters.uncategorized:
+        clauses.append(or_(category.in_(category_ids), category.is_(None)))
+    elif category_ids:
+        clauses.append(category.in_(category_ids))
+    elif filters.uncategorized:
+        clauses.append(transactions.c.category_id.is_(None))
+    
+    if filters.start is not None:
+        clauses.append(transactions.c.date >= datetime.combine(filters.start, day_start.min))
+    if filters.end is not None:
+        clauses.append(
+            transactions.c.date < datetime.combine(filters.end + timedelta(days=1), day_start.min)
+        )
+    
+    if filters.sign == "income":
+        clauses.append(transactions.c.amount > 0)
+    elif filters.sign == "expense":
+        clauses.append(transactions.c.amount < 0)
+    if filters.min_amount is not None:
+        clauses.append(transactions.c.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        clauses.append(transactions.c.amount <= filters.max_amount)
+    
+    return clauses
+
+# Pure function to build an exact count from the rollup tables, if the filter allows it
+def rollup_count_query(filters: TransactionFilter):
+    """Build a count of the matches read from category_stats or daily_category_totals.
+
+    Returns None when the filter has row-level predicates (search, amount or
+    sign) that the rollups cannot answer.
+    """
+    if (
+        filters.q or filters.sign
+        or filters.min_amount is not None or filters.max_amount is not None
+    ):
+        return None
+    
+    keys = sorted(set(filters.category_ids))
+    if filters.uncategorized:
+        keys.append(category_stats_queries.UNCATEGORIZED_STATS_ID)
+    
+    if filters.start is None and filters.end is None:
+        query = select(func.coalesce(func.sum(category_stats.c.transaction_count), 0))
+        if keys:
+            query = query.where(category_stats.c.category_id.in_(keys))
+        return query
+    
+    query = select(func.coalesce(func.sum(daily_category_totals.c.transaction_count), 0))
+    if filters.start is not None:
+        query = query.where(daily_category_totals.c.day >= day_key(filters.start))
+    if filters.end is not None:
+        query = query.where(daily_category_totals.c.day <= day_key(filters.end))
+    if keys:
+        query = query.where(daily_category_totals.c.category_id.in_(keys))
+    return query
+
+# Pure function to build a query for the share of the ledger in some categories
+def category_share_query(filters: TransactionFilter):
+    """Build a (matching, total) transaction count query over category_stats"""
+    keys = sorted(set(filters.category_ids))
+    if filters.uncategorized:
+        keys.append(category_stats_queries.UNCATEGORIZED_STATS_ID)
+    return select(
+        func.coalesce(func.sum(case(
+            (category_stats.c.category_id.in_(keys), category_stats.c.transaction_count),
+            else_=0
+        )), 0).label('matching'),
+        func.coalesce(func.sum(category_stats.c.transaction_count), 0).label('total')
+    )
+
+# Pure function to build a count that stops after a cap
+def capped_count_query(filters: TransactionFilter, cap: int = COUNT_CAP):
+    """Build a count of at most ``cap + 1`` matches; a result above ``cap`` means "more than cap"."""
+    matches = (
+        select(transactions.c.id)
+        .where(*transaction_filter_clauses(filters))
+        .limit(cap + 1)
+        .subquery()
+    )
+    return select(func.count()).select_from(matches)
+
+# Pure function to build the columns and join every transaction listing selects
+@lru_cache(maxsize=None)
+def transaction_listing_query():
+    """Build the transactions-with-category select that listings add criteria to.
+
+    Built once; statements derived from it share its columns and join.
+    """
+    return (
         select(
             transactions, 
             categories.c.name.label('category_name'),
@@ -24,25 +192,125 @@ def list_transactions_query(
                 transactions.c.category_id == categories.c.id
             )
         )
-        .order_by(transactions.c.date.desc())
+    )
+
+# Pure function to turn listing steps and filter predicates into one statement
+def transaction_listing_statement(steps: List[Callable], clauses: List[Any]):
+    """Apply ``steps`` (``lambda s: s.where(...)`` style callables) to the listing select.
+
+    Without filter predicates the steps are chained into a lambda statement:
+    SQLAlchemy then caches the statement it builds by the lambdas' code and
+    only extracts the closure values (limit, cursor, category ID) as bound
+    parameters on later calls, skipping construction and cache key
+    generation. Filter predicates vary in number and carry their own bound
+    values, which a lambda would cache along with its first call, so
+    filtered listings apply the same steps to a plain select instead.
+    """
+    if clauses:
+        query = transaction_listing_query()
+        for step in steps:
+            query = step(query)
+        return query.where(*clauses)
+    
+    query = lambda_stmt(lambda: transaction_listing_query())
+    for step in steps:
+        query += step
+    return query
+
+# Pure function to build a query for listing transactions
+def list_transactions_query(
+    limit: int = 100, 
+    offset: int = 0,
+    category_id: Optional[int] = None,
+    filters: Optional[TransactionFilter] = None
+):
+    """Build a query for listing transactions with optional filtering"""
+    steps = [
+        lambda s: s.order_by(transactions.c.date.desc(), transactions.c.id.desc())
         .limit(limit)
         .offset(offset)
-    )
+    ]
     
     # Apply category filter if provided
     if category_id is not None:
-        query = query.where(transactions.c.category_id == category_id)
-        
+        steps.append(lambda s: s.where(transactions.c.category_id == category_id))
+    
+    # Apply the remaining filters if provided
+    clauses = transaction_filter_clauses(filters) if filters is not None else []
+    return transaction_listing_statement(steps, clauses)
+
+# Pure function to build a keyset (cursor) query for listing transactions
+def list_transactions_keyset_query(
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    before: Optional[Tuple[datetime, int]] = None,
+    filters: Optional[TransactionFilter] = None,
+    use_category_index: bool = True
+):
+    """Build a query that seeks by (date, id) instead of skipping OFFSET rows.
+
+    Rows come back newest first when paging forward (``after``), and oldest
+    first when paging backward (``before``) so that the LIMIT applies to the
+    rows nearest the cursor; the caller reverses the latter.
+    """
+    steps = [lambda s: s.limit(limit)]
+    
+    if before is not None:
+        before_date, before_id = before
+        steps.append(
+            lambda s: s.where(
+                tuple_(transactions.c.date, transactions.c.id) > tuple_(before_date, before_id)
+            ).order_by(transactions.c.date.asc(), transactions.c.id.asc())
+        )
+    else:
+        steps.append(lambda s: s.order_by(transactions.c.date.desc(), transactions.c.id.desc()))
+        if after is not None:
+            after_date, after_id = after
+            steps.append(
+                lambda s: s.where(
+                    tuple_(transactions.c.date, transactions.c.id) < tuple_(after_date, after_id)
+                )
+            )
+    
+    # Apply category filter if provided
+    if category_id is not None:
+        steps.append(lambda s: s.where(transactions.c.category_id == category_id))
+    
+    # Apply the remaining filters if provided
+    clauses = []
+    if filters is not None:
+        clauses = transaction_filter_clauses(filters, use_category_index)
+    return transaction_listing_statement(steps, clauses)
+
+# Pure function to build an unpaged listing of every match, newest first
+def stream_transaction_listing_query(
+    filters: Optional[TransactionFilter] = None,
+    use_category_index: bool = True
+):
+    """Build the listing select without a limit, for rendering a whole result as it is read"""
+    query = transaction_listing_query().order_by(transactions.c.date.desc(), transactions.c.id.desc())
+    if filters is not None:
+        query = query.where(*transaction_filter_clauses(filters, use_category_index))
     return query
 
-# Pure function to build a query for getting a single transaction
-def get_transaction_query(transaction_id: int):
-    """Build a query to get a single transaction by ID"""
-    return (
+# Pure function to build a query for exporting the ledger in date order
+def export_transactions_query(filters: Optional[TransactionFilter] = None):
+    """Build a flat export query, oldest first, with optional filtering.
+
+    The (date, id) order is served by the keyset indexes, so rows stream
+    without a sort step.
+    """
+    query = (
         select(
-            transactions, 
+            transactions.c.id,
+            transactions.c.date,
+            transactions.c.amount,
+            transactions.c.currency,
+            transactions.c.description,
+            transactions.c.category_id,
             categories.c.name.label('category_name'),
-            categories.c.description.label('category_description')
+            transactions.c.account_id
         )
         .select_from(
             transactions.outerjoin(
@@ -50,7 +318,32 @@ def get_transaction_query(transaction_id: int):
                 transactions.c.category_id == categories.c.id
             )
         )
-        .where(transactions.c.id == transaction_id)
+        .order_by(transactions.c.date.asc(), transactions.c.id.asc())
+    )
+    
+    # Apply filters if provided; the whole ledger is read in date order, so the
+    # date index drives even for several categories
+    if filters is not None:
+        query = query.where(*transaction_filter_clauses(filters, use_category_index=False))
+        
+    return query
+
+# Pure function to build a query for getting a single transaction
+@lru_cache(maxsize=None)
+def get_transaction_query():
+    """Build a query to get a single transaction, executed with {"transaction_id"}
+
+    Built once, so its compiled form is found by a cache key computed once.
+    """
+    return transaction_listing_query().where(transactions.c.id == bindparam('transaction_id'))
+
+# Pure function to build a query for a transaction's stored values
+@lru_cache(maxsize=None)
+def get_transaction_row_query():
+    """Build a query for the raw transactions row, executed with {"transaction_id"}"""
+    return (
+        select(transactions)
+        .where(transactions.c.id == bindparam('transaction_id'))
     )
 
 # Pure function to build an insert statement for creating a transaction
@@ -62,6 +355,11 @@ def create_transaction_statement(transaction_data: TransactionCreate):
         .returning(transactions)
     )
 
+# Pure function to build a bulk insert statement, executed with a list of rows
+def create_transactions_statement():
+    """Build an insert statement for executemany-style bulk creation"""
+    return insert(transactions)
+
 # Pure function to build an update statement for updating a transaction
 def update_transaction_statement(transaction_id: int, transaction_data: Dict[str, Any]):
     """Build an update statement for updating a transaction"""
@@ -78,51 +376,161 @@ def delete_transaction_statement(transaction_id: int):
     return (
         delete(transactions)
         .where(transactions.c.id == transaction_id)
+        .returning(transactions)
+    )
+
+# Pure function to build a bulk insert statement that returns the created rows
+def create_transactions_returning_statement():
+    """Build an insert statement for bulk creation, returning rows in parameter order"""
+    return insert(transactions).returning(transactions, sort_by_parameter_order=True)
+
+# Pure function to build a query for the stored values of several transactions
+def get_transaction_rows_query(transaction_ids: List[int]):
+    """Build a query for the transactions rows with the given IDs"""
+    return select(transactions).where(transactions.c.id.in_(transaction_ids))
+
+# Pure function to build an update statement applying the same change to many transactions
+def update_transactions_statement(transaction_ids: List[int], transaction_data: Dict[str, Any]):
+    """Build an UPDATE ... WHERE id IN (...) statement"""
+    return (
+        update(transactions)
+        .where(transactions.c.id.in_(transaction_ids))
+        .values(**transaction_data)
+        .returning(transactions)
+    )
+
+# Pure function to build a delete statement for many transactions
+def delete_transactions_statement(transaction_ids: List[int]):
+    """Build a DELETE ... WHERE id IN (...) statement"""
+    return (
+        delete(transactions)
+        .where(transactions.c.id.in_(transaction_ids))
+        .returning(transactions)
+    )
+
+# Pure function to build a query for the highest transaction ID
+@lru_cache(maxsize=None)
+def max_transaction_id_query():
+    """Build a query for the largest transaction ID"""
+    return select(func.max(transactions.c.id))
+
+# Pure function to build a query for one window of transactions to categorize
+def categorize_window_query(after_id: int, chunk_size: int, overwrite: bool = False):
+    """Build a query for the transactions with after_id < id <= after_id + chunk_size
+
+    Windows are primary key ranges. The uncategorized filter is written as
+    category_id + 0 so SQLite keeps the rowid range instead of walking the
+    NULL keys of ix_transactions_category_id_date_id for every window.
+    """
+    query = (
+        select(transactions)
+        .where(transactions.c.id > after_id, transactions.c.id <= after_id + chunk_size)
+        .order_by(transactions.c.id)
     )
+    if not overwrite:
+        query = query.where((transactions.c.category_id + literal_column("0")).is_(None))
+    return query
+
+# Pure function to describe a validation error in one line
+def validation_error_message(exc: ValidationError) -> str:
+    """Join the errors of a ValidationError as 'field: message' pairs"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+# Pure function to validate one batch of parsed import rows
+def validate_import_batch(batch: List[ImportRow]) -> Tuple[List[Dict[str, Any]], List[ImportRowError]]:
+    """Split import rows into insertable values and per-row errors"""
+    values, failures = [], []
+    for position, raw in batch:
+        try:
+            values.append(TransactionCreate(**raw).dict())
+        except ValidationError as exc:
+            failures.append(ImportRowError(row=position, error=validation_error_message(exc)))
+    return values, failures
 
 # Function to convert a row to a TransactionWithCategory model
 def row_to_transaction_with_category(row) -> TransactionWithCategory:
-    """Convert a database row to a TransactionWithCategory model"""
-    # Extract transaction data
-    transaction_data = {
-        "id": row.id,
-        "amount": row.amount,
-        "description": row.description,
-        "date": row.date,
-        "category_id": row.category_id,
-        "created_at": row.created_at,
-    }
-    
-    # Create base transaction
-    transaction = Transaction(**transaction_data)
-    
+    """Convert a database row to a TransactionWithCategory model
+
+    Rows come straight from our own schema, so the models are built once with
+    model_construct rather than validated field by field.
+    """
     # Add category if available
-    category_data = None
+    category = None
     if hasattr(row, 'category_name') and row.category_name:
-        category_data = {
-            "id": row.category_id,
-            "name": row.category_name,
-            "description": row.category_description,
-            "created_at": row.created_at  # Approximate, as we don't have the actual category created_at
-        }
+        category = Category.model_construct(
+            id=row.category_id,
+            name=row.category_name,
+            description=row.category_description,
+            created_at=row.created_at  # Approximate, as we don't have the actual category created_at
+        )
     
     # Create TransactionWithCategory
-    return TransactionWithCategory(
-        **transaction.dict(),
-        category=category_data
+    return TransactionWithCategory.model_construct(
+        id=row.id,
+        amount=row.amount,
+        currency=row.currency,
+        description=row.description,
+        date=row.date,
+        category_id=row.category_id,
+        account_id=row.account_id,
+        created_at=row.created_at,
+        category=category
     )
 
 # --- Handler functions that compose the above functions ---
 
+async def apply_ledger_changes(
+    db: AsyncSession,
+    removed: Iterable[Mapping[str, Any]] = (),
+    added: Iterable[Mapping[str, Any]] = ()
+) -> None:
+    """Keep derived tables in step with rows removed from/added to transactions
+
+    Must be called in the same DB transaction as the write it describes.
+    """
+    removed, added = list(removed), list(added)
+    mark_changed(db, LEDGER_TABLES)
+    await category_stats_queries.apply_transaction_changes(db, removed, added)
+    await monthly_totals_queries.apply_transaction_changes(db, removed, added)
+    await daily_totals_queries.apply_transaction_changes(db, removed, added)
+    await account_queries.shift_balance_checkpoints(db, removed, added)
+
+async def categorize_new_transactions(
+    db: AsyncSession,
+    values: List[Dict[str, Any]]
+) -> None:
+    """Fill in category_id from the categorization rules for new rows that have none"""
+    if all(row["category_id"] is not None for row in values):
+        return
+    matcher = await rule_queries.get_rule_matcher(db)
+    for row in values:
+        if row["category_id"] is None:
+            row["category_id"] = matcher.categorize(row["description"], row["amount"])
+
+async def insert_transaction_rows(
+    db: AsyncSession,
+    values: List[Dict[str, Any]]
+) -> None:
+    """Bulk insert validated rows, categorizing them and updating the derived tables"""
+    await categorize_new_transactions(db, values)
+    
+    # Execute statement as a single executemany (side effect)
+    await db.execute(create_transactions_statement(), values)
+    await apply_ledger_changes(db, added=values)
+
 async def list_transactions(
     db: AsyncSession,
     limit: int = 100,
     offset: int = 0,
-    category_id: Optional[int] = None
+    category_id: Optional[int] = None,
+    filters: Optional[TransactionFilter] = None
 ) -> List[TransactionWithCategory]:
     """List transactions with optional filtering"""
     # Build query using pure function
-    query = list_transactions_query(limit, offset, category_id)
+    query = list_transactions_query(limit, offset, category_id, filters)
     
     # Execute query (side effect)
     result = await db.execute(query)
@@ -130,16 +538,167 @@ async def list_transactions(
     # Transform results using pure function
     return [row_to_transaction_with_category(row) for row in result]
 
+async def list_transactions_keyset(
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    filters: Optional[TransactionFilter] = None,
+    include_total: bool = False
+) -> TransactionPage:
+    """List one page of transactions using an opaque (date, id) cursor
+
+    ``include_total`` adds the number of matches, see count_transactions.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    direction, after, before = "next", None, None
+    if cursor:
+        direction, date, row_id = decode_cursor(cursor)
+        if direction == "prev":
+            before = (date, row_id)
+        else:
+            after = (date, row_id)
+    
+    # Fetch one extra row to learn whether another page exists
+    use_category_index = True
+    if filters is not None:
+        use_category_index = await prefers_category_index(db, filters)
+    query = list_transactions_keyset_query(
+        limit + 1, category_id, after, before, filters, use_category_index
+    )
+    
+    # Execute query (side effect)
+    result = await db.execute(query)
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+    
+    items = [row_to_transaction_with_category(row) for row in rows]
+    total = None
+    if include_total:
+        total = await count_transactions(db, filters or TransactionFilter(), category_id)
+    if not items:
+        return TransactionPage(items=items, total=total)
+    
+    first, last = items[0], items[-1]
+    has_next = has_more if direction == "next" else True
+    has_prev = has_more if direction == "prev" else bool(cursor)
+    return TransactionPage(
+        items=items,
+        next_cursor=encode_cursor(last.date, last.id, "next") if has_next else None,
+        prev_cursor=encode_cursor(first.date, first.id, "prev") if has_prev else None,
+        total=total
+    )
+
+async def prefers_category_index(db: AsyncSession, filters: TransactionFilter) -> bool:
+    """Whether a multi-category filter matches few enough rows to read them via the category index"""
+    if len(set(filters.category_ids)) + int(filters.uncategorized) < 2:
+        return True
+    
+    # Execute query (side effect)
+    result = await db.execute(category_share_query(filters))
+    matching, total = result.one()
+    return not total or matching / total <= CATEGORY_INDEX_MAX_SHARE
+
+async def count_transactions(
+    db: AsyncSession,
+    filters: TransactionFilter,
+    category_id: Optional[int] = None
+) -> ResultCount:
+    """Count the transactions matching a filter without a full COUNT(*) where possible
+
+    Date and category filters are summed exactly from the rollup tables. Other
+    filters run a count capped at COUNT_CAP, whose result is cached until the
+    next committed ledger write.
+    """
+    if category_id is not None:
+        filters = filters.model_copy(update={"category_ids": [category_id]})
+    
+    # Build query using pure function
+    query = rollup_count_query(filters)
+    if query is not None:
+        # Execute query (side effect)
+        result = await db.execute(query)
+        return ResultCount(count=result.scalar_one())
+    
+    # Snapshot the versions first: a write committed meanwhile makes the entry stale
+    key = filters.model_dump_json()
+    versions = response_cache.versions(LEDGER_TABLES)
+    cached = count_cache.get(key, versions)
+    if cached is not None:
+        return cached
+    
+    # Execute query (side effect)
+    result = await db.execute(capped_count_query(filters))
+    count = result.scalar_one()
+    total = ResultCount(count=min(count, COUNT_CAP), exact=count <= COUNT_CAP)
+    count_cache.put(key, versions, total)
+    return total
+
+async def stream_transactions(
+    db: AsyncSession,
+    filters: Optional[TransactionFilter] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[List[Row]]:
+    """Yield export rows in chunks of at most ``chunk_size``.
+
+    The result is consumed through a server-side cursor, so memory use depends
+    on ``chunk_size`` and not on the size of the ledger.
+    """
+    # Build query using pure function
+    query = export_transactions_query(filters).execution_options(
+        yield_per=chunk_size
+    )
+    
+    # Execute query (side effect)
+    result = await db.stream(query)
+    try:
+        async for chunk in result.partitions(chunk_size):
+            yield chunk
+    finally:
+        await result.close()
+
+async def stream_transaction_listing(
+    db: AsyncSession,
+    filters: Optional[TransactionFilter] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[TransactionWithCategory]:
+    """Yield every transaction matching a filter, newest first, one at a time.
+
+    Rows are fetched through a server-side cursor ``chunk_size`` at a time,
+    so a template can render a listing of any length in bounded memory.
+    """
+    use_category_index = True
+    if filters is not None:
+        use_category_index = await prefers_category_index(db, filters)
+    
+    # Build query using pure function
+    query = stream_transaction_listing_query(filters, use_category_index).execution_options(
+        yield_per=chunk_size
+    )
+    
+    # Execute query (side effect)
+    result = await db.stream(query)
+    try:
+        async for row in result:
+            yield row_to_transaction_with_category(row)
+    finally:
+        await result.close()
+
 async def get_transaction(
     db: AsyncSession,
     transaction_id: int
 ) -> Optional[TransactionWithCategory]:
     """Get a single transaction by ID"""
     # Build query using pure function
-    query = get_transaction_query(transaction_id)
+    query = get_transaction_query()
     
     # Execute query (side effect)
-    result = await db.execute(query)
+    result = await db.execute(query, {"transaction_id": transaction_id})
     row = result.first()
     
     # Return None if not found or transform using pure function
@@ -149,7 +708,12 @@ async def create_transaction(
     db: AsyncSession,
     transaction_data: TransactionCreate
 ) -> Transaction:
-    """Create a new transaction"""
+    """Create a new transaction, categorizing it by the rules if it has no category"""
+    if transaction_data.category_id is None:
+        matcher = await rule_queries.get_rule_matcher(db)
+        category_id = matcher.categorize(transaction_data.description, transaction_data.amount)
+        transaction_data = transaction_data.model_copy(update={"category_id": category_id})
+    
     # Build statement using pure function
     stmt = create_transaction_statement(transaction_data)
     
@@ -158,16 +722,58 @@ async def create_transaction(
     
     # Get the created transaction
     transaction_row = result.first()
+    await apply_ledger_changes(db, added=[transaction_row._mapping])
     
     # Convert to domain model and return
     return Transaction.from_orm(transaction_row)
 
+async def import_transactions(
+    db: AsyncSession,
+    rows: Iterable[ImportRow],
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportResult:
+    """Validate and bulk insert parsed import rows in batches
+
+    Rows that fail validation are skipped and reported; everything else is
+    inserted within the caller's transaction. Rows without a category are
+    categorized by the rules.
+    """
+    started = time.perf_counter()
+    imported, failed = 0, 0
+    errors: List[ImportRowError] = []
+    
+    for batch in batched(rows, batch_size):
+        values, failures = validate_import_batch(batch)
+        failed += len(failures)
+        errors.extend(failures[:MAX_IMPORT_ERRORS - len(errors)])
+        
+        # Insert the valid rows of the batch (side effect)
+        if values:
+            await insert_transaction_rows(db, values)
+            imported += len(values)
+    
+    elapsed = time.perf_counter() - started
+    return ImportResult(
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round((imported + failed) / elapsed, 1) if elapsed else 0.0
+    )
+
 async def update_transaction(
     db: AsyncSession,
     transaction_id: int,
     transaction_data: Dict[str, Any]
 ) -> Optional[Transaction]:
     """Update an existing transaction"""
+    # Capture the previous values so derived tables can be adjusted
+    previous = (
+        await db.execute(get_transaction_row_query(), {"transaction_id": transaction_id})
+    ).first()
+    if previous is None:
+        return None
+    
     # Build statement using pure function
     stmt = update_transaction_statement(transaction_id, transaction_data)
     
@@ -176,6 +782,10 @@ async def update_transaction(
     
     # Get the updated transaction
     transaction_row = result.first()
+    if transaction_row:
+        await apply_ledger_changes(
+            db, removed=[previous._mapping], added=[transaction_row._mapping]
+        )
     
     # Convert to domain model and return
     return Transaction.from_orm(transaction_row) if transaction_row else None
@@ -190,6 +800,182 @@ async def delete_transaction(
     
     # Execute statement (side effect)
     result = await db.execute(stmt)
+    deleted_row = result.first()
+    if deleted_row:
+        await apply_ledger_changes(db, removed=[deleted_row._mapping])
     
     # Return whether deletion was successful
-    return result.rowcount > 0
\ No newline at end of file
+    return deleted_row is not None
+
+async def apply_transaction_batch(
+    db: AsyncSession,
+    operations: List[TransactionBatchOperation],
+    atomic: bool = True
+) -> BatchResult:
+    """Apply create/update/delete operations with a few set-based statements
+
+    Every operation is validated first, and the IDs are checked with one
+    SELECT. In atomic mode any failure means nothing is written and the
+    result has applied=False. Otherwise the failed operations are reported
+    and the rest are applied. Writes run in the caller's transaction.
+    - Creates are categorized by the rules if needed and inserted with one executemany.
+    - Updates that make the same change share one UPDATE ... WHERE id IN (...).
+    - Deletes run as one DELETE ... WHERE id IN (...).
+    Derived tables are adjusted once for the whole batch.
+    """
+    results = [BatchItemResult(index=index, op=operation.op, ok=True, id=operation.id)
+               for index, operation in enumerate(operations)]
+    
+    def fail(index: int, error: str) -> None:
+        results[index].ok = False
+        results[index].error = error
+    
+    # Validate every operation before touching the database
+    creates: List[Tuple[int, Dict[str, Any]]] = []
+    updates: Dict[Tuple, List[Tuple[int, int]]] = {}
+    deletes: List[Tuple[int, int]] = []
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        if operation.op != "create":
+            if operation.id is None:
+                fail(index, "id is required")
+                continue
+            if operation.id in seen_ids:
+                fail(index, "Transaction appears more than once in the batch")
+                continue
+            seen_ids.add(operation.id)
+        try:
+            if operation.op == "create":
+                creates.append((index, TransactionCreate(**operation.data).dict()))
+            elif operation.op == "update":
+                values = TransactionUpdate(**operation.data).dict(exclude_unset=True)
+                if not values:
+                    fail(index, "data must change at least one field")
+                    continue
+                updates.setdefault(tuple(sorted(values.items())), []).append((index, operation.id))
+            else:
+                deletes.append((index, operation.id))
+        except ValidationError as exc:
+            fail(index, validation_error_message(exc))
+    
+    # Load the targeted transactions in one query; the rows of updated ones
+    # are also the "removed" side of the derived-table adjustment
+    targeted = [(index, transaction_id) for group in updates.values() for index, transaction_id in group]
+    targeted += deletes
+    existing: Dict[int, Mapping[str, Any]] = {}
+    if targeted:
+        result = await db.execute(
+            get_transaction_rows_query([transaction_id for _, transaction_id in targeted])
+        )
+        existing = {row.id: row._mapping for row in result}
+    for index, transaction_id in targeted:
+        if transaction_id not in existing:
+            fail(index, "Transaction not found")
+    
+    failed = sum(1 for item in results if not item.ok)
+    if atomic and failed:
+        return BatchResult(applied=False, succeeded=0, failed=failed, results=results)
+    
+    removed: List[Mapping[str, Any]] = []
+    added: List[Mapping[str, Any]] = []
+    
+    # Execute one statement per distinct change (side effect)
+    for key, group in updates.items():
+        group = [(index, transaction_id) for index, transaction_id in group if results[index].ok]
+        if not group:
+            continue
+        ids = [transaction_id for _, transaction_id in group]
+        removed.extend(existing[transaction_id] for transaction_id in ids)
+        updated = await db.execute(update_transactions_statement(ids, dict(key)))
+        added.extend(row._mapping for row in updated)
+    
+    delete_ids = [transaction_id for index, transaction_id in deletes if results[index].ok]
+    if delete_ids:
+        deleted = await db.execute(delete_transactions_statement(delete_ids))
+        removed.extend(row._mapping for row in deleted)
+    
+    if creates:
+        await categorize_new_transactions(db, [values for _, values in creates])
+        created = await db.execute(
+            create_transactions_returning_statement(), [values for _, values in creates]
+        )
+        created_rows = created.all()
+        for (index, _), row in zip(creates, created_rows):
+            results[index].id = row.id
+        added.extend(row._mapping for row in created_rows)
+    
+    if removed or added:
+        await apply_ledger_changes(db, removed=removed, added=added)
+    
+    return BatchResult(
+        applied=True,
+        succeeded=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+async def categorize_transactions_chunks(
+    db: AsyncSession,
+    overwrite: bool = False,
+    chunk_size: int = CATEGORIZE_CHUNK_SIZE,
+    after_id: int = 0
+) -> AsyncIterator[Dict[str, Any]]:
+    """Re-run the categorization rules over the ledger, yielding progress after each chunk
+
+    Only uncategorized transactions are considered unless overwrite is set,
+    in which case every transaction a rule matches is moved to the rule's
+    category; transactions no rule matches keep their category. Each chunk
+    is one primary key window, and the changed rows are written with one
+    UPDATE per target category, so callers may commit between chunks and
+    resume after the last_id of the last committed one.
+    """
+    matcher = await rule_queries.get_rule_matcher(db)
+    last_id = (await db.execute(max_transaction_id_query())).scalar()
+    if matcher.rule_count == 0 or last_id is None:
+        return
+    
+    while after_id < last_id:
+        # Execute query (side effect)
+        rows = (await db.execute(categorize_window_query(after_id, chunk_size, overwrite))).all()
+        
+        # Classify in memory, grouping the changed rows by their new category
+        changes: Dict[int, List[Row]] = {}
+        for row in rows:
+            category_id = matcher.categorize(row.description, row.amount)
+            if category_id is not None and category_id != row.category_id:
+                changes.setdefault(category_id, []).append(row)
+        
+        # Execute one statement per target category (side effect)
+        removed: List[Mapping[str, Any]] = []
+        added: List[Mapping[str, Any]] = []
+        for category_id, changed in changes.items():
+            updated = await db.execute(
+                update_transactions_statement([row.id for row in changed], {"category_id": category_id})
+            )
+            removed.extend(row._mapping for row in changed)
+            added.extend(row._mapping for row in updated)
+        if added:
+            await apply_ledger_changes(db, removed=removed, added=added)
+        
+        after_id += chunk_size
+        yield {"last_id": min(after_id, last_id), "scanned": len(rows), "categorized": len(added)}
+
+async def categorize_transactions(
+    db: AsyncSession,
+    overwrite: bool = False,
+    chunk_size: int = CATEGORIZE_CHUNK_SIZE
+) -> CategorizationResult:
+    """Re-run the categorization rules over the whole ledger in the caller's transaction"""
+    started = time.perf_counter()
+    scanned, categorized = 0, 0
+    async for progress in categorize_transactions_chunks(db, overwrite, chunk_size):
+        scanned += progress["scanned"]
+        categorized += progress["categorized"]
+    
+    elapsed = time.perf_counter() - started
+    return CategorizationResult(
+        scanned=scanned,
+        categorized=categorized,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(scanned / elapsed, 1) if elapsed else 0.0
+    )
\ No newline at end of file
@@ -6,4 +6,18 @@ def get_current_year() -> int:
 
 def get_current_month() -> int:
     """Pure function to get the current month"""
-    return datetime.now().month
\ No newline at end of file
+    return datetime.now().month
+
+def month_key(value: datetime) -> str:
+    """Pure function to get the 'YYYY-MM' key of a date's month."""
+    return value.strftime("%Y-%m")
+
+def day_key(value: datetime) -> str:
+    """Pure function to get the 'YYYY-MM-DD' key of a date's day."""
+    return value.strftime("%Y-%m-%d")
+
+def add_months(month: str, count: int) -> str:
+    """Pure function to shift a 'YYYY-MM' key by a number of months."""
+    year, month_number = (int(part) for part in month.split("-"))
+    index = year * 12 + (month_number - 1) + count
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
\ No newline at end of file
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence
+
+EXPORT_FORMATS = ("csv", "ndjson", "columnar")
+
+# Columns written by every export format, in order
+EXPORT_COLUMNS = (
+    "id", "date", "amount", "currency", "description", "category_id", "category_name", "account_id"
+)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+}
+
+def _export_value(value: Any) -> Any:
+    """Convert a column value to its JSON/CSV representation"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _json_default(value: Any) -> Any:
+    """Write Decimal amounts as JSON numbers"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def encode_csv_chunk(rows: Sequence[Any], header: bool = False) -> bytes:
+    """Encode a chunk of export rows as CSV.
+
+    Args:
+        rows: Rows exposing the EXPORT_COLUMNS attributes
+        header: Whether to write the header line first
+
+    Returns:
+        UTF-8 encoded CSV text
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        [_export_value(getattr(row, column)) for column in EXPORT_COLUMNS]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+def encode_ndjson_chunk(rows: Sequence[Any]) -> bytes:
+    """Encode a chunk of export rows as newline-delimited JSON objects.
+
+    Args:
+        rows: Rows exposing the EXPORT_COLUMNS attributes
+
+    Returns:
+        UTF-8 encoded NDJSON text, one object per row
+    """
+    lines = [
+        json.dumps(
+            {column: _export_value(getattr(row, column)) for column in EXPORT_COLUMNS},
+            default=_json_default
+        )
+        for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+def encode_columnar_chunk(rows: Sequence[Any]) -> bytes:
+    """Encode a chunk of export rows as one columnar row group.
+
+    Like a Parquet row group, each line holds one array per column, which is
+    far more compact than repeating the keys on every row and loads directly
+    into dataframe libraries.
+
+    Args:
+        rows: Rows exposing the EXPORT_COLUMNS attributes
+
+    Returns:
+        A single UTF-8 encoded JSON line
+    """
+    if not rows:
+        return b""
+    data: Dict[str, List[Any]] = {
+        column: [_export_value(getattr(row, column)) for row in rows]
+        for column in EXPORT_COLUMNS
+    }
+    group = {"columns": list(EXPORT_COLUMNS), "rows": len(rows), "data": data}
+    return (json.dumps(group, default=_json_default) + "\n").encode("utf-8")
@@ -0,0 +1,283 @@
+import codecs
+import csv
+import io
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows are yielded as (source position, raw field dict) so callers can report
+# errors against the line (CSV/QIF) or record number (OFX) they came from
+ImportRow = Tuple[int, Dict[str, Any]]
+
+IMPORT_FORMATS = ("csv", "ofx", "qif")
+
+# Size of each read from the uploaded file when tokenizing OFX
+READ_CHUNK_SIZE = 64 * 1024
+
+DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+# An amount once currency symbols and spaces are dropped: an optional sign,
+# digits with optional comma thousands separators and a decimal point
+AMOUNT_PATTERN = re.compile(r"[+-]?(\d{1,3}(,\d{3})+|\d*)(\.\d*)?")
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most ``size`` items from an iterable.
+
+    Args:
+        iterable: Any iterable, consumed lazily
+        size: Maximum number of items per batch
+
+    Returns:
+        An iterator over lists of items
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def detect_import_format(filename: Optional[str]) -> Optional[str]:
+    """Guess the import format from a file name extension.
+
+    Args:
+        filename: The uploaded file name, if any
+
+    Returns:
+        One of IMPORT_FORMATS, or None if the extension is not recognised
+    """
+    if not filename or "." not in filename:
+        return None
+    extension = filename.rsplit(".", 1)[1].lower()
+    return extension if extension in IMPORT_FORMATS else None
+
+def parse_import_date(value: Optional[str]) -> Any:
+    """Parse the date formats commonly found in bank exports.
+
+    Unparseable values are returned unchanged so that model validation
+    reports them as row errors.
+
+    Args:
+        value: The raw date string
+
+    Returns:
+        A datetime, or the original value
+    """
+    if not value:
+        return value
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    # QIF writes two-digit years as 1/5'24
+    normalized = value.replace("'", "/").replace(" ", "")
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(normalized, date_format)
+        except ValueError:
+            continue
+    return value
+
+def parse_import_amount(value: Optional[str]) -> Any:
+    """Strip thousands separators and currency symbols from an amount.
+
+    Accounting exports write negative amounts in parentheses, as (12.00).
+    The decimal separator must be a point; amounts such as 1.234,56 or
+    12,50 could mean either and are returned unchanged, so that model
+    validation reports them as row errors instead of importing a guess.
+
+    Args:
+        value: The raw amount string
+
+    Returns:
+        The cleaned string, or the original value if it was empty or ambiguous
+    """
+    if not value:
+        return value
+    cleaned = re.sub(r"[^0-9.,+\-()]", "", value)
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    if negative:
+        cleaned = cleaned[1:-1]
+    if not re.search(r"\d", cleaned) or not AMOUNT_PATTERN.fullmatch(cleaned):
+        return value
+    cleaned = cleaned.replace(",", "")
+    if negative:
+        # (-12.00) is no clearer than 1.234,56
+        return value if cleaned[0] in "+-" else "-" + cleaned
+    return cleaned
+
+def _empty_to_none(value: Optional[str]) -> Optional[str]:
+    """Treat blank fields as missing"""
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+def _iter_csv_records(stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Read a UTF-8 CSV file as (line number, record) pairs with lower-case header names
+
+    Raises:
+        ValueError: If the file is not UTF-8 encoded
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for record in reader:
+            yield reader.line_num, record
+    except UnicodeDecodeError as exc:
+        raise ValueError("The file is not UTF-8 encoded; save it as UTF-8 and import it again") from exc
+    finally:
+        text.detach()
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[ImportRow]:
+    """Lazily parse a CSV file with date, amount and optional description/category_id/currency/account_id columns.
+
+    Header names are matched case-insensitively.
+
+    Args:
+        stream: Binary file object positioned at the start of the file
+
+    Returns:
+        An iterator over (line number, raw fields) pairs
+
+    Raises:
+        ValueError: If the file is not UTF-8 encoded
+    """
+    for line_number, record in _iter_csv_records(stream):
+        yield line_number, {
+            "date": parse_import_date(record.get("date")),
+            "amount": parse_import_amount(record.get("amount")),
+            "description": _empty_to_none(record.get("description")),
+            "category_id": _empty_to_none(record.get("category_id")),
+            "currency": _empty_to_none(record.get("currency")),
+            "account_id": _empty_to_none(record.get("account_id")),
+        }
+
+def iter_fx_rate_rows(stream: BinaryIO) -> Iterator[ImportRow]:
+    """Lazily parse an FX rates CSV file with date, currency and rate columns.
+
+    Each rate is the amount of the base currency one unit of currency
+    bought on that date. Header names are matched case-insensitively.
+
+    Args:
+        stream: Binary file object positioned at the start of the file
+
+    Returns:
+        An iterator over (line number, raw fields) pairs
+
+    Raises:
+        ValueError: If the file is not UTF-8 encoded
+    """
+    for line_number, record in _iter_csv_records(stream):
+        yield line_number, {
+            "date": parse_import_date(record.get("date")),
+            "currency": _empty_to_none(record.get("currency")),
+            "rate": _empty_to_none(record.get("rate")),
+        }
+
+def _iter_ofx_tags(stream: BinaryIO) -> Iterator[Tuple[str, str]]:
+    """Tokenize an OFX (SGML or XML flavour) file into (tag, text) pairs.
+
+    Reads fixed-size chunks so that single-line files do not have to fit in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while chunk := stream.read(READ_CHUNK_SIZE):
+        pending += decoder.decode(chunk)
+        parts = pending.split("<")
+        pending = parts.pop()
+        for part in parts:
+            tag, _, text = part.partition(">")
+            if tag:
+                yield tag.strip().upper(), text.strip()
+    tag, _, text = pending.partition(">")
+    if tag:
+        yield tag.strip().upper(), text.strip()
+
+def iter_ofx_rows(stream: BinaryIO) -> Iterator[ImportRow]:
+    """Lazily parse the STMTTRN records of an OFX file.
+
+    Args:
+        stream: Binary file object positioned at the start of the file
+
+    Returns:
+        An iterator over (record number, raw fields) pairs
+    """
+    record: Optional[Dict[str, str]] = None
+    record_number = 0
+    # The statement's default currency precedes its transactions
+    currency: Optional[str] = None
+    for tag, text in _iter_ofx_tags(stream):
+        if tag == "CURDEF":
+            currency = _empty_to_none(text)
+        elif tag == "STMTTRN":
+            record = {}
+        elif tag == "/STMTTRN" and record is not None:
+            record_number += 1
+            posted = record.get("DTPOSTED", "")
+            name, memo = record.get("NAME"), record.get("MEMO")
+            yield record_number, {
+                # OFX dates look like 20240105120000.000[-5:EST]
+                "date": parse_import_date(posted[:8]) if posted else None,
+                "amount": parse_import_amount(record.get("TRNAMT")),
+                "description": _empty_to_none(" - ".join(filter(None, (name, memo)))),
+                "category_id": None,
+                "currency": _empty_to_none(record.get("CURSYM")) or currency,
+            }
+            record = None
+        elif record is not None and not tag.startswith("/"):
+            record[tag] = text
+
+def iter_qif_rows(stream: BinaryIO) -> Iterator[ImportRow]:
+    """Lazily parse the transaction records of a QIF file.
+
+    Args:
+        stream: Binary file object positioned at the start of the file
+
+    Returns:
+        An iterator over (line number, raw fields) pairs, numbered by the
+        line that terminates each record
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace")
+    record: Dict[str, str] = {}
+    for line_number, line in enumerate(text, start=1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if record:
+                payee, memo = record.get("P"), record.get("M")
+                yield line_number, {
+                    "date": parse_import_date(record.get("D")),
+                    "amount": parse_import_amount(record.get("T") or record.get("U")),
+                    "description": _empty_to_none(" - ".join(filter(None, (payee, memo)))),
+                    "category_id": None,
+                }
+            record = {}
+        else:
+            record[code] = value
+    text.detach()
+
+def iter_import_rows(stream: BinaryIO, import_format: str) -> Iterator[ImportRow]:
+    """Dispatch to the parser for the given format.
+
+    Args:
+        stream: Binary file object positioned at the start of the file
+        import_format: One of IMPORT_FORMATS
+
+    Returns:
+        An iterator over (position, raw fields) pairs
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    parsers = {
+        "csv": iter_csv_rows,
+        "ofx": iter_ofx_rows,
+        "qif": iter_qif_rows,
+    }
+    if import_format not in parsers:
+        raise ValueError(f"Unsupported import format: {import_format}")
+    return parsers[import_format](stream)
@@ -0,0 +1,36 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Union
+
+# Amounts are stored as integer hundredths of the currency unit
+CENTS_PER_UNIT = 100
+CENT = Decimal("0.01")
+
+def to_cents(amount: Union[Decimal, int, float, str]) -> int:
+    """Pure function to convert an amount to integer cents.
+
+    Floats are converted through their shortest repr, so 0.1 becomes 10
+    rather than the binary approximation's 10.000000000000000555. Sub-cent
+    digits are rounded half to even.
+
+    Args:
+        amount: The amount in currency units
+
+    Returns:
+        The amount in cents
+    """
+    if isinstance(amount, int):
+        return amount * CENTS_PER_UNIT
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_EVEN).scaleb(2))
+
+def from_cents(cents: int) -> Decimal:
+    """Pure function to convert integer cents to an exact Decimal amount.
+
+    Args:
+        cents: The amount in cents
+
+    Returns:
+        The amount in currency units, with two decimal places
+    """
+    return Decimal(cents).scaleb(-2)
\ No newline at end of file
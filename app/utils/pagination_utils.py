@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, Tuple
+from urllib.parse import urlencode
+
+CURSOR_DIRECTIONS = ("next", "prev")
+
+def encode_cursor(date: datetime, row_id: int, direction: str = "next") -> str:
+    """Encode a (date, id) keyset position into an opaque URL-safe cursor.
+
+    Args:
+        date: Date of the boundary row
+        row_id: ID of the boundary row
+        direction: "next" to continue after the row, "prev" to go back before it
+
+    Returns:
+        The cursor string
+    """
+    raw = f"{direction}|{date.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime, int]:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: The opaque cursor string
+
+    Returns:
+        A (direction, date, id) tuple
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        direction, date, row_id = raw.split("|")
+        if direction not in CURSOR_DIRECTIONS:
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(date), int(row_id)
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_query_params(params: Dict[str, Any]) -> str:
+    """Encode query parameters for links that must carry the current filters.
+
+    Args:
+        params: Parameter values; lists repeat the parameter, and None, empty
+            lists and False are left out
+
+    Returns:
+        The query string, without a leading "?"
+    """
+    pairs = []
+    for name, value in params.items():
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if item is None or item is False:
+                continue
+            pairs.append((name, "true" if item is True else str(item)))
+    return urlencode(pairs)
\ No newline at end of file
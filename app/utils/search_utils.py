@@ -0,0 +1,25 @@
+import re
+from typing import Optional
+
+# Terms beyond this are ignored, which bounds the work per keystroke
+MAX_SEARCH_TERMS = 8
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def build_fts_query(text: str) -> Optional[str]:
+    """Turn free text typed by a user into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so "amaz pri" matches
+    "Amazon Prime" and FTS5 operators or quotes in the input are taken
+    literally instead of raising a syntax error.
+
+    Args:
+        text: The raw search box contents
+
+    Returns:
+        The MATCH expression, or None if the text has no searchable words
+    """
+    terms = SEARCH_TERM_PATTERN.findall(text or "")[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Latency of account balance lookups: full-history SUM vs. checkpoint plus delta.
+
+Usage:
+    python -m benchmarks.bench_account_balance [--rows N] [--lookups K]
+
+Builds an N-row synthetic ledger (ten years) whose transactions all belong
+to one account, then asks for the balance at the end of K random days.
+"full-history" sums every transaction up to the day, as a balance without
+checkpoints must. "checkpointed" is balance_through: the latest month-end
+checkpoint before the day plus the transactions since it, both index seeks.
+Every checkpointed balance is checked against the full-history one.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import create_write_engine
+from app.models.schema import accounts, transactions
+from app.queries import accounts as account_queries
+from benchmarks.synthetic import create_ledger
+
+async def measure(rows: int, lookups: int) -> None:
+    """Build the ledger and checkpoints, then time both lookup paths"""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_account_balance_"), "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(insert(accounts), [{"name": "Checking", "opening_balance": 0}])
+        connection.execute(update(transactions).values(account_id=1))
+    engine.dispose()
+
+    write_engine = create_write_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    session_factory = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        started = time.perf_counter()
+        written = await account_queries.refresh_balance_checkpoints(session, today=date(2025, 1, 1))
+        await session.commit()
+        print(f"{rows:,} transactions, {written} checkpoints written in {time.perf_counter() - started:.2f}s")
+
+        rnd = random.Random(3)
+        days = [date(2015, 1, 1) + timedelta(days=rnd.randrange(3650)) for _ in range(lookups)]
+
+        started = time.perf_counter()
+        expected = [
+            (await session.execute(account_queries.balance_delta_query(
+                1, settings.DEFAULT_CURRENCY, account_queries.end_of_day(day)
+            ))).scalar()
+            for day in days
+        ]
+        full_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = [
+            (await account_queries.balance_through(
+                session, 1, settings.DEFAULT_CURRENCY, account_queries.end_of_day(day)
+            ))[0]
+            for day in days
+        ]
+        checkpoint_seconds = time.perf_counter() - started
+        assert result == expected
+
+    await write_engine.dispose()
+    print(f"{'path':<14}{'lookups':>10}{'ms/lookup':>12}")
+    print(f"{'full-history':<14}{lookups:>10,}{full_seconds * 1000 / lookups:>12.2f}")
+    print(f"{'checkpointed':<14}{lookups:>10,}{checkpoint_seconds * 1000 / lookups:>12.2f}")
+    print(f"speedup {full_seconds / checkpoint_seconds:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions in the account")
+    parser.add_argument("--lookups", type=int, default=200, help="Balances asked for at random days")
+    args = parser.parse_args()
+    asyncio.run(measure(args.rows, args.lookups))
@@ -0,0 +1,103 @@
+"""Rows/sec of currency conversion: a rate query per row vs. the in-memory RateIndex.
+
+Usage:
+    python -m benchmarks.bench_fx_conversion [--rows N] [--currencies C] [--days D]
+
+Generates D days of daily rates for C currencies in an in-memory fx_rates
+table, and N (currency, day, amount) rows to convert into the base
+currency. "per-row" runs the "latest rate on or before the day" query for
+every row, as a straightforward implementation would. "indexed" loads the
+rates once into RateIndex and converts every row with rates_for, one
+bisect per distinct (currency, day).
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Tuple
+
+from sqlalchemy import create_engine, insert, select
+
+from app.core.fx import RateIndex, convert_amount
+from app.models.schema import fx_rates, metadata
+
+CURRENCIES = ["EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "SEK", "NOK", "MXN", "BRL"]
+
+def generate_rates(currencies: List[str], days: int, seed: int = 7) -> List[dict]:
+    """One random-walk rate per currency and day, skipping about one day in five"""
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    rows = []
+    for currency in currencies:
+        rate = rnd.uniform(0.5, 1.5)
+        for offset in range(days):
+            rate *= rnd.uniform(0.99, 1.01)
+            if rnd.random() < 0.8:
+                rows.append({"currency": currency, "date": start + timedelta(days=offset), "rate": round(rate, 6)})
+    return rows
+
+def generate_rows(count: int, currencies: List[str], days: int, seed: int = 42) -> List[Tuple[str, str, Decimal]]:
+    """(currency, 'YYYY-MM-DD' day, amount) rows spread over the rate history"""
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    return [
+        (
+            rnd.choice(currencies),
+            (start + timedelta(days=rnd.randrange(days))).isoformat(),
+            Decimal(rnd.randrange(-50_000, 50_000)).scaleb(-2),
+        )
+        for _ in range(count)
+    ]
+
+def main(rows: int, currency_count: int, days: int) -> None:
+    """Convert the generated rows both ways and print rows/sec"""
+    currencies = CURRENCIES[:currency_count]
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine, tables=[fx_rates])
+    rates = generate_rates(currencies, days)
+    with engine.begin() as connection:
+        connection.execute(insert(fx_rates), rates)
+    data = generate_rows(rows, currencies, days)
+
+    # The per-row path is slow enough that a sample gives a stable rate
+    sample = data[:min(len(data), 20_000)]
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        expected = []
+        for currency, day, amount in sample:
+            rate = connection.exec_driver_sql(
+                "SELECT rate FROM fx_rates WHERE currency = ? AND date <= ? ORDER BY date DESC LIMIT 1",
+                (currency, day)
+            ).scalar()
+            if rate is None:
+                rate = connection.exec_driver_sql(
+                    "SELECT rate FROM fx_rates WHERE currency = ? ORDER BY date LIMIT 1",
+                    (currency,)
+                ).scalar()
+            expected.append(convert_amount(amount, Decimal(repr(rate))))
+        per_row_rate = len(sample) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index = RateIndex("USD", (row._mapping for row in connection.execute(select(fx_rates))))
+        load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = index.rates_for([(currency, day) for currency, day, _ in data])
+    result = [convert_amount(amount, rate) for (_, _, amount), rate in zip(data, found)]
+    indexed_rate = len(data) / (time.perf_counter() - started)
+    assert result[:len(sample)] == expected
+
+    print(f"{len(rates):,} rates for {currency_count} currencies, indexed in {load_seconds * 1000:.1f}ms")
+    print(f"{'path':<10}{'rows':>12}{'rows/s':>14}")
+    print(f"{'per-row':<10}{len(sample):>12,}{per_row_rate:>14,.0f}")
+    print(f"{'indexed':<10}{len(data):>12,}{indexed_rate:>14,.0f}")
+    print(f"speedup {indexed_rate / per_row_rate:.1f}x; {rows:,} rows in {rows / indexed_rate:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to convert")
+    parser.add_argument("--currencies", type=int, default=len(CURRENCIES), help="Currencies with rates")
+    parser.add_argument("--days", type=int, default=3650, help="Days of rate history")
+    args = parser.parse_args()
+    main(args.rows, args.currencies, args.days)
@@ -0,0 +1,72 @@
+"""Aggregate speed and accuracy of REAL amounts vs. INTEGER cents in SQLite.
+
+Usage:
+    python -m benchmarks.bench_money_storage [--rows N] [--repeat R]
+
+Loads N synthetic amounts into two in-memory tables, one storing them as
+REAL (the old schema) and one as INTEGER cents (the Cents column type), and
+times the rollup aggregate the statistics use: count plus income and
+spending sums per category. It then compares each grand total with the
+exact Decimal sum of the same amounts.
+"""
+import argparse
+import sqlite3
+import time
+from decimal import Decimal
+
+from app.utils.money_utils import from_cents, to_cents
+from benchmarks.synthetic import generate_transactions
+
+AGGREGATE = """
+    SELECT category_id,
+           COUNT(*),
+           SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+           SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+    FROM {table}
+    GROUP BY category_id
+"""
+
+def time_aggregate(connection: sqlite3.Connection, table: str, repeat: int) -> float:
+    """Best wall time, in seconds, of the per-category aggregate over ``table``"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        connection.execute(AGGREGATE.format(table=table)).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main(rows: int, repeat: int) -> None:
+    """Build both tables, time the aggregate on each and report the drift"""
+    data = [
+        (row["category_id"], row["amount"])
+        for row in generate_transactions(rows)
+    ]
+    exact = sum((Decimal(str(amount)) for _, amount in data), Decimal(0))
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE real_amounts (category_id INTEGER, amount REAL NOT NULL)")
+    connection.execute("CREATE TABLE cent_amounts (category_id INTEGER, amount INTEGER NOT NULL)")
+    connection.executemany("INSERT INTO real_amounts VALUES (?, ?)", data)
+    connection.executemany(
+        "INSERT INTO cent_amounts VALUES (?, ?)",
+        ((category_id, to_cents(amount)) for category_id, amount in data)
+    )
+
+    real_total = connection.execute("SELECT SUM(amount) FROM real_amounts").fetchone()[0]
+    cent_total = from_cents(connection.execute("SELECT SUM(amount) FROM cent_amounts").fetchone()[0])
+
+    print(f"{rows:,} amounts, exact total {exact}")
+    print(f"{'storage':<10}{'aggregate ms':>14}{'total':>24}{'error':>16}")
+    for label, table, total in (
+        ("REAL", "real_amounts", Decimal(repr(real_total))),
+        ("cents", "cent_amounts", cent_total),
+    ):
+        seconds = time_aggregate(connection, table, repeat)
+        print(f"{label:<10}{seconds * 1000:>14.1f}{str(total):>24}{str(total - exact):>16}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic amounts to load")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per table; the best is reported")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
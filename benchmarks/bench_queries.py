@@ -0,0 +1,378 @@
+"""Latency of every query handler in app.queries against a realistic ledger.
+
+Usage:
+    python -m benchmarks.bench_queries [--rows N] [--iterations K] [--heavy-iterations H]
+        [--only TEXT] [--ledger PATH] [--baseline PATH] [--save-baseline]
+        [--metric p50|p95|p99] [--tolerance T]
+
+Builds an N-row ledger with benchmarks.synthetic (realistic distributions,
+accounts, FX rates, budgets and rules; rollups rebuilt) and times each
+handler K times, or H times for the "heavy" ones that scan the whole
+ledger (rebuilds, verifies, categorization, recurring detection, export).
+Every call runs on its own transaction, which is rolled back afterwards so
+writes leave the ledger as it was. All table versions are bumped before
+each call, so the in-process caches miss and the SQL is timed, not a
+dictionary lookup. The pure builders are timed through the handlers that
+compose them; plans.hot_queries times building every statement app.cli
+check-query-plans knows as hot, and the "compile:" cases compiling each.
+
+Prints p50/p95/p99 and calls per second for every case and compares them
+with the baseline (benchmarks/baselines/queries.json by default, see
+benchmarks.stats), exiting with 1 when a case regressed; --save-baseline
+records this run instead.
+--ledger keeps the generated database at PATH and reuses it next time.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.cache import response_cache
+from app.db import create_write_engine
+from app.models.domain import (
+    AccountCreate, CategoryCreate, CategoryBatchOperation, CategorizationRuleCreate,
+    RecurringRuleCreate, TransactionBatchOperation, TransactionCreate, TransactionFilter,
+)
+from app.models.schema import metadata, transactions
+from app.queries import accounts as account_queries
+from app.queries import budgets as budget_queries
+from app.queries import categories as category_queries
+from app.queries import category_stats as category_stats_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import dashboard as dashboard_queries
+from app.queries import fx_rates as fx_queries
+from app.queries import jobs as job_queries
+from app.queries import monthly_totals as monthly_totals_queries
+from app.queries import plans as plan_queries
+from app.queries import recurring as recurring_queries
+from app.queries import reports as report_queries
+from app.queries import rules as rule_queries
+from app.queries import search as search_queries
+from app.queries import transactions as transaction_queries
+from app.utils.import_utils import iter_csv_rows
+from benchmarks import stats
+from benchmarks.synthetic import (
+    create_ledger, generate_fx_rates, generate_realistic_transactions, import_csv, rebuild_derived_tables,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "queries.json")
+
+# Fixtures the cases share, set up once before timing
+Fixtures = Dict[str, Any]
+
+class Case(NamedTuple):
+    """One timed handler call; ``heavy`` ones scan the whole ledger and run fewer times"""
+    name: str
+    run: Callable[[AsyncSession, Fixtures], Awaitable[Any]]
+    heavy: bool = False
+
+async def drain(chunks) -> int:
+    """Consume an async iterator, returning how many items it yielded"""
+    count = 0
+    async for _ in chunks:
+        count += 1
+    return count
+
+async def run_job_body(db: AsyncSession, fixtures: Fixtures, kind: str) -> int:
+    """Run a job handler on the fixture job of its kind without the runner"""
+    job = fixtures["jobs"][kind]
+    return await drain(job_queries.JOB_HANDLERS[job.kind](db, job, None))
+
+def new_rows(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Validated, uncategorized rows ready for insert_transaction_rows"""
+    return [
+        TransactionCreate(**{**row, "category_id": None}).model_dump()
+        for row in generate_realistic_transactions(count, seed, datetime(2025, 1, 1), days=30)
+    ]
+
+def compile_case(name: str, statement: Any) -> Case:
+    """Time compiling one of the hot statements to SQL"""
+    async def run(db: AsyncSession, fixtures: Fixtures) -> str:
+        return str(statement.compile(dialect=db.bind.dialect))
+    return Case(f"compile:{name}", run)
+
+def query_cases() -> List[Case]:
+    """Every handler of app.queries with representative arguments"""
+    year = TransactionFilter(start=date(2024, 1, 1), end=date(2024, 12, 31))
+    expenses = TransactionFilter(start=date(2024, 1, 1), end=date(2024, 12, 31), sign="expense", min_amount=Decimal(50))
+    return [
+        # accounts
+        Case("accounts.list_accounts", lambda db, f: account_queries.list_accounts(db)),
+        Case("accounts.get_account", lambda db, f: account_queries.get_account(db, 1)),
+        Case("accounts.create_account", lambda db, f: account_queries.create_account(db, AccountCreate(name="Brokerage"))),
+        Case("accounts.delete_account", lambda db, f: account_queries.delete_account(db, 3)),
+        Case("accounts.balance_through", lambda db, f: account_queries.balance_through(
+            db, 1, "USD", account_queries.end_of_day(date(2024, 6, 30))
+        )),
+        Case("accounts.get_account_balance", lambda db, f: account_queries.get_account_balance(
+            db, f["account"], date(2024, 6, 30)
+        )),
+        Case("accounts.get_running_balance", lambda db, f: account_queries.get_running_balance(
+            db, f["account"], date(2024, 1, 1)
+        )),
+        Case("accounts.shift_balance_checkpoints", lambda db, f: account_queries.shift_balance_checkpoints(
+            db, added=[f["row"]]
+        )),
+        Case("accounts.refresh_balance_checkpoints", lambda db, f: account_queries.refresh_balance_checkpoints(db), True),
+        Case("accounts.rebuild_balance_checkpoints", lambda db, f: account_queries.rebuild_balance_checkpoints(db), True),
+        Case("accounts.verify_balance_checkpoints", lambda db, f: account_queries.verify_balance_checkpoints(db), True),
+        # budgets
+        Case("budgets.list_budgets", lambda db, f: budget_queries.list_budgets(db)),
+        Case("budgets.get_budget", lambda db, f: budget_queries.get_budget(db, 1)),
+        Case("budgets.set_budget", lambda db, f: budget_queries.set_budget(db, 1, Decimal(650))),
+        Case("budgets.delete_budget", lambda db, f: budget_queries.delete_budget(db, 1)),
+        Case("budgets.get_budget_report", lambda db, f: budget_queries.get_budget_report(
+            db, "2024-06", today=date(2024, 6, 15)
+        )),
+        # categories
+        Case("categories.list_categories", lambda db, f: category_queries.list_categories(db)),
+        Case("categories.get_category", lambda db, f: category_queries.get_category(db, 1)),
+        Case("categories.list_categories_with_counts", lambda db, f: category_queries.list_categories_with_counts(db)),
+        Case("categories.create_category", lambda db, f: category_queries.create_category(
+            db, CategoryCreate(name="Pets")
+        )),
+        Case("categories.update_category", lambda db, f: category_queries.update_category(
+            db, 1, {"description": "Food at home"}
+        )),
+        Case("categories.delete_category", lambda db, f: category_queries.delete_category(db, 10)),
+        Case("categories.merge_category", lambda db, f: category_queries.merge_category(db, 10, 9)),
+        Case("categories.apply_category_batch", lambda db, f: category_queries.apply_category_batch(db, [
+            CategoryBatchOperation(op="create", data={"name": "Pets"}),
+            CategoryBatchOperation(op="update", id=1, data={"description": "Food at home"}),
+            CategoryBatchOperation(op="merge", id=10, into=9),
+        ])),
+        # category_stats, monthly_totals, daily_totals
+        Case("category_stats.apply_transaction_changes", lambda db, f: category_stats_queries.apply_transaction_changes(
+            db, added=[f["row"]]
+        )),
+        Case("category_stats.rebuild_category_stats", lambda db, f: category_stats_queries.rebuild_category_stats(db), True),
+        Case("category_stats.verify_category_stats", lambda db, f: category_stats_queries.verify_category_stats(db), True),
+        Case("monthly_totals.apply_transaction_changes", lambda db, f: monthly_totals_queries.apply_transaction_changes(
+            db, added=[f["row"]]
+        )),
+        Case("monthly_totals.rebuild_monthly_totals", lambda db, f: monthly_totals_queries.rebuild_monthly_totals(db), True),
+        Case("monthly_totals.verify_monthly_totals", lambda db, f: monthly_totals_queries.verify_monthly_totals(db), True),
+        Case("daily_totals.apply_transaction_changes", lambda db, f: daily_totals_queries.apply_transaction_changes(
+            db, added=[f["row"]]
+        )),
+        Case("daily_totals.rebuild_daily_totals_chunks", lambda db, f: drain(
+            daily_totals_queries.rebuild_daily_totals_chunks(db, "2024-01", "2024-12")
+        ), True),
+        Case("daily_totals.rebuild_daily_totals", lambda db, f: daily_totals_queries.rebuild_daily_totals(db), True),
+        Case("daily_totals.verify_daily_totals", lambda db, f: daily_totals_queries.verify_daily_totals(db), True),
+        # dashboard, reports
+        Case("dashboard.get_dashboard_stats", lambda db, f: dashboard_queries.get_dashboard_stats(
+            db, datetime(2024, 12, 31)
+        )),
+        Case("reports.get_timeseries_month", lambda db, f: report_queries.get_timeseries(
+            db, "month", date(2024, 1, 1), date(2024, 12, 31)
+        )),
+        Case("reports.get_timeseries_day_totals", lambda db, f: report_queries.get_timeseries(
+            db, "day", date(2024, 1, 1), date(2024, 12, 31), by_category=False
+        )),
+        # fx_rates
+        Case("fx_rates.list_fx_rates", lambda db, f: fx_queries.list_fx_rates(db, "EUR")),
+        Case("fx_rates.load_fx_rates", lambda db, f: fx_queries.load_fx_rates(db, f["fx_rows"])),
+        Case("fx_rates.get_rate_index", lambda db, f: fx_queries.get_rate_index(db, ["EUR", "GBP"])),
+        # jobs
+        Case("jobs.create_job", lambda db, f: job_queries.create_job(db, "apply-rules", {"overwrite": False})),
+        Case("jobs.get_job", lambda db, f: job_queries.get_job(db, f["job_id"])),
+        Case("jobs.list_jobs", lambda db, f: job_queries.list_jobs(db)),
+        Case("jobs.claim_next_job", lambda db, f: job_queries.claim_next_job(db)),
+        Case("jobs.save_job_progress", lambda db, f: job_queries.save_job_progress(
+            db, f["job_id"], {"done": 10, "total": 100, "checkpoint": {"last_id": 10}}
+        )),
+        Case("jobs.finish_job", lambda db, f: job_queries.finish_job(db, f["job_id"], "succeeded")),
+        Case("jobs.cancel_job", lambda db, f: job_queries.cancel_job(db, f["job_id"])),
+        Case("jobs.is_cancel_requested", lambda db, f: job_queries.is_cancel_requested(db, f["job_id"])),
+        Case("jobs.requeue_interrupted_jobs", lambda db, f: job_queries.requeue_interrupted_jobs(db)),
+        Case("jobs.run_import_job", lambda db, f: run_job_body(db, f, "import"), True),
+        Case("jobs.run_categorize_job", lambda db, f: run_job_body(db, f, "apply-rules"), True),
+        Case("jobs.run_rebucket_job", lambda db, f: run_job_body(db, f, "rebucket-daily-totals"), True),
+        Case("jobs.run_rebuild_job", lambda db, f: run_job_body(db, f, "rebuild"), True),
+        Case("jobs.run_detect_recurring_job", lambda db, f: run_job_body(db, f, "detect-recurring"), True),
+        # recurring
+        Case("recurring.list_recurring_rules", lambda db, f: recurring_queries.list_recurring_rules(db)),
+        Case("recurring.get_recurring_rule", lambda db, f: recurring_queries.get_recurring_rule(db, f["recurring_id"])),
+        Case("recurring.create_recurring_rule", lambda db, f: recurring_queries.create_recurring_rule(db, f["recurring"])),
+        Case("recurring.delete_recurring_rule", lambda db, f: recurring_queries.delete_recurring_rule(db, f["recurring_id"])),
+        Case("recurring.generate_recurring_transactions", lambda db, f: recurring_queries.generate_recurring_transactions(
+            db, date(2025, 12, 31)
+        )),
+        Case("recurring.create_rules_from_candidates", lambda db, f: recurring_queries.create_rules_from_candidates(
+            db, f["candidates"]
+        )),
+        Case("recurring.detect_recurring", lambda db, f: recurring_queries.detect_recurring(db), True),
+        # rules
+        Case("rules.list_rules", lambda db, f: rule_queries.list_rules(db)),
+        Case("rules.get_rule", lambda db, f: rule_queries.get_rule(db, 1)),
+        Case("rules.create_rule", lambda db, f: rule_queries.create_rule(
+            db, CategorizationRuleCreate(category_id=5, pattern="Chipotle")
+        )),
+        Case("rules.delete_rule", lambda db, f: rule_queries.delete_rule(db, 1)),
+        Case("rules.get_rule_matcher", lambda db, f: rule_queries.get_rule_matcher(db)),
+        # search
+        Case("search.search_transactions", lambda db, f: search_queries.search_transactions(db, "amaz")),
+        Case("search.search_transactions_filtered", lambda db, f: search_queries.search_transactions(
+            db, "uber", 50, TransactionFilter(category_ids=[4])
+        )),
+        Case("search.rebuild_search_index", lambda db, f: search_queries.rebuild_search_index(db), True),
+        Case("search.verify_search_index", lambda db, f: search_queries.verify_search_index(db), True),
+        # transactions
+        Case("transactions.apply_ledger_changes", lambda db, f: transaction_queries.apply_ledger_changes(
+            db, added=[f["row"]]
+        )),
+        Case("transactions.categorize_new_transactions", lambda db, f: transaction_queries.categorize_new_transactions(
+            db, new_rows(100, 5)
+        )),
+        Case("transactions.insert_transaction_rows", lambda db, f: transaction_queries.insert_transaction_rows(
+            db, new_rows(100, 5)
+        )),
+        Case("transactions.list_transactions", lambda db, f: transaction_queries.list_transactions(db)),
+        Case("transactions.list_transactions_deep_offset", lambda db, f: transaction_queries.list_transactions(
+            db, 100, f["rows"] // 2
+        )),
+        Case("transactions.list_transactions_keyset", lambda db, f: transaction_queries.list_transactions_keyset(db)),
+        Case("transactions.list_transactions_keyset_filtered", lambda db, f: transaction_queries.list_transactions_keyset(
+            db, 100, filters=expenses, include_total=True
+        )),
+        Case("transactions.list_transactions_keyset_category", lambda db, f: transaction_queries.list_transactions_keyset(
+            db, 100, category_id=8, include_total=True
+        )),
+        Case("transactions.prefers_category_index", lambda db, f: transaction_queries.prefers_category_index(
+            db, TransactionFilter(category_ids=[8])
+        )),
+        Case("transactions.count_transactions", lambda db, f: transaction_queries.count_transactions(db, year)),
+        Case("transactions.count_transactions_filtered", lambda db, f: transaction_queries.count_transactions(
+            db, expenses
+        )),
+        Case("transactions.get_transaction", lambda db, f: transaction_queries.get_transaction(db, f["transaction_id"])),
+        Case("transactions.create_transaction", lambda db, f: transaction_queries.create_transaction(
+            db, TransactionCreate(amount=Decimal("-12.50"), description="Coffee shop", date=datetime(2024, 6, 1, 8))
+        )),
+        Case("transactions.import_transactions", lambda db, f: transaction_queries.import_transactions(
+            db, iter_csv_rows(f["import_file"]())
+        )),
+        Case("transactions.update_transaction", lambda db, f: transaction_queries.update_transaction(
+            db, f["transaction_id"], {"amount": Decimal("-99.99"), "description": "Edited"}
+        )),
+        Case("transactions.delete_transaction", lambda db, f: transaction_queries.delete_transaction(
+            db, f["transaction_id"]
+        )),
+        Case("transactions.apply_transaction_batch", lambda db, f: transaction_queries.apply_transaction_batch(db, [
+            TransactionBatchOperation(op="create", data={"amount": "-4.20", "description": "Coffee shop"}),
+            TransactionBatchOperation(op="update", id=f["transaction_id"], data={"description": "Edited"}),
+            TransactionBatchOperation(op="delete", id=f["transaction_id"] + 1),
+        ])),
+        Case("transactions.stream_transactions", lambda db, f: drain(transaction_queries.stream_transactions(db)), True),
+        Case("transactions.categorize_transactions_chunks", lambda db, f: drain(
+            transaction_queries.categorize_transactions_chunks(db, overwrite=True)
+        ), True),
+        Case("transactions.categorize_transactions", lambda db, f: transaction_queries.categorize_transactions(db), True),
+        # plans: building every hot statement, then compiling each one
+        Case("plans.hot_queries", lambda db, f: asyncio.sleep(0, plan_queries.hot_queries())),
+        *[compile_case(name, statement) for name, statement, _ in plan_queries.hot_queries()],
+    ]
+
+async def prepare_fixtures(db: AsyncSession, rows: int, spool_dir: str) -> Fixtures:
+    """Commit the rows the cases read (jobs, a recurring rule) and gather their arguments"""
+    transaction_id = (await db.execute(select(func.max(transactions.c.id)))).scalar() // 2
+    row = (
+        await db.execute(transaction_queries.get_transaction_row_query(), {"transaction_id": transaction_id})
+    ).mappings().one()
+    recurring = RecurringRuleCreate(
+        description="Car insurance", amount=Decimal("-120.00"), category_id=3, account_id=1,
+        cadence="monthly", start_date=date(2024, 1, 5)
+    )
+    recurring_rule = await recurring_queries.create_recurring_rule(db, recurring)
+    detection = await recurring_queries.detect_recurring(db)
+
+    path = os.path.join(spool_dir, "import.csv")
+    with open(path, "wb") as spool:
+        spool.write(import_csv(500))
+    job_params = {
+        "import": {"path": path, "format": "csv", "batch_size": transaction_queries.IMPORT_BATCH_SIZE},
+        "apply-rules": {"overwrite": False, "chunk_size": transaction_queries.CATEGORIZE_CHUNK_SIZE},
+        "rebucket-daily-totals": {"start_month": "2024-01", "end_month": "2024-12", "chunk_months": 3},
+        "rebuild": {"aggregate": "monthly-totals"},
+        "detect-recurring": {"min_occurrences": 3, "chunk_size": recurring_queries.DETECT_CHUNK_SIZE, "create": False},
+    }
+    jobs = {kind: await job_queries.create_job(db, kind, params) for kind, params in job_params.items()}
+    await db.commit()
+
+    fx_rows = generate_fx_rates(datetime(2025, 1, 1), 180)
+    return {
+        "rows": rows,
+        "account": await account_queries.get_account(db, 1),
+        "transaction_id": transaction_id,
+        "row": dict(row),
+        "recurring": recurring,
+        "recurring_id": recurring_rule.id,
+        "candidates": detection.candidates[:5],
+        "jobs": jobs,
+        "job_id": jobs["rebuild"].id,
+        "fx_rows": [(line, fx_row) for line, fx_row in enumerate(fx_rows, start=2)],
+        "import_file": lambda: open(path, "rb"),
+    }
+
+async def time_case(db: AsyncSession, case: Case, fixtures: Fixtures, iterations: int) -> List[float]:
+    """Run a case ``iterations`` times after one untimed warm-up, rolling back after every call"""
+    samples = []
+    for iteration in range(iterations + 1):
+        response_cache.bump(metadata.tables)
+        started = time.perf_counter()
+        await case.run(db, fixtures)
+        elapsed = time.perf_counter() - started
+        await db.rollback()
+        if iteration:
+            samples.append(elapsed)
+    return samples
+
+async def measure(args: argparse.Namespace) -> int:
+    """Build or reuse the ledger, time every case and compare with the baseline"""
+    path = args.ledger or os.path.join(tempfile.mkdtemp(prefix="bench_queries_"), "bench.db")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        create_ledger(f"sqlite:///{path}", args.rows, args.seed, realistic=True)
+        await rebuild_derived_tables(f"sqlite:///{path}")
+        print(f"Built a {args.rows:,}-row ledger at {path} in {time.perf_counter() - started:.1f}s")
+
+    write_engine = create_write_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    session_factory = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    summaries = []
+    calibration_ms = stats.calibrate()
+    async with session_factory() as db:
+        fixtures = await prepare_fixtures(db, args.rows, os.path.dirname(path))
+        for case in query_cases():
+            if args.only and args.only not in case.name:
+                continue
+            samples = await time_case(db, case, fixtures, args.heavy_iterations if case.heavy else args.iterations)
+            summaries.append(stats.summarize(case.name, samples))
+    await write_engine.dispose()
+
+    params = {"rows": args.rows, "seed": args.seed, "iterations": args.iterations, "heavy_iterations": args.heavy_iterations}
+    return stats.finish_run(args, params, summaries, (calibration_ms + stats.calibrate()) / 2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Transactions in the ledger")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic ledger")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per case")
+    parser.add_argument("--heavy-iterations", type=int, default=5, help="Timed calls per full-ledger case")
+    parser.add_argument("--only", help="Only run the cases whose name contains this text")
+    parser.add_argument("--ledger", help="Database file to keep the ledger in and reuse")
+    stats.add_baseline_arguments(parser, DEFAULT_BASELINE)
+    sys.exit(asyncio.run(measure(parser.parse_args())))
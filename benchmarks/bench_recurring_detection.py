@@ -0,0 +1,126 @@
+"""Recurring-series detection: pairwise comparison vs. the sorted-merge detector.
+
+Usage:
+    python -m benchmarks.bench_recurring_detection [--rows N] [--series S] [--sample K]
+
+Builds an N-row synthetic ledger (ten years) and adds S recurring series
+(weekly to yearly, with reference numbers in their descriptions and some
+occurrences a day late). "pairwise" groups K rows by normalized
+description and compares every pair of rows in a group, as a
+straightforward detector would; it is quadratic in the group size, so it
+only runs on the sample. "merge" is detect_recurring end to end: the
+chunked (date, id) scan of the whole ledger plus RecurringDetector's
+single pass. The run reports how many of the injected series were found.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+# Series names must survive normalization, which drops tokens with digits
+MERCHANTS = ["acme", "globex", "initech", "umbrella", "hooli", "stark", "wayne", "wonka", "tyrell", "cyberdyne"]
+PRODUCTS = ["cloud", "gym", "insurance", "phone", "streaming", "storage", "news", "music", "rent", "lease",
+            "water", "power", "internet", "parking", "tuition", "daycare", "loan", "charity", "payroll", "backup"]
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.recurring import CADENCES, add_cadence, normalize_description
+from app.db import create_write_engine
+from app.models.schema import transactions
+from app.queries import recurring as recurring_queries
+from benchmarks.synthetic import create_ledger, generate_transactions
+
+def generate_series(count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """Rows of ``count`` recurring series running until the end of the synthetic ledger"""
+    rnd = random.Random(seed)
+    cadences = list(CADENCES)
+    rows = []
+    for index in range(count):
+        cadence = cadences[index % len(cadences)]
+        amount = round(-rnd.uniform(5, 200), 2)
+        day = date(2015, 1, 1) + timedelta(days=rnd.randrange(365))
+        anchor = day.day
+        name = f"{MERCHANTS[index % len(MERCHANTS)]} {PRODUCTS[index // len(MERCHANTS) % len(PRODUCTS)]}"
+        while day < date(2024, 12, 27):
+            rows.append({
+                "amount": amount,
+                "description": f"{name} ref {rnd.randrange(10**6)}",
+                "date": datetime.combine(day + timedelta(days=rnd.choice((0, 0, 0, 1))), datetime.min.time()),
+                "category_id": None,
+                "created_at": datetime(2015, 1, 1),
+            })
+            day = add_cadence(day, cadence, anchor)
+    return rows
+
+def pairwise_detect(rows: List[Dict[str, Any]]) -> int:
+    """Count the groups with a cadence by comparing every pair of rows in each group"""
+    groups: Dict[str, List[date]] = {}
+    for row in rows:
+        key = normalize_description(row["description"])
+        if key:
+            groups.setdefault(key, []).append(row["date"].date())
+    found = 0
+    for days in groups.values():
+        for period, tolerance in CADENCES.values():
+            # A row is periodic if some other row lies one period after it
+            matches = sum(
+                1 for first in days
+                if any(abs((second - first).days - period) <= tolerance for second in days)
+            )
+            if len(days) >= 3 and matches >= 0.75 * (len(days) - 1):
+                found += 1
+                break
+    return found
+
+async def measure(rows: int, series: int, sample: int) -> None:
+    """Build the ledger, then time both detectors"""
+    injected = generate_series(series)
+    names = {normalize_description(row["description"]).rsplit(" ", 1)[0] for row in injected}
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_recurring_"), "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(insert(transactions), injected)
+    engine.dispose()
+    print(f"{rows:,} ledger rows plus {len(injected):,} rows in {series} recurring series")
+
+    ledger_sample = list(generate_transactions(sample)) + injected[:sample // 10]
+    started = time.perf_counter()
+    pairwise_found = pairwise_detect(ledger_sample)
+    pairwise_rate = len(ledger_sample) / (time.perf_counter() - started)
+
+    write_engine = create_write_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    session_factory = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        result = await recurring_queries.detect_recurring(session)
+    await write_engine.dispose()
+    found = {
+        candidate.normalized_description for candidate in result.candidates
+        if candidate.normalized_description.rsplit(" ", 1)[0] in names
+    }
+
+    print(f"{'path':<10}{'rows':>12}{'rows/s':>14}")
+    print(f"{'pairwise':<10}{len(ledger_sample):>12,}{pairwise_rate:>14,.0f}   ({pairwise_found} series in the sample)")
+    print(f"{'merge':<10}{result.scanned:>12,}{result.rows_per_second:>14,.0f}")
+    print(
+        f"merge scanned the whole ledger in {result.elapsed_seconds:.2f}s and found "
+        f"{len(found)} of {series} injected series ({len(result.candidates)} in total)"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic ledger")
+    parser.add_argument("--series", type=int, default=200, help="Recurring series added to it")
+    parser.add_argument("--sample", type=int, default=20_000, help="Rows given to the pairwise detector")
+    args = parser.parse_args()
+    asyncio.run(measure(args.rows, args.series, args.sample))
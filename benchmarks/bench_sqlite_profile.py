@@ -0,0 +1,132 @@
+"""Read throughput under a concurrent writer: SQLite defaults vs. the tuned profile.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile [--rows N] [--seconds S] [--readers R]
+
+For each profile a fresh synthetic ledger is created, then R reader tasks
+repeatedly load the first transactions page and the dashboard statistics
+while one writer task keeps committing import-sized batches of transactions.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import create_read_engine, create_write_engine
+from app.queries import transactions as transaction_queries
+from app.queries import dashboard as dashboard_queries
+from app.queries import category_stats as category_stats_queries
+from app.queries import monthly_totals as monthly_totals_queries
+from app.queries import daily_totals as daily_totals_queries
+from benchmarks.synthetic import create_ledger, generate_transactions
+
+# Rows committed per writer transaction, like one bulk import batch
+WRITE_BATCH_SIZE = 2000
+
+# SQLite's own defaults, i.e. what the app ran with before the profile existed
+DEFAULT_PROFILE = {
+    "SQLITE_JOURNAL_MODE": "DELETE",
+    "SQLITE_SYNCHRONOUS": "FULL",
+    "SQLITE_MMAP_SIZE": 0,
+    "SQLITE_CACHE_SIZE": -2000,
+    "SQLITE_TEMP_STORE": "DEFAULT",
+}
+
+TUNED_PROFILE = {
+    name: getattr(settings, name) for name in DEFAULT_PROFILE
+}
+
+async def run_profile(name: str, profile: dict, rows: int, seconds: float, readers: int) -> dict:
+    """Benchmark one profile on a fresh database and return its counters"""
+    directory = tempfile.mkdtemp(prefix="bench_sqlite_")
+    path = os.path.join(directory, "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+
+    config = settings.model_copy(update={
+        **profile,
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+        "DB_READ_POOL_SIZE": readers,
+    })
+    write_engine, read_engine = create_write_engine(config), create_read_engine(config)
+    write_session = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_session = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with write_session() as session:
+        await category_stats_queries.rebuild_category_stats(session)
+        await monthly_totals_queries.rebuild_monthly_totals(session)
+        await daily_totals_queries.rebuild_daily_totals(session)
+        await session.commit()
+
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with read_session() as session:
+                    await transaction_queries.list_transactions_keyset(session, limit=50)
+                    await dashboard_queries.get_dashboard_stats(session)
+                counters["reads"] += 1
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                counters["errors"] += 1
+
+    async def writer() -> None:
+        seed = 0
+        while time.perf_counter() < deadline:
+            seed += 1
+            batch = [
+                (position, row)
+                for position, row in enumerate(generate_transactions(WRITE_BATCH_SIZE, seed=seed))
+            ]
+            try:
+                async with write_session() as session:
+                    await transaction_queries.import_transactions(session, batch)
+                    await session.commit()
+                counters["writes"] += len(batch)
+            except OperationalError:
+                counters["errors"] += 1
+
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": name,
+        "reads_per_second": counters["reads"] / seconds,
+        "read_p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "rows_written_per_second": counters["writes"] / seconds,
+        "errors": counters["errors"],
+    }
+
+async def main(rows: int, seconds: float, readers: int) -> None:
+    """Run both profiles and print a comparison"""
+    results = [
+        await run_profile("default", DEFAULT_PROFILE, rows, seconds, readers),
+        await run_profile("tuned", TUNED_PROFILE, rows, seconds, readers),
+    ]
+    print(f"{'profile':<10}{'reads/s':>12}{'read p95 ms':>14}{'rows written/s':>16}{'errors':>10}")
+    for result in results:
+        print(
+            f"{result['profile']:<10}{result['reads_per_second']:>12.1f}"
+            f"{result['read_p95_ms']:>14.1f}{result['rows_written_per_second']:>16.1f}"
+            f"{result['errors']:>10}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic transactions to create")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent reader tasks")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.seconds, args.readers))
@@ -0,0 +1,200 @@
+"""Per-call overhead of the hot read statements, before and after caching them.
+
+Usage:
+    python -m benchmarks.bench_statements [--rows N] [--calls C] [--repeat R]
+
+"before" rebuilds each statement the way the query modules used to: a fresh
+select() per call with the arguments inlined, which SQLAlchemy has to walk
+to compute a cache key before it finds the compiled form. "after" uses the
+current builders: statements built once with bindparam() placeholders, and
+lambda statements for listings, whose cache key is the lambdas' code plus
+their closure values. Both run the same SQL against the same ledger and
+fetch every row, so the difference is Python-side statement overhead. A sync
+engine keeps the event loop and the aiosqlite thread out of the numbers.
+
+Prints the best microseconds per call of each case and the share of calls
+that found their compiled statement in the engine's cache.
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import create_engine, event, func, select, tuple_
+from sqlalchemy.engine import Connection, default
+
+from app.models.schema import transactions, categories, category_stats
+from app.queries import transactions as transaction_queries
+from app.queries import categories as category_queries
+from benchmarks.synthetic import create_ledger
+
+# A statement and its parameters, or None when the values are inlined
+Call = Tuple[Any, Optional[Dict[str, Any]]]
+
+class StatementCase(NamedTuple):
+    """One hot read, built the old way and the current way for call ``i``"""
+    name: str
+    before: Callable[[int], Call]
+    after: Callable[[int], Call]
+
+def legacy_listing_query():
+    """The transactions-with-category select the listings rebuilt on every call"""
+    return (
+        select(
+            transactions,
+            categories.c.name.label('category_name'),
+            categories.c.description.label('category_description')
+        )
+        .select_from(
+            transactions.outerjoin(
+                categories,
+                transactions.c.category_id == categories.c.id
+            )
+        )
+    )
+
+def legacy_keyset_query(limit: int, category_id: Optional[int] = None, after: Optional[Tuple] = None):
+    """The keyset listing as it was built per call"""
+    query = legacy_listing_query().limit(limit).order_by(transactions.c.date.desc(), transactions.c.id.desc())
+    if after is not None:
+        query = query.where(tuple_(transactions.c.date, transactions.c.id) < tuple_(*after))
+    if category_id is not None:
+        query = query.where(transactions.c.category_id == category_id)
+    return query
+
+def statement_cases(ids: List[int], cursors: List[Tuple]) -> List[StatementCase]:
+    """The hot reads, each call picking the next ID or cursor"""
+    def pick(values: List, i: int):
+        return values[i % len(values)]
+
+    return [
+        StatementCase(
+            "get_transaction",
+            lambda i: (legacy_listing_query().where(transactions.c.id == pick(ids, i)), None),
+            lambda i: (transaction_queries.get_transaction_query(), {"transaction_id": pick(ids, i)}),
+        ),
+        StatementCase(
+            "get_transaction_row",
+            lambda i: (select(transactions).where(transactions.c.id == pick(ids, i)), None),
+            lambda i: (transaction_queries.get_transaction_row_query(), {"transaction_id": pick(ids, i)}),
+        ),
+        StatementCase(
+            "get_category",
+            lambda i: (select(categories).where(categories.c.id == 1 + i % 8), None),
+            lambda i: (category_queries.get_category_query(), {"category_id": 1 + i % 8}),
+        ),
+        StatementCase(
+            "list_categories",
+            lambda i: (select(categories).order_by(categories.c.name).limit(100).offset(0), None),
+            lambda i: (category_queries.list_categories_query(), {"limit": 100, "offset": 0}),
+        ),
+        StatementCase(
+            "list_categories_with_counts",
+            lambda i: (
+                select(
+                    categories,
+                    func.coalesce(category_stats.c.transaction_count, 0).label('transaction_count')
+                )
+                .outerjoin(category_stats, categories.c.id == category_stats.c.category_id)
+                .order_by(categories.c.name),
+                None
+            ),
+            lambda i: (category_queries.list_categories_with_counts_query(), None),
+        ),
+        StatementCase(
+            "max_transaction_id",
+            lambda i: (select(func.max(transactions.c.id)), None),
+            lambda i: (transaction_queries.max_transaction_id_query(), None),
+        ),
+        StatementCase(
+            "list_transactions",
+            lambda i: (
+                legacy_listing_query()
+                .order_by(transactions.c.date.desc(), transactions.c.id.desc())
+                .limit(100)
+                .offset(i % 5 * 100),
+                None
+            ),
+            lambda i: (transaction_queries.list_transactions_query(100, i % 5 * 100), None),
+        ),
+        StatementCase(
+            "list_transactions_keyset",
+            lambda i: (legacy_keyset_query(101), None),
+            lambda i: (transaction_queries.list_transactions_keyset_query(101), None),
+        ),
+        StatementCase(
+            "list_transactions_keyset_after",
+            lambda i: (legacy_keyset_query(101, after=pick(cursors, i)), None),
+            lambda i: (transaction_queries.list_transactions_keyset_query(101, after=pick(cursors, i)), None),
+        ),
+        StatementCase(
+            "list_transactions_keyset_category_after",
+            lambda i: (legacy_keyset_query(101, 1 + i % 8, pick(cursors, i)), None),
+            lambda i: (
+                transaction_queries.list_transactions_keyset_query(101, 1 + i % 8, pick(cursors, i)),
+                None
+            ),
+        ),
+    ]
+
+def run_calls(connection: Connection, build: Callable[[int], Call], calls: int) -> None:
+    """Build and execute ``calls`` statements, fetching every row"""
+    for i in range(calls):
+        statement, params = build(i)
+        connection.execute(statement, params).all()
+
+def measure(connection: Connection, build: Callable[[int], Call], calls: int, repeat: int) -> float:
+    """Return the best microseconds per call over ``repeat`` runs"""
+    run_calls(connection, build, calls)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_calls(connection, build, calls)
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1_000_000
+
+def main(rows: int, calls: int, repeat: int) -> None:
+    """Run both ways of building every case and print a comparison"""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_statements_"), "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+    engine = create_engine(f"sqlite:///{path}")
+    cache_hits: List[bool] = []
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_cache_hit(conn, cursor, statement, parameters, context, executemany):
+        cache_hits.append(context.cache_hit == default.CACHE_HIT)
+
+    with engine.connect() as connection:
+        listed = connection.execute(
+            select(transactions.c.date, transactions.c.id).order_by(transactions.c.id).limit(rows)
+        ).all()
+        ids = [row.id for row in listed[::max(1, len(listed) // 50)]]
+        cursors = [(row.date, row.id) for row in listed[::max(1, len(listed) // 50)]]
+        cases = statement_cases(ids, cursors)
+
+        width = max(len(case.name) for case in cases)
+        print(f"{'case':<{width}}{'before us':>11}{'after us':>10}{'speedup':>9}{'hits before':>13}{'hits after':>12}")
+        for case in cases:
+            for i in range(3):
+                before_rows = connection.execute(*case.before(i)).all()
+                assert before_rows == connection.execute(*case.after(i)).all(), case.name
+            results = []
+            for build in (case.before, case.after):
+                cache_hits.clear()
+                per_call = measure(connection, build, calls, repeat)
+                results.append((per_call, sum(cache_hits) / len(cache_hits)))
+            (before_us, before_hits), (after_us, after_hits) = results
+            print(
+                f"{case.name:<{width}}{before_us:>11.1f}{after_us:>10.1f}{before_us / after_us:>8.1f}x"
+                f"{before_hits:>13.0%}{after_hits:>12.0%}"
+            )
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Transactions in the ledger")
+    parser.add_argument("--calls", type=int, default=500, help="Calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case and path; the best is kept")
+    args = parser.parse_args()
+    main(args.rows, args.calls, args.repeat)
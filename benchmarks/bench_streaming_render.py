@@ -0,0 +1,118 @@
+"""Time to first byte, total time and peak memory of a full transaction listing, rendered whole or streamed.
+
+Usage:
+    python -m benchmarks.bench_streaming_render [--rows N] [--repeat R]
+
+"whole" is how list pages are rendered: every row is fetched into a list,
+then transactions/list.html is rendered into one string, so nothing can be
+sent before the last row is rendered. "streamed" is /transactions/all: the
+same template rendered with generate_async() while the rows are read
+through AsyncSession.stream(), in chunks of about STREAM_BUFFER_CHARS.
+Both produce the same HTML from the same ledger. Peak memory is measured
+with tracemalloc in a separate, untimed run.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.config import settings
+from app.core.templates import templates, stream_template
+from app.db import create_read_engine
+from app.models.domain import TransactionFilter
+from app.queries import transactions as transaction_queries
+from app.queries import categories as category_queries
+from benchmarks.synthetic import create_ledger, rebuild_derived_tables
+
+TEMPLATE = "transactions/list.html"
+
+async def page_context(db: AsyncSession) -> Dict[str, Any]:
+    """Everything list.html needs except the rows"""
+    filters = TransactionFilter()
+    return {
+        "request": Request({"type": "http", "method": "GET", "path": "/transactions/all", "headers": []}),
+        "next_cursor": None,
+        "total": await transaction_queries.count_transactions(db, filters),
+        "categories": await category_queries.list_categories(db),
+        "filters": filters,
+        "filter_query": "",
+    }
+
+async def render_whole(db: AsyncSession) -> Tuple[float, int]:
+    """Fetch every row, render the page into one string; return (first byte s, bytes)"""
+    started = time.perf_counter()
+    context = await page_context(db)
+    context["transactions"] = await transaction_queries.list_transactions(db, limit=context["total"].count)
+    body = templates.get_template(TEMPLATE).render(context).encode()
+    return time.perf_counter() - started, len(body)
+
+async def render_streamed(db: AsyncSession) -> Tuple[float, int]:
+    """Render the page while the rows are read; return (first byte s, bytes)"""
+    started = time.perf_counter()
+    context = await page_context(db)
+    context["transactions"] = transaction_queries.stream_transaction_listing(db)
+    first_byte, size = None, 0
+    async for chunk in stream_template(TEMPLATE, context):
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk.encode())
+    return first_byte, size
+
+async def measure(
+    session_factory: sessionmaker,
+    render: Callable[[AsyncSession], Awaitable[Tuple[float, int]]],
+    repeat: int
+) -> Dict[str, float]:
+    """Best first-byte and total seconds over ``repeat`` runs, then traced peak bytes"""
+    first_byte, total, size = float("inf"), float("inf"), 0
+    for _ in range(repeat):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            run_first_byte, size = await render(db)
+            total = min(total, time.perf_counter() - started)
+            first_byte = min(first_byte, run_first_byte)
+    async with session_factory() as db:
+        tracemalloc.start()
+        await render(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"first_byte": first_byte, "total": total, "peak": peak, "size": size}
+
+async def main(rows: int, repeat: int) -> None:
+    """Render the listing both ways and print a comparison"""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_streaming_"), "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+    await rebuild_derived_tables(f"sqlite:///{path}")
+    engine = create_read_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    results = {}
+    for name, render in (("whole", render_whole), ("streamed", render_streamed)):
+        results[name] = await measure(session_factory, render, repeat)
+    await engine.dispose()
+    assert results["whole"]["size"] == results["streamed"]["size"], results
+
+    print(f"{rows:,} rows, {results['whole']['size'] / 1e6:.1f} MB of HTML")
+    print(f"{'path':<10}{'first byte ms':>15}{'total ms':>11}{'peak MB':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<10}{result['first_byte'] * 1000:>15.1f}{result['total'] * 1000:>11.1f}"
+            f"{result['peak'] / 1e6:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Transactions in the ledger")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path; the best is kept")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,103 @@
+"""Rows/sec of the api_list_transactions response path, before and after.
+
+Usage:
+    python -m benchmarks.bench_transaction_serialization [--rows N] [--repeat R]
+
+"before" rebuilds the original path: each row became a Transaction, was
+dumped with .dict() into a TransactionWithCategory, and FastAPI then dumped
+the list, validated it against response_model and JSON-encoded it. "after"
+is the current path: model_construct per row and one precompiled
+TypeAdapter.dump_json. Both start from the same fetched rows, so the numbers
+isolate Python-side conversion and serialization.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import transaction_list_adapter
+from app.db import create_read_engine
+from app.config import settings
+from app.models.domain import Transaction, TransactionWithCategory
+from app.queries import transactions as transaction_queries
+from benchmarks.synthetic import create_ledger
+
+def legacy_row_to_transaction_with_category(row) -> TransactionWithCategory:
+    """The original per-row conversion, validated twice"""
+    transaction = Transaction(
+        id=row.id,
+        amount=row.amount,
+        description=row.description,
+        date=row.date,
+        category_id=row.category_id,
+        created_at=row.created_at,
+    )
+    category_data = None
+    if row.category_name:
+        category_data = {
+            "id": row.category_id,
+            "name": row.category_name,
+            "description": row.category_description,
+            "created_at": row.created_at,
+        }
+    return TransactionWithCategory(**transaction.model_dump(), category=category_data)
+
+def before(rows) -> bytes:
+    """Original conversion plus FastAPI's response_model round trip"""
+    items = [legacy_row_to_transaction_with_category(row) for row in rows]
+    dumped = [item.model_dump() for item in items]
+    validated = transaction_list_adapter.validate_python(dumped)
+    content = jsonable_encoder(transaction_list_adapter.dump_python(validated, mode="json"))
+    return json.dumps(content).encode("utf-8")
+
+def after(rows) -> bytes:
+    """Single model_construct per row and a precompiled JSON serializer"""
+    items = [transaction_queries.row_to_transaction_with_category(row) for row in rows]
+    return transaction_list_adapter.dump_json(items)
+
+def measure(fn: Callable, rows: List, repeat: int) -> float:
+    """Return the best rows/sec over ``repeat`` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+async def fetch_rows(rows: int) -> List:
+    """Create a synthetic ledger and fetch one listing's worth of joined rows"""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_serialization_"), "bench.db")
+    create_ledger(f"sqlite:///{path}", rows)
+    engine = create_read_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    async with engine.connect() as connection:
+        result = await connection.execute(transaction_queries.list_transactions_query(limit=rows))
+        fetched = result.all()
+    await engine.dispose()
+    return fetched
+
+def main(rows: int, repeat: int) -> None:
+    """Run both paths and print a comparison"""
+    fetched = asyncio.run(fetch_rows(rows))
+    assert json.loads(before(fetched)) == json.loads(after(fetched))
+
+    before_rate = measure(before, fetched, repeat)
+    after_rate = measure(after, fetched, repeat)
+    print(f"{'path':<8}{'rows/s':>14}")
+    print(f"{'before':<8}{before_rate:>14,.0f}")
+    print(f"{'after':<8}{after_rate:>14,.0f}")
+    print(f"speedup {after_rate / before_rate:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per listing")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the best is kept")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
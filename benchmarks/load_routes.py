@@ -0,0 +1,383 @@
+"""Latency and throughput of every FastAPI route under concurrent load.
+
+Usage:
+    python -m benchmarks.load_routes [--rows N] [--requests K] [--heavy-requests H]
+        [--concurrency C] [--only TEXT] [--response-cache] [--ledger PATH]
+        [--baseline PATH] [--save-baseline] [--metric p50|p95|p99] [--tolerance T]
+
+Builds an N-row ledger with benchmarks.synthetic (realistic distributions,
+accounts, FX rates, budgets and rules; rollups rebuilt) and drives the app
+in-process through httpx's ASGI transport, so no server or sockets are
+involved. Every route, the HTMX pages and partials included, gets K
+requests from C concurrent clients; the "heavy" ones that read the whole
+ledger (export, recurring candidates, applying rules) get H from one.
+Routes that delete or cancel something are given rows created for them
+beforehand, outside the timing. The background job runner is not started,
+so job routes only queue jobs.
+
+The response cache is off unless --response-cache is given, so handlers
+and their queries are what is timed. The run fails when a request gets an
+error status or when a route of the app has no case here.
+
+Prints p50/p95/p99 and requests per second for every route and compares
+them with the baseline (benchmarks/baselines/routes.json by default, see
+benchmarks.stats), exiting with 1 when a route regressed; --save-baseline
+records this run instead. --ledger keeps the generated database at PATH
+and reuses it.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks import stats
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "routes.json")
+
+# Ids and values the cases share; "ids" holds the rows prepared for the case
+Fixtures = Dict[str, Any]
+
+class RouteCase(NamedTuple):
+    """Requests to one route: ``request`` gives the i-th request's httpx arguments"""
+    method: str
+    path: str
+    request: Callable[[int, Fixtures], Dict[str, Any]]
+    prepare: Optional[Callable[[Any, int, Fixtures], Awaitable[List[Any]]]] = None
+    heavy: bool = False
+
+def form_upload(fixtures: Fixtures) -> Dict[str, Any]:
+    """A small CSV bank export as a multipart file"""
+    return {"files": {"file": ("export.csv", fixtures["csv"], "text/csv")}}
+
+def transaction_json(i: int) -> Dict[str, Any]:
+    """The body of a new transaction"""
+    return {
+        "amount": f"-{i % 90 + 10}.25",
+        "description": "Coffee shop",
+        "date": f"2024-06-{i % 28 + 1:02d}T08:30:00",
+        "category_id": 5,
+        "account_id": 2,
+    }
+
+async def created_ids(response) -> List[int]:
+    """The ids of the rows a batch route created"""
+    response.raise_for_status()
+    return [result["id"] for result in response.json()["results"]]
+
+async def create_transactions(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Transactions for the delete routes to remove"""
+    operations = [{"op": "create", "data": transaction_json(i)} for i in range(count)]
+    return await created_ids(await client.post("/api/transactions/batch", json={"operations": operations}))
+
+async def create_categories(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Empty categories for the delete and merge routes"""
+    token = uuid.uuid4().hex[:8]
+    operations = [{"op": "create", "data": {"name": f"{token} prepared {i}"}} for i in range(count)]
+    return await created_ids(await client.post("/api/categories/batch", json={"operations": operations}))
+
+async def create_budgets(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Budgeted categories for the budget delete routes"""
+    category_ids = await create_categories(client, count, fixtures)
+    for category_id in category_ids:
+        (await client.put(f"/api/budgets/{category_id}", json={"amount": "250.00"})).raise_for_status()
+    return category_ids
+
+async def create_each(client, path: str, bodies: List[Dict[str, Any]]) -> List[int]:
+    """POST every body to a route, returning the ids it created"""
+    ids = []
+    for body in bodies:
+        response = await client.post(path, json=body)
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+async def create_rules(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Categorization rules for the delete route"""
+    return await create_each(client, "/api/rules/", [{"category_id": 3, "pattern": "Metro card"}] * count)
+
+async def create_accounts(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Accounts without transactions for the delete route"""
+    token = uuid.uuid4().hex[:8]
+    return await create_each(client, "/api/accounts/", [{"name": f"{token} prepared {i}"} for i in range(count)])
+
+async def create_recurring_rules(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Recurring rules for the delete route"""
+    return await create_each(client, "/api/recurring/", [fixtures["recurring"]] * count)
+
+async def queue_jobs(client, count: int, fixtures: Fixtures) -> List[int]:
+    """Queued jobs for the cancel routes"""
+    ids = []
+    for _ in range(count):
+        response = await client.post("/api/jobs/apply-rules")
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+def route_cases() -> List[RouteCase]:
+    """One case per route of the app"""
+    year = {"start": "2024-01-01", "end": "2024-12-31"}
+    return [
+        # transactions
+        RouteCase("GET", "/api/transactions/", lambda i, f: {"params": {"limit": 50, "offset": i * 50}}),
+        RouteCase("GET", "/api/transactions/page", lambda i, f: {"params": {"limit": 50, "include_total": i % 2 == 0}}),
+        RouteCase("GET", "/api/transactions/export", lambda i, f: {"params": {"format": "csv"}}, heavy=True),
+        RouteCase("GET", "/api/transactions/search", lambda i, f: {"params": {"q": ["amaz", "uber", "star"][i % 3]}}),
+        RouteCase("GET", "/api/transactions/{transaction_id}", lambda i, f: {
+            "url": f"/api/transactions/{f['transaction_ids'][i % len(f['transaction_ids'])]}"
+        }),
+        RouteCase("POST", "/api/transactions/", lambda i, f: {"json": transaction_json(i)}),
+        RouteCase("POST", "/api/transactions/import", lambda i, f: form_upload(f)),
+        RouteCase("POST", "/api/transactions/batch", lambda i, f: {
+            "json": {"operations": [{"op": "create", "data": transaction_json(i * 5 + n)} for n in range(5)]}
+        }),
+        RouteCase("PUT", "/api/transactions/{transaction_id}", lambda i, f: {
+            "url": f"/api/transactions/{f['transaction_ids'][i % len(f['transaction_ids'])]}",
+            "json": transaction_json(i),
+        }),
+        RouteCase("DELETE", "/api/transactions/{transaction_id}", lambda i, f: {
+            "url": f"/api/transactions/{f['ids'][i]}"
+        }, create_transactions),
+        RouteCase("GET", "/transactions/", lambda i, f: {}),
+        RouteCase("GET", "/transactions/rows", lambda i, f: {"params": {"cursor": f["cursor"]}}),
+        RouteCase("GET", "/transactions/tbody", lambda i, f: {
+            "params": {"q": ["amaz", "uber", "star"][i % 3]} if i % 2 else {**year, "category_id": [1 + i % 4]},
+            "headers": {"HX-Request": "true"}
+        }),
+        RouteCase("GET", "/transactions/all", lambda i, f: {"params": {"sign": "expense"}}, heavy=True),
+        RouteCase("GET", "/transactions/search", lambda i, f: {
+            "params": {"q": ["amaz", "uber", "star"][i % 3]} if i % 2 else {**year, "sign": "expense", "min_amount": "50"}
+        }),
+        RouteCase("GET", "/transactions/new", lambda i, f: {}),
+        RouteCase("POST", "/transactions/", lambda i, f: {"data": {
+            "amount": "-12.50", "description": "Coffee shop", "date": "2024-06-01", "category_id": "5"
+        }}),
+        RouteCase("GET", "/transactions/{transaction_id}", lambda i, f: {
+            "url": f"/transactions/{f['transaction_ids'][i % len(f['transaction_ids'])]}"
+        }),
+        RouteCase("DELETE", "/transactions/{transaction_id}", lambda i, f: {
+            "url": f"/transactions/{f['ids'][i]}"
+        }, create_transactions),
+        # categories
+        RouteCase("GET", "/api/categories/", lambda i, f: {}),
+        RouteCase("GET", "/api/categories/with-counts/", lambda i, f: {}),
+        RouteCase("GET", "/api/categories/{category_id}", lambda i, f: {"url": f"/api/categories/{i % 10 + 1}"}),
+        RouteCase("POST", "/api/categories/", lambda i, f: {"json": {"name": f"{f['token']} new {i}"}}),
+        RouteCase("POST", "/api/categories/batch", lambda i, f: {"json": {"operations": [
+            {"op": "create", "data": {"name": f"{f['token']} batch {i}"}},
+            {"op": "update", "id": i % 10 + 1, "data": {"description": f"Updated {i}"}},
+        ]}}),
+        RouteCase("POST", "/api/categories/{category_id}/merge", lambda i, f: {
+            "url": f"/api/categories/{f['ids'][i]}/merge", "params": {"into": 1}
+        }, create_categories),
+        RouteCase("PUT", "/api/categories/{category_id}", lambda i, f: {
+            "url": f"/api/categories/{f['ids'][i]}", "json": {"name": f"{f['token']} renamed {i}"}
+        }, create_categories),
+        RouteCase("DELETE", "/api/categories/{category_id}", lambda i, f: {
+            "url": f"/api/categories/{f['ids'][i]}"
+        }, create_categories),
+        RouteCase("GET", "/categories/", lambda i, f: {}),
+        RouteCase("GET", "/categories/new", lambda i, f: {}),
+        RouteCase("POST", "/categories/", lambda i, f: {"data": {"name": f"{f['token']} form {i}"}}),
+        RouteCase("GET", "/categories/{category_id}", lambda i, f: {"url": f"/categories/{i % 10 + 1}"}),
+        RouteCase("DELETE", "/categories/{category_id}", lambda i, f: {
+            "url": f"/categories/{f['ids'][i]}"
+        }, create_categories),
+        # reports
+        RouteCase("GET", "/api/reports/timeseries", lambda i, f: {
+            "params": {**year, "granularity": ["day", "week", "month", "year"][i % 4]}
+        }),
+        RouteCase("GET", "/api/reports/timeseries/totals", lambda i, f: {
+            "params": {**year, "granularity": ["day", "week", "month", "year"][i % 4]}
+        }),
+        # rules
+        RouteCase("GET", "/api/rules/", lambda i, f: {}),
+        RouteCase("POST", "/api/rules/", lambda i, f: {"json": {"category_id": 5, "pattern": "Chipotle"}}),
+        RouteCase("POST", "/api/rules/apply", lambda i, f: {}, heavy=True),
+        RouteCase("GET", "/api/rules/{rule_id}", lambda i, f: {"url": f"/api/rules/{i % 7 + 1}"}),
+        RouteCase("DELETE", "/api/rules/{rule_id}", lambda i, f: {"url": f"/api/rules/{f['ids'][i]}"}, create_rules),
+        # accounts
+        RouteCase("GET", "/api/accounts/", lambda i, f: {}),
+        RouteCase("POST", "/api/accounts/", lambda i, f: {"json": {"name": f"{f['token']} new {i}"}}),
+        RouteCase("GET", "/api/accounts/{account_id}", lambda i, f: {"url": f"/api/accounts/{i % 3 + 1}"}),
+        RouteCase("GET", "/api/accounts/{account_id}/balance", lambda i, f: {
+            "url": f"/api/accounts/{i % 2 + 1}/balance", "params": {"as_of": f"2024-{i % 12 + 1:02d}-15"}
+        }),
+        RouteCase("GET", "/api/accounts/{account_id}/running-balance", lambda i, f: {
+            "url": f"/api/accounts/{i % 2 + 1}/running-balance", "params": {"start": f"2024-{i % 12 + 1:02d}-01"}
+        }),
+        RouteCase("DELETE", "/api/accounts/{account_id}", lambda i, f: {
+            "url": f"/api/accounts/{f['ids'][i]}"
+        }, create_accounts),
+        # budgets
+        RouteCase("GET", "/api/budgets/", lambda i, f: {}),
+        RouteCase("GET", "/api/budgets/report", lambda i, f: {"params": {"month": f"2024-{i % 12 + 1:02d}"}}),
+        RouteCase("PUT", "/api/budgets/{category_id}", lambda i, f: {
+            "url": f"/api/budgets/{i % 5 + 1}", "json": {"amount": f"{500 + i}.00"}
+        }),
+        RouteCase("DELETE", "/api/budgets/{category_id}", lambda i, f: {
+            "url": f"/api/budgets/{f['ids'][i]}"
+        }, create_budgets),
+        RouteCase("GET", "/budgets/", lambda i, f: {"params": {"month": f"2024-{i % 12 + 1:02d}"}}),
+        RouteCase("GET", "/budgets/bars", lambda i, f: {"params": {"month": f"2024-{i % 12 + 1:02d}"}}),
+        RouteCase("POST", "/budgets/", lambda i, f: {"data": {
+            "category_id": str(i % 5 + 1), "amount": f"{500 + i}.00", "month": "2024-06"
+        }}),
+        RouteCase("DELETE", "/budgets/{category_id}", lambda i, f: {"url": f"/budgets/{f['ids'][i]}"}, create_budgets),
+        # recurring
+        RouteCase("GET", "/api/recurring/", lambda i, f: {}),
+        RouteCase("POST", "/api/recurring/", lambda i, f: {"json": f["recurring"]}),
+        RouteCase("GET", "/api/recurring/candidates", lambda i, f: {}, heavy=True),
+        RouteCase("POST", "/api/recurring/generate", lambda i, f: {"params": {"through": "2025-01-31"}}),
+        RouteCase("GET", "/api/recurring/{rule_id}", lambda i, f: {"url": f"/api/recurring/{f['recurring_id']}"}),
+        RouteCase("DELETE", "/api/recurring/{rule_id}", lambda i, f: {
+            "url": f"/api/recurring/{f['ids'][i]}"
+        }, create_recurring_rules),
+        # jobs
+        RouteCase("GET", "/api/jobs/", lambda i, f: {}),
+        RouteCase("POST", "/api/jobs/import", lambda i, f: form_upload(f)),
+        RouteCase("POST", "/api/jobs/apply-rules", lambda i, f: {}),
+        RouteCase("POST", "/api/jobs/rebucket-daily-totals", lambda i, f: {"params": {"start": "2024-01", "end": "2024-12"}}),
+        RouteCase("POST", "/api/jobs/rebuild/{aggregate}", lambda i, f: {
+            "url": f"/api/jobs/rebuild/{['category-stats', 'daily-totals'][i % 2]}"
+        }),
+        RouteCase("POST", "/api/jobs/detect-recurring", lambda i, f: {}),
+        RouteCase("GET", "/api/jobs/{job_id}", lambda i, f: {"url": f"/api/jobs/{f['job_id']}"}),
+        RouteCase("POST", "/api/jobs/{job_id}/cancel", lambda i, f: {"url": f"/api/jobs/{f['ids'][i]}/cancel"}, queue_jobs),
+        RouteCase("GET", "/jobs/", lambda i, f: {}),
+        RouteCase("GET", "/jobs/{job_id}", lambda i, f: {"url": f"/jobs/{f['job_id']}"}),
+        RouteCase("POST", "/jobs/import", lambda i, f: form_upload(f)),
+        RouteCase("POST", "/jobs/apply-rules", lambda i, f: {"data": {}}),
+        RouteCase("POST", "/jobs/rebuild", lambda i, f: {"data": {"aggregate": "monthly-totals"}}),
+        RouteCase("POST", "/jobs/detect-recurring", lambda i, f: {"data": {}}),
+        RouteCase("POST", "/jobs/{job_id}/cancel", lambda i, f: {"url": f"/jobs/{f['ids'][i]}/cancel"}, queue_jobs),
+        # dashboard, health and metrics
+        RouteCase("GET", "/", lambda i, f: {}),
+        RouteCase("GET", "/health", lambda i, f: {}),
+        RouteCase("GET", "/health/cache", lambda i, f: {}),
+        RouteCase("GET", "/metrics", lambda i, f: {}),
+    ]
+
+def uncovered_routes(app, cases: List[RouteCase]) -> List[str]:
+    """The routes of the app that no case requests"""
+    from fastapi.routing import APIRoute
+
+    covered = {(case.method, case.path) for case in cases}
+    return [
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+        if (method, route.path) not in covered
+    ]
+
+async def prepare_fixtures(client) -> Fixtures:
+    """Ids the cases read, and a recurring rule and a job to read back"""
+    from benchmarks.synthetic import import_csv
+
+    page = (await client.get("/api/transactions/page", params={"limit": 100})).json()
+    recurring = {
+        "description": "Car insurance", "amount": "-120.00", "category_id": 3, "account_id": 1,
+        "cadence": "monthly", "start_date": "2024-01-05",
+    }
+    recurring_rule = await create_each(client, "/api/recurring/", [recurring])
+    jobs = await queue_jobs(client, 1, {})
+    return {
+        "token": uuid.uuid4().hex[:8],
+        "transaction_ids": [item["id"] for item in page["items"]],
+        "cursor": page["next_cursor"],
+        "recurring": recurring,
+        "recurring_id": recurring_rule[0],
+        "job_id": jobs[0],
+        "csv": import_csv(50),
+    }
+
+async def load_route(client, case: RouteCase, fixtures: Fixtures, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Send a case's requests from ``concurrency`` clients, returning its summary and error count"""
+    if case.prepare is not None:
+        fixtures = {**fixtures, "ids": await case.prepare(client, requests, fixtures)}
+    samples: List[float] = []
+    errors: List[str] = []
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            request = {"url": case.path, **case.request(i, fixtures)}
+            started = time.perf_counter()
+            response = await client.request(case.method, **request)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(f"{case.method} {request['url']}: {response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+    summary = stats.summarize(f"{case.method} {case.path}", samples, time.perf_counter() - started)
+    return {"summary": summary, "errors": errors}
+
+async def measure(args: argparse.Namespace) -> int:
+    """Build or reuse the ledger, load every route and compare with the baseline"""
+    path = args.ledger or os.path.join(tempfile.mkdtemp(prefix="load_routes_"), "bench.db")
+    # app.config reads the environment when it is first imported
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{path}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+        "DEBUG": "false",
+        "RESPONSE_CACHE_ENABLED": "true" if args.response_cache else "false",
+        "JOB_SPOOL_DIR": os.path.join(os.path.dirname(path), "job_spool"),
+    })
+    import httpx
+    from app.main import app
+    from benchmarks.synthetic import create_ledger, rebuild_derived_tables
+
+    cases = route_cases()
+    missing = uncovered_routes(app, cases)
+    for route in missing:
+        print(f"No load case for {route}")
+    if missing:
+        return 1
+
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        create_ledger(f"sqlite:///{path}", args.rows, args.seed, realistic=True)
+        await rebuild_derived_tables(f"sqlite:///{path}")
+        print(f"Built a {args.rows:,}-row ledger at {path} in {time.perf_counter() - started:.1f}s")
+
+    summaries, errors = [], []
+    calibration_ms = stats.calibrate()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        fixtures = await prepare_fixtures(client)
+        for case in cases:
+            if args.only and args.only not in f"{case.method} {case.path}":
+                continue
+            requests = args.heavy_requests if case.heavy else args.requests
+            result = await load_route(client, case, fixtures, requests, 1 if case.heavy else args.concurrency)
+            summaries.append(result["summary"])
+            errors.extend(result["errors"])
+
+    params = {
+        "rows": args.rows, "seed": args.seed, "requests": args.requests, "heavy_requests": args.heavy_requests,
+        "concurrency": args.concurrency, "response_cache": args.response_cache,
+    }
+    for error in errors[:20]:
+        print(f"ERROR {error}")
+    if errors:
+        stats.print_summaries(summaries)
+        print(f"{len(errors)} requests failed")
+        return 1
+    return stats.finish_run(args, params, summaries, (calibration_ms + stats.calibrate()) / 2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Transactions in the ledger")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic ledger")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per route")
+    parser.add_argument("--heavy-requests", type=int, default=3, help="Requests per full-ledger route")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients per route")
+    parser.add_argument("--only", help="Only load the routes whose 'METHOD /path' contains this text")
+    parser.add_argument("--response-cache", action="store_true", help="Serve repeated GETs from the response cache")
+    parser.add_argument("--ledger", help="Database file to keep the ledger in and reuse")
+    stats.add_baseline_arguments(parser, DEFAULT_BASELINE)
+    sys.exit(asyncio.run(measure(parser.parse_args())))
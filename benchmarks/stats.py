@@ -0,0 +1,207 @@
+"""Latency percentiles, result tables and stored baselines for the benchmark suites.
+
+A baseline is a JSON file holding the summary of every case of a run, the
+parameters it ran with (rows, seed, ...) and how long a fixed CPU-bound
+workload took on the machine at the time. A later run with the same
+parameters fails on every case whose median got slower than the baseline
+by more than the tolerance. The median is compared by default because the
+p95 of a few dozen samples is close to their maximum, which one stall of
+a busy machine moves; --metric p95 gates on the tail instead. Allowances
+grow with how much slower the calibration workload runs now (they never
+shrink, the calibration being noisy itself), and slowdowns of less than
+a couple of milliseconds count as noise. The default tolerance suits a
+shared CI runner; pass a lower --tolerance on a quiet machine.
+Baselines still only compare runs on similar machines; record them again
+with --save-baseline after a hardware change or an intended slowdown.
+"""
+import argparse
+import hashlib
+import json
+import os
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# A case this much slower than in the baseline fails the comparison
+DEFAULT_TOLERANCE = 0.5
+
+# Slowdowns below this many milliseconds are treated as noise
+DEFAULT_MIN_DELTA_MS = 2.0
+
+# Summary fields a comparison can gate on
+METRICS = ("p50", "p95", "p99")
+
+def calibrate(rounds: int = 5) -> float:
+    """Milliseconds the fastest of a few rounds of a fixed CPU-bound workload takes.
+
+    Sorting, hashing and JSON round trips stand in for the Python side of a
+    request; the ratio between two runs' calibrations says how much faster
+    or slower the machine is now.
+    """
+    rnd = random.Random(1)
+    rows = [{"id": i, "amount": rnd.random() * 100, "description": f"row {rnd.random()}"} for i in range(20000)]
+    best = math.inf
+    for _ in range(rounds):
+        started = time.perf_counter()
+        ordered = sorted(rows, key=lambda row: row["amount"])
+        hashlib.sha256(json.dumps(ordered).encode()).hexdigest()
+        json.loads(json.dumps(rows))
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """The pct-th percentile of ``samples``, interpolating between the closest ranks"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(name: str, samples: Sequence[float], elapsed: Optional[float] = None) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds and throughput of one case.
+
+    ``samples`` are seconds per call. Throughput is calls over ``elapsed``
+    wall-clock seconds when the calls overlapped, else over their sum.
+    """
+    elapsed = elapsed if elapsed is not None else sum(samples)
+    return {
+        "name": name,
+        "count": len(samples),
+        "mean_ms": sum(samples) * 1000 / len(samples) if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "per_second": len(samples) / elapsed if elapsed else 0.0,
+    }
+
+def print_summaries(
+    summaries: List[Dict[str, Any]],
+    baseline: Optional[Dict[str, Any]] = None,
+    metric: str = "p50"
+) -> None:
+    """Print one line per case, with the baseline's ``metric`` when there is one"""
+    field = f"{metric}_ms"
+    width = max([len(summary["name"]) for summary in summaries] + [4])
+    previous = {summary["name"]: summary for summary in (baseline or {}).get("results", [])}
+    header = f"{'case':<{width}}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>11}"
+    print(header + (f"{'base ' + metric:>10}{'change':>9}" if baseline else ""))
+    for summary in summaries:
+        line = (
+            f"{summary['name']:<{width}}{summary['count']:>7}{summary['p50_ms']:>10.2f}"
+            f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['per_second']:>11,.1f}"
+        )
+        before = previous.get(summary["name"])
+        if before:
+            change = summary[field] / before[field] - 1 if before[field] else 0.0
+            line += f"{before[field]:>10.2f}{change:>+9.0%}"
+        print(line)
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """Read a baseline written by save_baseline"""
+    with open(path) as stream:
+        return json.load(stream)
+
+def save_baseline(
+    path: str,
+    params: Dict[str, Any],
+    summaries: List[Dict[str, Any]],
+    calibration_ms: float
+) -> None:
+    """Store a run's parameters, summaries and machine calibration as the baseline"""
+    with open(path, "w") as stream:
+        json.dump(
+            {"params": params, "calibration_ms": round(calibration_ms, 3), "results": summaries},
+            stream,
+            indent=2
+        )
+        stream.write("\n")
+
+def find_regressions(
+    summaries: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    metric: str = "p50",
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+    speed: float = 1.0
+) -> List[str]:
+    """Describe every case whose ``metric`` is slower than the baseline allows.
+
+    ``speed`` is how many times slower the machine runs than when the
+    baseline was recorded, at least 1. Cases missing from the baseline are
+    new and pass.
+    """
+    field = f"{metric}_ms"
+    previous = {summary["name"]: summary for summary in baseline["results"]}
+    regressions = []
+    for summary in summaries:
+        before = previous.get(summary["name"])
+        if before is None:
+            continue
+        expected = before[field] * speed
+        allowed = max(expected * (1 + tolerance), expected + min_delta_ms)
+        if summary[field] > allowed:
+            regressions.append(
+                f"{summary['name']}: {metric} {summary[field]:.2f}ms, baseline {before[field]:.2f}ms "
+                f"(allowed {allowed:.2f}ms)"
+            )
+    return regressions
+
+def compare_with_baseline(
+    summaries: List[Dict[str, Any]],
+    params: Dict[str, Any],
+    calibration_ms: float,
+    baseline: Dict[str, Any],
+    metric: str = "p50",
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS
+) -> int:
+    """Print the regressions against a baseline and return the exit status of the run"""
+    if baseline["params"] != params:
+        print(f"Baseline was recorded with {baseline['params']}, this run used {params}; not comparable")
+        return 2
+    speed = max(calibration_ms / baseline["calibration_ms"], 1.0)
+    print(f"Calibration {calibration_ms:.1f}ms, baseline {baseline['calibration_ms']:.1f}ms; allowances scaled by {speed:.2f}")
+    regressions = find_regressions(summaries, baseline, metric, tolerance, min_delta_ms, speed)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        print(f"{len(regressions)} of {len(summaries)} cases regressed by more than {tolerance:.0%} ({metric})")
+        return 1
+    print(f"No regressions in {len(summaries)} cases ({metric}, tolerance {tolerance:.0%})")
+    return 0
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, default_path: str) -> None:
+    """Add the --baseline, --save-baseline, --metric and --tolerance options of a suite"""
+    parser.add_argument("--baseline", default=default_path, help="Baseline JSON file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline")
+    parser.add_argument("--metric", choices=METRICS, default="p50", help="Latency percentile the comparison gates on")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown before a case fails, e.g. 0.5 for 50%%"
+    )
+
+def finish_run(
+    args: argparse.Namespace,
+    params: Dict[str, Any],
+    summaries: List[Dict[str, Any]],
+    calibration_ms: float
+) -> int:
+    """Print a run and save it as the baseline or compare it with the stored one, returning the exit status"""
+    if args.save_baseline:
+        print_summaries(summaries)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        save_baseline(args.baseline, params, summaries, calibration_ms)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print_summaries(summaries)
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    baseline = load_baseline(args.baseline)
+    print_summaries(summaries, baseline, args.metric)
+    return compare_with_baseline(summaries, params, calibration_ms, baseline, args.metric, args.tolerance)
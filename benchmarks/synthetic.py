@@ -0,0 +1,275 @@
+"""Deterministic synthetic ledgers for benchmarks."""
+import csv
+import io
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import create_write_engine
+from app.models.schema import (
+    metadata, categories, transactions, accounts, budgets, categorization_rules, fx_rates,
+)
+from app.queries import accounts as account_queries
+from app.queries import category_stats as category_stats_queries
+from app.queries import daily_totals as daily_totals_queries
+from app.queries import monthly_totals as monthly_totals_queries
+
+CATEGORY_NAMES = [
+    "Groceries", "Rent", "Utilities", "Transport", "Dining",
+    "Entertainment", "Health", "Salary", "Shopping", "Travel",
+]
+
+DESCRIPTIONS = [
+    "Amazon order", "Grocery store", "Coffee shop", "Monthly rent", "Electric bill",
+    "Netflix subscription", "Uber ride", "Salary ACME Corp", "Pharmacy", "Airline ticket",
+]
+
+def generate_transactions(
+    count: int,
+    seed: int = 42,
+    start: datetime = datetime(2015, 1, 1),
+    days: int = 3650,
+    category_count: int = len(CATEGORY_NAMES)
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` transaction rows spread over ``days`` days from ``start``.
+
+    About 10% are income and 10% are uncategorized. The same seed always
+    produces the same rows.
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        income = rnd.random() < 0.1
+        amount = round(rnd.uniform(500, 5000) if income else -rnd.lognormvariate(3, 1), 2) or -1.0
+        yield {
+            "amount": amount,
+            "description": rnd.choice(DESCRIPTIONS),
+            "date": start + timedelta(days=rnd.randrange(days), seconds=rnd.randrange(86400)),
+            "category_id": None if rnd.random() < 0.1 else rnd.randint(1, category_count),
+            "created_at": start,
+        }
+
+# Spending categories of the realistic ledger: (share of variable rows,
+# lognormal mu and sigma of the amount spent, merchants). Medians are
+# e**mu: about 55 for groceries, 20 for dining, 400 for travel.
+SPENDING_PROFILE: Dict[str, Tuple[float, float, float, List[str]]] = {
+    "Groceries": (0.24, 4.0, 0.6, ["Whole Foods Market", "Trader Joe's", "Safeway", "Costco"]),
+    "Dining": (0.22, 3.0, 0.6, ["Starbucks", "Chipotle", "Local Bistro", "Pizza Place", "Sushi Bar"]),
+    "Transport": (0.16, 2.9, 0.7, ["Uber ride", "Lyft ride", "Shell gas station", "Metro card"]),
+    "Shopping": (0.15, 3.7, 1.0, ["Amazon order", "Target", "IKEA", "Best Buy"]),
+    "Entertainment": (0.09, 3.2, 0.7, ["Cinema tickets", "Concert tickets", "Steam games", "Bookstore"]),
+    "Health": (0.06, 3.6, 0.9, ["Pharmacy", "Dentist", "Optician"]),
+    "Utilities": (0.04, 4.2, 0.4, ["Water bill", "Phone bill"]),
+    "Travel": (0.04, 6.0, 0.8, ["Airline ticket", "Hotel booking", "Car rental"]),
+}
+
+# Bills and income on fixed days of every month: (day, description,
+# category, amount in the first year, yearly rise)
+MONTHLY_EVENTS: List[Tuple[int, str, str, float, float]] = [
+    (1, "Monthly rent", "Rent", -1850.00, 0.03),
+    (3, "Gym membership", "Health", -45.00, 0.0),
+    (7, "Netflix subscription", "Entertainment", -15.49, 0.0),
+    (12, "Electric bill", "Utilities", -85.00, 0.0),
+    (15, "Salary ACME Corp", "Salary", 2650.00, 0.03),
+    (20, "Spotify", "Entertainment", -10.99, 0.0),
+    (28, "Salary ACME Corp", "Salary", 2650.00, 0.03),
+]
+
+# Relative activity Monday..Sunday
+WEEKDAY_WEIGHTS = [0.9, 0.9, 0.95, 1.0, 1.25, 1.35, 0.75]
+
+# Accounts of the realistic ledger; bills and income go to the first one
+ACCOUNT_NAMES = ["Checking", "Credit card", "Savings"]
+
+# Foreign currencies a share of card spending is in, with their starting rate
+FOREIGN_CURRENCIES = {"EUR": (0.04, 1.10), "GBP": (0.02, 1.30)}
+
+# Monthly budgets and categorization rules of the realistic ledger
+REALISTIC_BUDGETS = {"Groceries": 600, "Dining": 350, "Transport": 200, "Shopping": 400, "Entertainment": 120}
+REALISTIC_RULES = [
+    ("Groceries", "Whole Foods"), ("Groceries", "Safeway"), ("Dining", "Starbucks"),
+    ("Transport", "Uber"), ("Transport", "Lyft"), ("Shopping", "Amazon"), ("Travel", "Airline"),
+]
+
+def category_id(name: str) -> int:
+    """ID of a category of CATEGORY_NAMES, which are inserted in order"""
+    return CATEGORY_NAMES.index(name) + 1
+
+def daily_counts(count: int, start: datetime, days: int) -> List[int]:
+    """Split ``count`` rows over ``days`` days, doubling activity over the period and following the week"""
+    weights = [(1 + day / days) * WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()] for day in range(days)]
+    total = sum(weights)
+    shares = [count * weight / total for weight in weights]
+    counts = [int(share) for share in shares]
+    # Hand the rows lost to rounding down to the days with the largest remainders
+    by_remainder = sorted(range(days), key=lambda day: counts[day] - shares[day])
+    for day in by_remainder[:count - sum(counts)]:
+        counts[day] += 1
+    return counts
+
+def generate_realistic_transactions(
+    count: int,
+    seed: int = 42,
+    start: datetime = datetime(2015, 1, 1),
+    days: int = 3650
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` transaction rows in date order that look like a household's ledger.
+
+    Rent, salary and subscriptions land on fixed days of every month, in
+    the Checking account. The remaining rows are card and cash spending
+    whose volume doubles over the period, peaks on weekends and clusters
+    in the afternoon, with lognormal amounts per category, some in EUR or
+    GBP and about 8% uncategorized. The same seed always produces the
+    same rows.
+    """
+    rnd = random.Random(seed)
+    end = start + timedelta(days=days)
+    events: Dict[int, List[Tuple[str, str, float]]] = {}
+    month = date(start.year, start.month, 1)
+    while month < end.date():
+        for day, description, category, amount, rise in MONTHLY_EVENTS:
+            offset = (datetime(month.year, month.month, day) - start).days
+            if 0 <= offset < days:
+                amount *= (1 + rise) ** (month.year - start.year)
+                events.setdefault(offset, []).append((description, category, round(amount, 2)))
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    fixed = sum(len(day_events) for day_events in events.values())
+
+    names = list(SPENDING_PROFILE)
+    shares = [SPENDING_PROFILE[name][0] for name in names]
+    for offset, spending in enumerate(daily_counts(max(count - fixed, 0), start, days)):
+        day = start + timedelta(days=offset)
+        rows = [
+            {
+                "amount": amount,
+                "currency": settings.DEFAULT_CURRENCY,
+                "description": description,
+                "date": day + timedelta(hours=9),
+                "category_id": category_id(category),
+                "account_id": 1,
+            }
+            for description, category, amount in events.get(offset, [])
+        ]
+        for _ in range(spending):
+            name = rnd.choices(names, shares)[0]
+            _, mu, sigma, merchants = SPENDING_PROFILE[name]
+            currency = settings.DEFAULT_CURRENCY
+            draw = rnd.random()
+            for foreign, (share, _) in FOREIGN_CURRENCIES.items():
+                if draw < share:
+                    currency = foreign
+                    break
+                draw -= share
+            seconds = min(max(int(rnd.gauss(14 * 3600, 4 * 3600)), 0), 86399)
+            rows.append({
+                "amount": -max(round(rnd.lognormvariate(mu, sigma), 2), 0.01),
+                "currency": currency,
+                "description": rnd.choice(merchants),
+                "date": day + timedelta(seconds=seconds),
+                "category_id": None if rnd.random() < 0.08 else category_id(name),
+                "account_id": rnd.choices([2, 1, None], [0.65, 0.3, 0.05])[0],
+            })
+        rows.sort(key=lambda row: row["date"])
+        for row in rows[:count]:
+            row["created_at"] = row["date"]
+            yield row
+        count -= len(rows)
+        if count <= 0:
+            return
+
+def generate_fx_rates(start: datetime, days: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """One random-walk rate per foreign currency and weekday"""
+    rnd = random.Random(seed)
+    rows = []
+    for currency, (_, rate) in FOREIGN_CURRENCIES.items():
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).date()
+            rate *= math.exp(rnd.gauss(0, 0.004))
+            if day.weekday() < 5:
+                rows.append({"currency": currency, "date": day, "rate": round(rate, 6)})
+    return rows
+
+def import_csv(count: int, seed: int = 42, start: datetime = datetime(2025, 1, 1)) -> bytes:
+    """A CSV bank export of ``count`` realistic rows, as uploaded to the import routes"""
+    stream = io.StringIO()
+    writer = csv.writer(stream)
+    writer.writerow(["date", "amount", "description", "currency", "account_id"])
+    for row in generate_realistic_transactions(count, seed, start, days=30):
+        writer.writerow([row["date"].isoformat(), row["amount"], row["description"], row["currency"], row["account_id"] or ""])
+    return stream.getvalue().encode()
+
+def realistic_fixtures(start: datetime, days: int) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+    """Accounts, exchange rates, budgets and categorization rules of the realistic ledger"""
+    return [
+        (accounts, [
+            {"name": name, "currency": settings.DEFAULT_CURRENCY, "opening_balance": 2500, "created_at": start}
+            for name in ACCOUNT_NAMES
+        ]),
+        (fx_rates, generate_fx_rates(start, days)),
+        (budgets, [
+            {"category_id": category_id(name), "amount": amount, "created_at": start}
+            for name, amount in REALISTIC_BUDGETS.items()
+        ]),
+        (categorization_rules, [
+            {"category_id": category_id(name), "pattern": pattern, "match_type": "contains", "priority": 0, "created_at": start}
+            for name, pattern in REALISTIC_RULES
+        ]),
+    ]
+
+def create_ledger(
+    database_url: str,
+    count: int,
+    seed: int = 42,
+    batch_size: int = 10000,
+    realistic: bool = False
+) -> None:
+    """Create the schema at ``database_url`` and fill it with a synthetic ledger.
+
+    With ``realistic`` the rows come from generate_realistic_transactions
+    and the ledger also gets accounts, exchange rates, budgets and
+    categorization rules. Derived tables are left empty; rebuild them with
+    rebuild_derived_tables, the app.cli commands or the rebuild_* query
+    handlers.
+    """
+    start, days = datetime(2015, 1, 1), 3650
+    engine = create_engine(database_url)
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(categories), [
+            {"name": name, "description": None, "created_at": start}
+            for name in CATEGORY_NAMES
+        ])
+        if realistic:
+            for table, rows in realistic_fixtures(start, days):
+                connection.execute(insert(table), rows)
+        rows = generate_realistic_transactions(count, seed, start, days) if realistic else generate_transactions(count, seed)
+        batch: List[Dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.execute(insert(transactions), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(transactions), batch)
+    engine.dispose()
+
+
+async def rebuild_derived_tables(database_url: str) -> None:
+    """Recompute the rollups and balance checkpoints of a ledger made by create_ledger"""
+    write_engine = create_write_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "ASYNC_DATABASE_URL": database_url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+    }))
+    session_factory = sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        await category_stats_queries.rebuild_category_stats(session)
+        await monthly_totals_queries.rebuild_monthly_totals(session)
+        await daily_totals_queries.rebuild_daily_totals(session)
+        await account_queries.rebuild_balance_checkpoints(session)
+        await session.commit()
+    await write_engine.dispose()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import create_read_engine
+from app.queries.plans import hot_queries, explain_query_plan, find_table_scans
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOT_QUERIES = hot_queries()
+
+@pytest.fixture(scope="module")
+def database_path(tmp_path_factory):
+    """An empty database migrated to the latest revision"""
+    path = tmp_path_factory.mktemp("query_plans") / "plans.db"
+    config = Config()
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    # alembic/env.py migrates the database the settings point at
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+        command.upgrade(config, "head")
+    return path
+
+async def explain(path, statement):
+    """EXPLAIN QUERY PLAN a statement on a read connection to the database at ``path``"""
+    engine = create_read_engine(settings.model_copy(update={
+        "DEBUG": False,
+        "METRICS_ENABLED": False,
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+    }))
+    try:
+        async with sessionmaker(engine, class_=AsyncSession)() as db:
+            return await explain_query_plan(db, statement)
+    finally:
+        await engine.dispose()
+
+@pytest.mark.parametrize(
+    "statement, allowed_scans",
+    [(statement, allowed_scans) for _, statement, allowed_scans in HOT_QUERIES],
+    ids=[name for name, _, _ in HOT_QUERIES]
+)
+def test_hot_query_is_index_backed(database_path, statement, allowed_scans):
+    plan = asyncio.run(explain(database_path, statement))
+    scans = [table for table in find_table_scans(plan) if table not in allowed_scans]
+    assert not scans, "full table scan of " + ", ".join(scans) + " in:\n" + "\n".join(plan)